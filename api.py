@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+"""
+API HTTP ringan (asyncio, tanpa dependency tambahan) untuk mesin prediksi.
+
+    python api.py --host 0.0.0.0 --port 8000 --workers 4 [--augmented]
+
+Endpoint (JSON masuk, JSON keluar):
+    GET  /health          status + jumlah penyakit/gejala
+    GET  /symptoms        daftar token gejala dan nama tampilannya (?q=teks&cutoff=0.7 untuk mencari)
+    GET  /metrics         latensi per tahap (format teks Prometheus; butuh METRICS_ENABLED=1)
+    POST /predict         {"symptoms": ["itching", "Ruam Kulit"], "top_k": 5, "score_mode": "ratio"}
+    POST /predict/batch   {"queries": [["itching"], ["cough", "fever"]], "top_k": 5}
+
+top_k membatasi "results" dan "model_top_k" (default 5); top_k=0 berarti semua.
+Query tanpa gejala yang dikenali model mendapat "model_top_k": [].
+
+Dengan --workers > 1 socket dibuka sekali lalu proses worker di-fork (engine
+dibagi copy-on-write); setiap worker menjalankan event loop sendiri. Mode
+multi-worker membutuhkan os.fork (Linux/macOS). Metrik dicatat per worker,
+sehingga /metrics menampilkan angka dari worker yang melayani request tersebut.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import urllib.parse
+
+import metrics
+from engine import DiagnosisEngine
+from scoring import SCORE_MODES
+
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH_QUERIES = 1000
+DEFAULT_TOP_K = 5
+
+# Nama tahap metrik per endpoint (endpoint lain tidak dicatat agar label tetap terbatas)
+REQUEST_STAGES = {'/predict': 'api_predict', '/predict/batch': 'api_predict_batch', '/symptoms': 'api_symptoms'}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_top_k(payload):
+    top_k = payload.get('top_k', DEFAULT_TOP_K)
+    # bool adalah subclass int: true/false bukan top_k yang valid
+    if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 0:
+        raise ApiError(400, 'top_k harus bilangan bulat >= 0')
+    return top_k
+
+
+def _parse_score_mode(payload):
+    mode = payload.get('score_mode', 'ratio')
+    if mode not in SCORE_MODES:
+        raise ApiError(400, f'score_mode harus salah satu dari: {", ".join(SCORE_MODES)}')
+    return mode
+
+
+def _parse_content_length(headers):
+    value = headers.get('content-length') or '0'
+    try:
+        length = int(value)
+    except ValueError:
+        raise ApiError(400, 'Content-Length tidak valid')
+    if length < 0:
+        raise ApiError(400, 'Content-Length tidak valid')
+    if length > MAX_BODY_BYTES:
+        raise ApiError(413, 'Body terlalu besar')
+    return length
+
+
+def _parse_cutoff(query):
+    try:
+        cutoff = float(query.get('cutoff', 0.7))
+    except ValueError:
+        raise ApiError(400, 'cutoff harus berupa angka')
+    # nan lolos dari setiap perbandingan (ratio < nan selalu False), jadi ditolak secara eksplisit
+    if not math.isfinite(cutoff) or not 0 <= cutoff <= 1:
+        raise ApiError(400, 'cutoff harus angka antara 0 dan 1')
+    return cutoff
+
+
+def _parse_symptoms(value):
+    if not isinstance(value, list) or not all(isinstance(s, str) for s in value):
+        raise ApiError(400, 'symptoms harus berupa list string')
+    return value
+
+
+def route(engine, method, path, body, query=None):
+    """Dispatch one request; returns (status, JSON-serialisable payload)."""
+    query = query or {}
+    if path == '/health':
+        if method != 'GET':
+            raise ApiError(405, 'Gunakan GET')
+        return 200, {
+            'status': 'ok',
+            'diseases': len(engine.disease_symptoms),
+            'symptoms': len(engine.symptom_postings),
+            'model': engine.model is not None,
+        }
+    if path == '/symptoms':
+        if method != 'GET':
+            raise ApiError(405, 'Gunakan GET')
+        names = engine.all_symptoms_sorted
+        if query.get('q'):
+            cutoff = _parse_cutoff(query)
+            names = engine.search_index.search(query['q'], cutoff=cutoff)
+        return 200, {'symptoms': [{'token': engine.symptoms_clean[name], 'name': name} for name in names]}
+    if path in ('/predict', '/predict/batch'):
+        if method != 'POST':
+            raise ApiError(405, 'Gunakan POST')
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise ApiError(400, 'Body bukan JSON yang valid')
+        if not isinstance(payload, dict):
+            raise ApiError(400, 'Body harus berupa objek JSON')
+        top_k = _parse_top_k(payload)
+        mode = _parse_score_mode(payload)
+        if path == '/predict':
+            return 200, engine.diagnose(_parse_symptoms(payload.get('symptoms')), top_k=top_k, mode=mode)
+        queries = payload.get('queries')
+        if not isinstance(queries, list):
+            raise ApiError(400, 'queries harus berupa list')
+        if len(queries) > MAX_BATCH_QUERIES:
+            raise ApiError(413, f'Maksimal {MAX_BATCH_QUERIES} query per batch')
+        queries = [_parse_symptoms(q) for q in queries]
+        return 200, {'results': engine.diagnose_batch(queries, top_k=top_k, mode=mode)}
+    raise ApiError(404, f'Endpoint tidak dikenal: {path}')
+
+
+def _profiled_route(stage, engine, method, path, body, query):
+    if stage is None:
+        return route(engine, method, path, body, query)
+    with metrics.profile(stage):
+        return route(engine, method, path, body, query)
+
+
+def _response(status, payload, keep_alive, content_type='application/json; charset=utf-8'):
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (
+        f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+        f'Content-Type: {content_type}\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+    )
+    return head.encode('latin-1') + body
+
+
+async def handle_connection(reader, writer, engine):
+    """Serve HTTP/1.1 requests on one connection (keep-alive supported)."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                writer.write(_response(400, {'error': 'Request line tidak valid'}, False))
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+            try:
+                length = _parse_content_length(headers)
+            except ApiError as e:
+                # Batas body tidak diketahui: balas lalu tutup koneksi
+                writer.write(_response(e.status, {'error': str(e)}, False))
+                break
+            body = await reader.readexactly(length) if length else b''
+
+            path, _, query_string = target.partition('?')
+            query = dict(urllib.parse.parse_qsl(query_string))
+            if path == '/metrics' and metrics.REGISTRY.enabled:
+                writer.write(_response(200, metrics.REGISTRY.render_prometheus(), keep_alive,
+                                       'text/plain; version=0.0.4; charset=utf-8'))
+                await writer.drain()
+                if not keep_alive:
+                    break
+                continue
+            stage = REQUEST_STAGES.get(path)
+            try:
+                # cProfile diambil di thread yang benar-benar menjalankan route (lihat _profiled_route)
+                with metrics.request(stage, profile=False) if stage else metrics.stage('api_other'):
+                    if path == '/predict/batch':
+                        # Batch besar dijalankan di thread agar koneksi lain tetap dilayani
+                        status, payload = await asyncio.to_thread(
+                            _profiled_route, stage, engine, method, path, body, query)
+                    else:
+                        status, payload = _profiled_route(stage, engine, method, path, body, query)
+            except ApiError as e:
+                status, payload = e.status, {'error': str(e)}
+            except Exception as e:
+                status, payload = 500, {'error': f'{type(e).__name__}: {e}'}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve_socket(sock, engine):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(r, w, engine), sock=sock)
+    async with server:
+        await server.serve_forever()
+
+
+def _run_worker(sock, engine):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    asyncio.run(_serve_socket(sock, engine))
+
+
+def serve(engine, host='127.0.0.1', port=8000, workers=1):
+    """Bind once and serve with one or more (forked) worker processes."""
+    sock = socket.create_server((host, port), reuse_port=False, backlog=1024)
+    sock.setblocking(False)
+    if workers > 1 and not hasattr(os, 'fork'):
+        print('⚠️ Multi-worker membutuhkan os.fork; berjalan dengan 1 worker.')
+        workers = 1
+    print(f'API berjalan di http://{host}:{port} ({workers} worker)')
+    if workers <= 1:
+        try:
+            asyncio.run(_serve_socket(sock, engine))
+        except KeyboardInterrupt:
+            pass
+        return
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_run_worker, args=(sock, engine), daemon=True) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API HTTP prediksi penyakit')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help='jumlah proses worker (default 1)')
+    parser.add_argument('--augmented', action='store_true', help='gunakan katalog penyakit augmented')
+    parser.add_argument('--no-model', action='store_true', help='jangan muat model RandomForest')
+    args = parser.parse_args()
+
+    # Server METRICS_PORT terpisah hanya untuk 1 worker (thread tidak ikut ter-fork); selain itu pakai /metrics
+    metrics.REGISTRY.configure_from_env(serve=args.workers <= 1)
+    engine = DiagnosisEngine.load(use_augmented=args.augmented, with_model=not args.no_model)
+    for error in engine.errors:
+        print(f'⚠️ {error}')
+    serve(engine, host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,17 @@
-import pandas as pd
 import streamlit as st
 import os
-import urllib.parse
-import difflib
 import re
-import io
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+import functools
+import math
+import engine
+import exports
+import metrics
+from disease_model import load_model, warm_up
+from engine import DiagnosisEngine
+from hot_reload import EngineReloader
+from image_resolver import DiseaseImageResolver, placeholder_data_url
+from knowledge_store import DiseaseKnowledgeStore
+from result_cache import ResultCache
 
 # Configure page - Optimized untuk LAPTOP (Desktop)
 st.set_page_config(
@@ -17,6 +21,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"  # Sidebar selalu visible
 )
 
+# Instrumentasi latensi opt-in (METRICS_ENABLED=1, lihat metrics.py); dikonfigurasi sekali per proses
+@st.cache_resource
+def configure_metrics():
+    return metrics.REGISTRY.configure_from_env()
+
+configure_metrics()
+
 # Load external CSS
 def load_css(file_path):
     with open(file_path) as f:
@@ -25,132 +36,59 @@ def load_css(file_path):
 # Load CSS dari folder assets
 load_css('assets/styles.css')
 
-# Load symptom translations (English -> Indonesian)
-@st.cache_data
-def load_symptom_translations():
-    """Load translation mapping from CSV"""
-    translation_file = os.path.join('assets', 'symptom_translation.csv')
-    translation_dict = {}
-    
-    if os.path.isfile(translation_file):
-        try:
-            # Use efficient pandas read with only needed columns
-            df_trans = pd.read_csv(translation_file, encoding='utf-8', usecols=['english_symptom', 'indonesia_symptom'])
-            # Convert to dict efficiently (vectorized)
-            translation_dict = dict(zip(
-                df_trans['english_symptom'].str.lower().str.strip(),
-                df_trans['indonesia_symptom'].str.strip()
-            ))
-        except Exception as e:
-            st.warning(f"Failed to load translations: {e}")
-    
-    return translation_dict
-
-SYMPTOM_TRANSLATIONS = load_symptom_translations()
-
-# Load precaution translations (English -> Indonesian)
-@st.cache_data
-def load_precaution_translations():
-    translation_file = os.path.join('assets', 'precaution_translation.csv')
-    mp = {}
-    if os.path.isfile(translation_file):
-        try:
-            dfp = pd.read_csv(translation_file, encoding='utf-8')
-            # Normalize keys to lowercase stripped
-            for _, r in dfp.iterrows():
-                eng = str(r.get('english_precaution', '')).strip().lower()
-                ind = str(r.get('indonesia_precaution', '')).strip()
-                if eng:
-                    mp[eng] = ind if ind else r.get('english_precaution')
-        except Exception:
-            pass
-    return mp
-
-PRECAUTION_TRANSLATIONS = load_precaution_translations()
+# Semua data (dataset gejala & pencegahan, translasi) dimuat lewat satu accessor yang di-cache per proses.
+# cache_resource membagi objek yang sama ke semua sesi tanpa menyalin DataFrame di setiap rerun.
+@st.cache_resource
+def get_app_data():
+    return engine.load_sources()
+
+app_data = get_app_data()
+for error in app_data.errors:
+    st.warning(error)
 
 # Fungsi untuk membersihkan nama gejala (ubah underscore jadi spasi, capitalize)
 def clean_symptom_name(symptom):
     """Ubah format gejala dari 'abdominal_pain' menjadi Indonesian translation atau 'Abdominal Pain'"""
-    if not isinstance(symptom, str):
-        return symptom
-    
-    # Remove underscore and convert to lowercase for lookup
-    symptom_lower = symptom.replace('_', ' ').lower().strip()
-    
-    # Try to get Indonesian translation
-    if symptom_lower in SYMPTOM_TRANSLATIONS:
-        return SYMPTOM_TRANSLATIONS[symptom_lower]
-    
-    # Fallback: return title case English if no translation found
-    return symptom.replace('_', ' ').title()
-
-
-# Helper: normalisasi nama penyakit menjadi nama file yang mungkin
-def normalize_filename(name: str) -> str:
-    """Lowercase, replace spaces with underscore, remove non-alnum except underscore"""
-    if not isinstance(name, str):
-        return ''
-    fn = name.lower().strip()
-    fn = fn.replace(' ', '_')
-    # keep alnum and underscore
-    fn = ''.join(c for c in fn if c.isalnum() or c == '_')
-    return fn
-
-
-# Cari file gambar untuk penyakit di folder assets/images
-def find_image_file(disease_name: str):
-    images_dir = os.path.join('assets', 'images')
-    base = normalize_filename(disease_name)
-    if not os.path.isdir(images_dir):
-        return None
-    for ext in ('.png', '.jpg', '.jpeg', '.webp', '.svg'):
-        candidate = os.path.join(images_dir, base + ext)
-        if os.path.isfile(candidate):
-            return candidate
-    return None
-
-
-# Load optional mapping CSV (Disease -> ImageFile) to allow custom med images
-@st.cache_data
-def load_med_image_map():
-    mapping_file = os.path.join('assets', 'med_images.csv')
-    if not os.path.isfile(mapping_file):
-        return {}
-    try:
-        df = pd.read_csv(mapping_file, encoding='utf-8')
-        mp = {}
-        for _, r in df.iterrows():
-            if pd.isna(r.get('Disease')) or pd.isna(r.get('ImageFile')):
-                continue
-            mp[str(r['Disease']).strip().lower()] = os.path.join('assets', 'images', str(r['ImageFile']).strip())
-        return mp
-    except Exception:
-        return {}
+    return diagnosis_engine.clean_symptom_name(symptom)
 
 
-MED_IMAGE_MAP = load_med_image_map()
+# Index gambar penyakit (assets/images + med_images.csv) dipindai sekali per proses;
+# resolusi, isi file dan placeholder di-memo sehingga render tidak menyentuh filesystem.
+# Dipindai saat hasil pertama kali ditampilkan, bukan saat startup.
+@st.cache_resource
+def load_image_resolver():
+    return DiseaseImageResolver()
 
 
-def get_image_for_disease(disease_name: str):
-    """Return path to image: first check mapping, then disease-named file, else None"""
-    if not isinstance(disease_name, str):
-        return None
-    key = disease_name.strip().lower()
-    # mapping lookup
-    if key in MED_IMAGE_MAP and os.path.isfile(MED_IMAGE_MAP[key]):
-        return MED_IMAGE_MAP[key]
-    # fallback to disease-named image
-    return find_image_file(disease_name)
+# Satu record per penyakit (pencegahan, penanganan, dokter, risiko, gambar) digabung sekali per
+# snapshot engine, versi dataset.csv dan index gambar (knowledge_store.py); render cukup satu lookup per hasil
+@st.cache_resource(max_entries=4)
+def get_knowledge_store(catalogue, version, details_version, image_generation, _diagnosis):
+    return DiseaseKnowledgeStore.build(
+        _diagnosis.disease_symptoms, _diagnosis.precaution_table,
+        translations=_diagnosis.precaution_translations, resolve_image=load_image_resolver().resolve)
+
+
+def current_knowledge_store():
+    resolver = load_image_resolver()
+    resolver.refresh_if_changed()
+    return get_knowledge_store('augmented' if use_augmented else 'base', engine_version,
+                               engine_reloader.details_version, resolver.generation, diagnosis_engine)
 
 
 # Render results helper: accepts matching_diseases list and displays them
-def render_results(matching_diseases):
+@metrics.timed('render_results')
+def render_results(matching_diseases, model_top_k=None):
     st.markdown(f'### ✅ Hasil Prediksi')
     st.markdown(f'**Ditemukan {len(matching_diseases)} penyakit yang mungkin**')
     st.write('---')
+    knowledge = current_knowledge_store()
     for idx, result in enumerate(matching_diseases[:5], 1):
         disease_name = result['Disease']
-        match_pct = result['Match Score'] * 100
+        with metrics.stage('knowledge_lookup'):
+            info = knowledge.get(disease_name)
+        # Mode berbobot: persentase utama dari Weighted Score, skor mentah tetap ditampilkan
+        match_pct = result.get('Weighted Score', result['Match Score']) * 100
         matched = result['Matched Symptoms']
         total = result['Total Symptoms']
 
@@ -169,100 +107,133 @@ def render_results(matching_diseases):
                 st.markdown(f"### {idx}")
 
             with col_info:
-                img_file = get_image_for_disease(disease_name)
-                if img_file:
+                if info.image:
                     try:
-                        st.image(img_file, width=96)
+                        st.image(load_image_resolver().content(info.image), width=96)
                     except Exception:
-                        placeholder = svg_placeholder_data_url(disease_name)
+                        placeholder = placeholder_data_url(disease_name)
                         st.markdown(f"<img src=\"{placeholder}\" width=96 style=\"border-radius:8px\">", unsafe_allow_html=True)
                 else:
-                    placeholder = svg_placeholder_data_url(disease_name)
+                    placeholder = placeholder_data_url(disease_name)
                     st.markdown(f"<img src=\"{placeholder}\" width=96 style=\"border-radius:8px\">", unsafe_allow_html=True)
 
                 st.markdown(f"**{color} {disease_name}**")
                 st.markdown(f"<small>Kecocokan: {matched}/{total} gejala</small>", unsafe_allow_html=True)
+                if 'Weighted Score' in result:
+                    st.markdown(f"<small>Skor mentah: {result['Match Score'] * 100:.0f}% · skor berbobot (IDF): {match_pct:.0f}%</small>", unsafe_allow_html=True)
+                if 'Model Probability' in result:
+                    st.markdown(f"<small>Probabilitas model: {result['Model Probability'] * 100:.0f}%</small>", unsafe_allow_html=True)
+                if info.risk_level:
+                    st.markdown(f"<small>Tingkat risiko: {info.risk_level}</small>", unsafe_allow_html=True)
+                if info.doctors:
+                    st.markdown(f"<small>Dokter: {', '.join(info.doctors)}</small>", unsafe_allow_html=True)
 
             with col_pct:
                 st.markdown(f"<h3 style='text-align: center; color: #667eea;'>{match_pct:.0f}%</h3>", unsafe_allow_html=True)
 
-            # Tampilkan pencegahan
-            if not df_precaution.empty:
-                precaution = df_precaution[df_precaution['Disease'].str.lower() == disease_name.lower()]
-                if not precaution.empty:
-                    st.markdown("**📋 Rekomendasi Pencegahan:**")
-                    precautions = []
-                    for col in ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']:
-                        if pd.notna(precaution.iloc[0][col]):
-                            raw = str(precaution.iloc[0][col]).strip()
-                            key = raw.lower()
-                            translated = PRECAUTION_TRANSLATIONS.get(key, '')
-                            # If translation exists and is non-empty use it, otherwise fallback to original
-                            use_text = translated if translated and str(translated).strip() else raw
-                            precautions.append(f"• {use_text}")
-                    st.markdown("\n".join(precautions))
-
-
-# Jika tidak ada gambar file, buat SVG placeholder (data URL) dengan teks penyakit
-def svg_placeholder_data_url(text: str, width=160, height=100):
-    safe_text = urllib.parse.quote(text)
-    svg = f"""
-    <svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' viewBox='0 0 {width} {height}'>
-      <defs>
-        <linearGradient id='g' x1='0' x2='1'>
-          <stop stop-color='#667eea' offset='0'/>
-          <stop stop-color='#764ba2' offset='1'/>
-        </linearGradient>
-      </defs>
-      <rect width='100%' height='100%' rx='12' fill='url(#g)' opacity='0.95'/>
-      <text x='50%' y='50%' dominant-baseline='middle' text-anchor='middle' font-family='Segoe UI, Roboto, Arial' font-size='14' fill='white'>{text}</text>
-    </svg>
-    """
-    return 'data:image/svg+xml;utf8,' + urllib.parse.quote(svg)
-
-# Fungsi untuk memuat data dari file CSV
-@st.cache_data
-def load_data():
-    # Path file dataset penyakit
+            # Tampilkan pencegahan dan penanganan
+            if info.precautions:
+                st.markdown("**📋 Rekomendasi Pencegahan:**")
+                st.markdown("\n".join(f"• {p}" for p in info.precautions))
+            if info.cures:
+                st.markdown("**💊 Penanganan:**")
+                st.markdown("\n".join(f"• {c}" for c in info.cures))
+
+    # Top-k dari model RandomForest (jika artefak model tersedia)
+    if model_top_k:
+        st.write('---')
+        st.markdown('### 🤖 Prediksi Model (Random Forest)')
+        st.markdown("\n".join(f"{i}. **{disease}** — {proba * 100:.0f}%" for i, (disease, proba) in enumerate(model_top_k, 1)))
+
+
+# Model RandomForest terlatih (python disease_model.py): dimuat dan dipanaskan sekali per proses,
+# baru saat prediksi pertama (joblib/sklearn tidak ikut diimpor pada render awal)
+@st.cache_resource(show_spinner='Memuat model...')
+def load_disease_model():
     try:
-        # Hanya gunakan file yang tidak terlalu besar
-        df_disease_symptoms = pd.read_csv('data/DiseaseAndSymptoms.csv', encoding='utf-8')
-        df_precaution = pd.read_csv('data/Disease precaution.csv', encoding='utf-8')
-        
-        return df_disease_symptoms, df_precaution
+        artifact = load_model()
     except Exception as e:
-        st.error(f'Error loading data: {str(e)}')
-        return pd.DataFrame(), pd.DataFrame()
-
-# Memuat data
-df_symptoms, df_precaution = load_data()
-
-# Cache symptoms extraction & cleaning (OPTIMIZED) - defined before usage
-@st.cache_data
-def extract_and_clean_symptoms(df_symptoms_input):
-    """Extract and clean symptoms from dataset"""
-    all_symptoms = []
-    for col in df_symptoms_input.columns:
-        if col.startswith('Symptom_'):
-            symptoms = df_symptoms_input[col].dropna().unique()
-            # IMPORTANT: Strip whitespace from each symptom
-            symptoms = [str(s).strip() for s in symptoms if pd.notna(s)]
-            all_symptoms.extend(symptoms)
-    
-    # Hapus duplikat
-    all_symptoms = list(set(all_symptoms))
-    
-    # Bersihkan nama gejala dan sorting alfabet (BAHASA INDONESIA)
-    symptoms_clean = {clean_symptom_name(s): s for s in all_symptoms}
-    all_symptoms_sorted = sorted(symptoms_clean.keys())
-    
-    return all_symptoms_sorted, symptoms_clean
-
-# Preload symptoms if data exists
-if not df_symptoms.empty:
-    all_symptoms_sorted_cache, symptoms_clean_cache = extract_and_clean_symptoms(df_symptoms)
-else:
-    all_symptoms_sorted_cache, symptoms_clean_cache = [], {}
+        st.warning(f'Gagal memuat model: {e}')
+        return None
+    if artifact is not None:
+        warm_up(artifact)
+    return artifact
+
+# Mesin prediksi (engine.py) yang sama dengan API HTTP dan CLI batch: index gejala,
+# matriks CSR dan lookup pencegahan dibangun sekali per proses per katalog.
+# EngineReloader (hot_reload.py) memantau file data/translasi dan menerapkan perubahan
+# secara inkremental; setiap rerun memakai satu snapshot engine yang konsisten.
+@st.cache_resource
+def get_engine_reloader(catalogue='base'):
+    diagnosis = DiagnosisEngine(
+        app_data.df_symptoms, app_data.df_precaution, app_data.symptom_translations,
+        app_data.precaution_translations, use_augmented=(catalogue == 'augmented'),
+        model_loader=load_disease_model)
+    return EngineReloader(diagnosis, app_data)
+
+# Opsi sidebar: gunakan katalog penyakit yang jauh lebih besar dari dataset augmented
+use_augmented = st.sidebar.checkbox('Gunakan katalog penyakit augmented (lebih besar)', value=False)
+engine_reloader = get_engine_reloader('augmented' if use_augmented else 'base')
+engine_version, diagnosis_engine = engine_reloader.current()
+for error in diagnosis_engine.errors:
+    st.warning(error)
+df_symptoms = diagnosis_engine.df_symptoms
+if engine_reloader.last_reload:
+    st.sidebar.caption(f"🔄 Data diperbarui otomatis: {', '.join(engine_reloader.last_reload['paths'])} "
+                       f"({engine_reloader.last_reload['seconds'] * 1000:.0f} ms)")
+
+# Mode skor: rasio cocok/total (asli) atau berbobot IDF (gejala spesifik lebih berpengaruh)
+SCORE_MODE_LABELS = {'ratio': 'Rasio gejala cocok / total', 'weighted': 'Berbobot (gejala spesifik lebih penting)'}
+score_mode = st.sidebar.selectbox('Mode skor kecocokan', list(SCORE_MODE_LABELS), format_func=SCORE_MODE_LABELS.get)
+
+# Cache LRU hasil per kombinasi gejala (dibagi antar sesi), satu per katalog dan mode skor.
+# Ukuran dan TTL (detik, 0 = tanpa kedaluwarsa) dapat diatur lewat environment variable.
+# Versi snapshot engine ikut jadi kunci: setelah hot reload hasil lama tidak dipakai lagi.
+@st.cache_resource(max_entries=8)
+def get_result_cache(catalogue='base', mode='ratio', version=0):
+    return ResultCache(maxsize=int(os.environ.get('RESULT_CACHE_SIZE', 256)),
+                       ttl=float(os.environ.get('RESULT_CACHE_TTL', 3600)))
+
+result_cache = get_result_cache('augmented' if use_augmented else 'base', score_mode, engine_version)
+
+# Seleksi gejala: satu set token di session_state sebagai sumber kebenaran tunggal
+SYMPTOM_PAGE_SIZE = 40
+
+def get_selected_symptoms():
+    if 'selected_symptoms' not in st.session_state:
+        st.session_state['selected_symptoms'] = set()
+        st.session_state['selection_version'] = 0
+    return st.session_state['selected_symptoms']
+
+def toggle_symptom(token, widget_key):
+    selected = get_selected_symptoms()
+    if st.session_state.get(widget_key):
+        selected.add(token)
+    else:
+        selected.discard(token)
+
+def clear_symptom_selections():
+    get_selected_symptoms().clear()
+    # Versi baru -> key checkbox baru, sehingga semua checkbox dibuat ulang tanpa centang
+    st.session_state['selection_version'] += 1
+
+def set_symptom_page(page):
+    st.session_state['symptom_page'] = max(0, page)
+
+# Peringkat langsung: skor berjalan per sesi (scoring.LiveRanking). Setiap rerun hanya menerapkan
+# selisih seleksi (gejala yang baru dicentang/dilepas); dibuat ulang bila katalog, mode skor
+# atau snapshot engine berganti.
+LIVE_TOP_K = 5
+
+def get_live_ranking():
+    key = (use_augmented, score_mode, engine_version)
+    live = st.session_state.get('live_ranking')
+    if live is None or st.session_state.get('live_ranking_key') != key:
+        live = diagnosis_engine.live_ranking(score_mode)
+        st.session_state['live_ranking'] = live
+        st.session_state['live_ranking_key'] = key
+    live.sync(get_selected_symptoms())
+    return live
 
 # Menampilkan informasi awal data — hero banner
 st.markdown(f"""
@@ -318,8 +289,8 @@ else:
         st.metric("Total Penyakit Unik", df_symptoms['Disease'].nunique())
     
     # Use preloaded symptoms
-    all_symptoms_sorted = all_symptoms_sorted_cache
-    symptoms_clean = symptoms_clean_cache
+    all_symptoms_sorted = diagnosis_engine.all_symptoms_sorted
+    symptoms_clean = diagnosis_engine.symptoms_clean
     
     st.write(f'**Total gejala yang dikenali: {len(all_symptoms_sorted)}**')
 
@@ -328,51 +299,71 @@ else:
     confirm_before_map = st.sidebar.checkbox('Minta konfirmasi sebelum memetakan otomatis', value=False)
     # Opsi: otomatis reset centang setelah melakukan prediksi
     auto_reset_after_prediction = st.sidebar.checkbox('Reset otomatis setelah prediksi', value=False)
+    live_ranking_enabled = st.sidebar.checkbox('Peringkat langsung saat gejala dicentang', value=True)
     
     # Section untuk input gejala dengan styling
     st.write('---')
     st.markdown("## 🔍 Pilih Gejala Anda")
     st.markdown("**Centang semua gejala yang Anda rasakan:**")
     
-    # selected_symptoms: akan diupdate dari checkbox selections
-    selected_symptoms = []
-    
-    # Render checkboxes dengan optimasi (5 columns untuk desktop)
     # Tambahkan kotak pencarian agar user dapat menemukan gejala tertentu
     search_query = st.text_input('Cari gejala (ketik nama atau kata kunci untuk memfilter)')
-    # Jika search_query kosong, tampilkan semua gejala
-    if search_query and isinstance(search_query, str):
-        q = search_query.strip().lower()
-        visible_symptoms = [s for s in all_symptoms_sorted if q in s.lower()]
+    # Jika search_query kosong, tampilkan semua gejala; selain itu gunakan index trigram
+    # (nama Indonesia + Inggris) dengan fuzzy matching sesuai ambang di sidebar
+    if search_query and isinstance(search_query, str) and search_query.strip():
+        visible_symptoms = diagnosis_engine.search_index.search(search_query, cutoff=fuzzy_cutoff)
     else:
         visible_symptoms = all_symptoms_sorted
 
+    # Paginasi: hanya SYMPTOM_PAGE_SIZE checkbox yang dirender per rerun, berapa pun besar vocabulary.
+    # Halaman kembali ke awal saat kata kunci pencarian berubah.
+    if st.session_state.get('symptom_search_query') != search_query:
+        st.session_state['symptom_search_query'] = search_query
+        st.session_state['symptom_page'] = 0
+    total_pages = max(1, math.ceil(len(visible_symptoms) / SYMPTOM_PAGE_SIZE))
+    page = min(st.session_state.get('symptom_page', 0), total_pages - 1)
+    page_symptoms = visible_symptoms[page * SYMPTOM_PAGE_SIZE:(page + 1) * SYMPTOM_PAGE_SIZE]
+
+    selected = get_selected_symptoms()
+    version = st.session_state['selection_version']
     num_cols = 5
     cols = st.columns(num_cols)
 
-    # Render checkboxes with stable keys based on original symptom token (to avoid duplicate keys
-    # when multiple display names map to same translation). Use session_state so selections persist
-    # even when the visible list is filtered.
-    for idx, symptom_clean in enumerate(visible_symptoms):
-        col_idx = idx % num_cols
-        with cols[col_idx]:
-            original_token = symptoms_clean.get(symptom_clean)
-            if not isinstance(original_token, str):
-                original_token = str(original_token)
-            # create a stable key using original token (underscored form)
-            cb_key = f"symptom__{original_token}"
-            # ensure default in session_state
-            if cb_key not in st.session_state:
-                st.session_state[cb_key] = False
-            checked = st.checkbox(symptom_clean, value=st.session_state[cb_key], key=cb_key)
-
-    # Rebuild selected_symptoms from session_state so selection persists across filters
-    selected_symptoms = []
-    all_originals = set(symptoms_clean.values())
-    for orig in all_originals:
-        key = f"symptom__{orig}"
-        if st.session_state.get(key, False):
-            selected_symptoms.append(orig)
+    # Key checkbox memakai token asli (hindari duplikat saat beberapa nama tampilan sama) plus
+    # versi seleksi, sehingga reset cukup menaikkan versi tanpa menghapus key satu per satu.
+    for idx, symptom_clean in enumerate(page_symptoms):
+        with cols[idx % num_cols]:
+            original_token = str(symptoms_clean.get(symptom_clean))
+            cb_key = f"symptom__{version}__{original_token}"
+            st.checkbox(symptom_clean, value=original_token in selected, key=cb_key,
+                        on_change=toggle_symptom, args=(original_token, cb_key))
+
+    if total_pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 3, 1])
+        with col_prev:
+            st.button('◀ Sebelumnya', disabled=page == 0, on_click=set_symptom_page, args=(page - 1,),
+                      use_container_width=True)
+        with col_page:
+            st.markdown(f"<p style='text-align: center;'>Halaman {page + 1} dari {total_pages} "
+                        f"({len(visible_symptoms)} gejala)</p>", unsafe_allow_html=True)
+        with col_next:
+            st.button('Berikutnya ▶', disabled=page >= total_pages - 1, on_click=set_symptom_page,
+                      args=(page + 1,), use_container_width=True)
+
+    # Seleksi dibaca langsung dari satu set di session_state (tetap ada saat filter/halaman berganti)
+    selected_symptoms = sorted(selected)
+    if selected_symptoms:
+        st.markdown(f"**Gejala terpilih ({len(selected_symptoms)}):** "
+                    f"{', '.join(clean_symptom_name(s) for s in selected_symptoms)}")
+        if live_ranking_enabled:
+            with metrics.stage('live_rank'):
+                live = get_live_ranking()
+                live_rows = diagnosis_engine.live_rows(live, LIVE_TOP_K)
+            st.markdown(f"**⚡ Peringkat sementara ({len(live)} penyakit cocok):**")
+            st.markdown("\n".join(
+                f"{i}. **{row['Disease']}** — {row.get('Weighted Score', row['Match Score']) * 100:.0f}% "
+                f"({row['Matched Symptoms']}/{row['Total Symptoms']} gejala)"
+                for i, row in enumerate(live_rows, 1)))
     # Manual input removed per user request (simplified UI)
     # Previously allowed adding arbitrary symptoms via text input; removed to simplify experience.
     
@@ -384,112 +375,55 @@ else:
             if len(selected_symptoms) == 0:
                 st.warning('⚠️ Silakan pilih minimal 1 gejala terlebih dahulu!')
             else:
-                # Tampilkan gejala yang dipilih dengan nama yang bersih
-                selected_symptoms_clean = [clean_symptom_name(s) for s in selected_symptoms]
-                st.markdown(f'**Gejala yang dipilih:** {", ".join(selected_symptoms_clean)}')
-                st.write('---')
-                
-                # Cari penyakit yang cocok dengan gejala
-                # Agregasi per penyakit: gabungkan semua baris yang sama menjadi satu set gejala
-                disease_symptom_map = {}
-                for _, row in df_symptoms.iterrows():
-                    disease = row.get('Disease')
-                    if pd.isna(disease):
-                        continue
-                    disease = str(disease).strip()
-                    if disease not in disease_symptom_map:
-                        disease_symptom_map[disease] = set()
-                    for col in df_symptoms.columns:
-                        if col.startswith('Symptom_') and pd.notna(row[col]):
-                            # IMPORTANT: Strip whitespace from symptoms
-                            symptom_clean = str(row[col]).strip()
-                            disease_symptom_map[disease].add(symptom_clean)
-
-                matching_diseases = []
-                for disease, disease_symptoms in disease_symptom_map.items():
-                    if not disease_symptoms:
-                        continue
-                    matches = set(selected_symptoms).intersection(disease_symptoms)
-                    if not matches:
-                        continue
-                    match_count = len(matches)
-                    total_count = len(disease_symptoms)
-                    match_score = match_count / total_count if total_count > 0 else 0
-                    # buat list nama gejala yang match (dalam bentuk bersih)
-                    matched_names = [clean_symptom_name(s) for s in matches]
-                    matching_diseases.append({
-                        'Disease': disease,
-                        'Matched Symptoms': match_count,
-                        'Matched Symptom Names': '; '.join(sorted(matched_names)),
-                        'Total Symptoms': total_count,
-                        'Match Score': match_score
-                    })
+                # Seluruh alur Predict diukur sebagai satu request (plus cProfile bila melewati ambang)
+                with metrics.request('predict'):
+                    # Tampilkan gejala yang dipilih dengan nama yang bersih
+                    selected_symptoms_clean = [clean_symptom_name(s) for s in selected_symptoms]
+                    st.markdown(f'**Gejala yang dipilih:** {", ".join(selected_symptoms_clean)}')
+                    st.write('---')
                 
-                if matching_diseases:
-                    # Sort by match score
-                    matching_diseases = sorted(matching_diseases, key=lambda x: x['Match Score'], reverse=True)
-                    # Render results (selalu tampil di bawah)
-                    render_results(matching_diseases)
-
-                    # Siapkan DataFrame hasil untuk diunduh
-                    try:
-                        df_results = pd.DataFrame(matching_diseases)
-                    except Exception:
-                        df_results = None
+                    # Cari penyakit yang cocok dengan gejala
+                    # Satu perkalian matriks sparse menghitung jumlah gejala cocok untuk semua penyakit;
+                    # probabilitas RandomForest (jika ada) ditambahkan berdampingan dengan skor overlap
+                    with metrics.stage('rank'):
+                        cached = result_cache.get_or_compute(
+                            selected_symptoms, lambda: diagnosis_engine.rank(selected_symptoms, mode=score_mode))
+                    matching_diseases, model_top_k = cached.matching_diseases, cached.model_top_k
+
+                    if matching_diseases:
+                        # Sudah terurut berdasarkan match score oleh SymptomMatrix.rank
+                        # Render results (selalu tampil di bawah)
+                        render_results(matching_diseases, model_top_k)
 
-                    if df_results is not None and not df_results.empty:
                         st.markdown('---')
                         st.markdown('**Unduh hasil prediksi**')
-                        # Excel (.xlsx)
-                        try:
-                            to_xlsx = io.BytesIO()
-                            with pd.ExcelWriter(to_xlsx, engine='openpyxl') as writer:
-                                df_results.to_excel(writer, index=False, sheet_name='Hasil')
-                            to_xlsx.seek(0)
-                            st.download_button(label='Unduh Excel (.xlsx)', data=to_xlsx, file_name='hasil_prediksi.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                        except Exception:
-                            st.warning('Ekspor .xlsx gagal (mungkin dependency openpyxl tidak terpasang). Gunakan CSV sebagai alternatif.')
-
-                        # CSV
-                        csv_bytes = df_results.to_csv(index=False).encode('utf-8')
-                        st.download_button(label='Unduh CSV', data=csv_bytes, file_name='hasil_prediksi.csv', mime='text/csv')
-
-                        # JSON
-                        json_str = df_results.to_json(orient='records', force_ascii=False)
-                        st.download_button(label='Unduh JSON', data=json_str, file_name='hasil_prediksi.json', mime='application/json')
-
-                        # Plain text summary (termasuk nama-nama gejala yang cocok)
-                        txt_lines = []
-                        for i, r in enumerate(matching_diseases, 1):
-                            matched_names = r.get('Matched Symptom Names', '')
-                            txt_lines.append(f"{i}. {r['Disease']} - {r['Matched Symptoms']}/{r['Total Symptoms']} ({r['Match Score']:.2f})\n    Gejala cocok: {matched_names}")
-                        txt = '\n\n'.join(txt_lines)
-                        st.download_button(label='Unduh TXT (ringkasan)', data=txt, file_name='hasil_prediksi.txt', mime='text/plain')
-                else:
-                    st.warning('⚠️ Tidak ada penyakit yang cocok dengan gejala yang dipilih. Silakan coba gejala lain.')
-
-                # --- Reset controls ---
-                def clear_symptom_selections():
-                    # Remove symptom keys from session_state so Streamlit will recreate
-                    # the checkboxes with their default (unchecked) state on rerun.
-                    keys = [k for k in list(st.session_state.keys()) if isinstance(k, str) and k.startswith('symptom__')]
-                    for k in keys:
-                        try:
-                            del st.session_state[k]
-                        except Exception:
-                            # ignore if unable to delete
-                            pass
-
-                # Show manual reset button so user can clear selections and start a new prediction
-                with st.container():
-                    col_a, col_b = st.columns([3,1])
-                    with col_a:
-                        if st.button('🔄 Reset Pilihan (kosongkan centang)', use_container_width=True):
-                            clear_symptom_selections()
-                            st.experimental_rerun()
-                    with col_b:
-                        if auto_reset_after_prediction:
-                            # If user opted for auto reset, perform it now (note: this will rerun and
-                            # therefore the current result display will be cleared).
-                            clear_symptom_selections()
-                            st.experimental_rerun()
+                        # Payload dibuat hanya saat tombol unduh diklik (callable, dijalankan di thread terpisah)
+                        # lalu disimpan di entri cache; on_click='ignore' agar hasil tidak hilang karena rerun
+                        if exports.xlsx_available():
+                            st.download_button(label='Unduh Excel (.xlsx)', data=functools.partial(cached.export, 'xlsx', exports.to_xlsx), file_name='hasil_prediksi.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', on_click='ignore')
+                        else:
+                            st.warning('Ekspor .xlsx tidak tersedia (dependency openpyxl tidak terpasang). Gunakan CSV sebagai alternatif.')
+                        st.download_button(label='Unduh CSV', data=functools.partial(cached.export, 'csv', exports.to_csv), file_name='hasil_prediksi.csv', mime='text/csv', on_click='ignore')
+                        st.download_button(label='Unduh JSON', data=functools.partial(cached.export, 'json', exports.to_json), file_name='hasil_prediksi.json', mime='application/json', on_click='ignore')
+                        st.download_button(label='Unduh TXT (ringkasan)', data=functools.partial(cached.export, 'txt', exports.to_txt), file_name='hasil_prediksi.txt', mime='text/plain', on_click='ignore')
+                    else:
+                        st.warning('⚠️ Tidak ada penyakit yang cocok dengan gejala yang dipilih. Silakan coba gejala lain.')
+
+                    # --- Reset controls ---
+                    # Show manual reset button so user can clear selections and start a new prediction
+                    with st.container():
+                        col_a, col_b = st.columns([3,1])
+                        with col_a:
+                            st.button('🔄 Reset Pilihan (kosongkan centang)', use_container_width=True,
+                                      on_click=clear_symptom_selections)
+                        with col_b:
+                            if auto_reset_after_prediction:
+                                # Seleksi dikosongkan sekarang; hasil tetap tampil sampai interaksi berikutnya
+                                clear_symptom_selections()
+
+# Statistik cache hasil (untuk menentukan RESULT_CACHE_SIZE / RESULT_CACHE_TTL)
+with st.sidebar.expander('Statistik cache hasil'):
+    stats = result_cache.stats()
+    st.write(f"Entri: {stats['size']}/{stats['maxsize']} · hit: {stats['hits']} · miss: {stats['misses']} "
+             f"({stats['hit_rate']:.0%} hit rate)")
+    st.write(f"Evicted: {stats['evictions']} · kedaluwarsa: {stats['expirations']}")
@@ -0,0 +1,150 @@
+"""
+Struktur read-only di atas array numpy biasa (tanpa dtype object).
+
+Dipakai untuk index yang di-memory-map dari cache/shared_index (shared_index.py):
+dict/list Python per proses diganti view yang membaca langsung dari array
+string ('<U') dan offset, sehingga halaman memorinya tetap dibagi antar worker.
+Lookup memakai binary search atas kunci yang terurut (atau permutasi
+pengurutnya); nilai yang dikembalikan berupa str/tuple Python biasa.
+"""
+
+import collections.abc
+
+import numpy as np
+
+
+def string_array(values):
+    """'<U' numpy array of str(value) for each value."""
+    return np.array([str(v) for v in values], dtype=str)
+
+
+def offset_arrays(rows, ids=None):
+    """(indptr, values) of a CSR-style list of rows; ids maps each item to an int id when given."""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    items = []
+    for i, row in enumerate(rows):
+        items.extend(row)
+        indptr[i + 1] = len(items)
+    if ids is None:
+        return indptr, string_array(items)
+    return indptr, np.array([ids[item] for item in items], dtype=np.int32)
+
+
+def _find(keys, key, order=None):
+    if isinstance(key, str):
+        i = int(np.searchsorted(keys, key, sorter=order))
+        if i < len(keys):
+            j = i if order is None else int(order[i])
+            if keys[j] == key:
+                return j
+    return -1
+
+
+class VocabularyIds(collections.abc.Mapping):
+    """Symptom -> column id by binary search over the sorted vocabulary array (no per-process dict)."""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+
+    def __getitem__(self, symptom):
+        i = _find(self.vocabulary, symptom)
+        if i < 0:
+            raise KeyError(symptom)
+        return i
+
+    def __iter__(self):
+        return iter(self.vocabulary.tolist())
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+
+class StringList(collections.abc.Sequence):
+    """Sequence of str over a '<U' array."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.values[i].tolist()
+        return str(self.values[i])
+
+    def __iter__(self):
+        return iter(self.values.tolist())
+
+    def __len__(self):
+        return len(self.values)
+
+
+class RowList(collections.abc.Sequence):
+    """Row i = container(values[indptr[i]:indptr[i + 1]]); vocabulary turns int values into strings."""
+
+    def __init__(self, indptr, values, vocabulary=None, container=list):
+        self.indptr = indptr
+        self.values = values
+        self.vocabulary = vocabulary
+        self.container = container
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        row = self.values[self.indptr[i]:self.indptr[i + 1]]
+        if self.vocabulary is not None:
+            row = self.vocabulary[row]
+        return self.container(row.tolist())
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+
+class StringMap(collections.abc.Mapping):
+    """str -> str over two aligned '<U' arrays, keys sorted."""
+
+    def __init__(self, keys, values):
+        self.keys_array = keys
+        self.values_array = values
+
+    def __getitem__(self, key):
+        i = _find(self.keys_array, key)
+        if i < 0:
+            raise KeyError(key)
+        return str(self.values_array[i])
+
+    def __contains__(self, key):
+        return _find(self.keys_array, key) >= 0
+
+    def __iter__(self):
+        return iter(self.keys_array.tolist())
+
+    def __len__(self):
+        return len(self.keys_array)
+
+    def values(self):
+        return self.values_array.tolist()
+
+
+class RowMap(collections.abc.Mapping):
+    """str -> row of a RowList; keys sorted, or in their own order with order = argsort(keys)."""
+
+    def __init__(self, keys, rows, order=None):
+        self.keys_array = keys
+        self.rows = rows
+        self.order = order
+
+    def __getitem__(self, key):
+        i = _find(self.keys_array, key, self.order)
+        if i < 0:
+            raise KeyError(key)
+        return self.rows[i]
+
+    def __contains__(self, key):
+        return _find(self.keys_array, key, self.order) >= 0
+
+    def __iter__(self):
+        return iter(self.keys_array.tolist())
+
+    def __len__(self):
+        return len(self.keys_array)
@@ -0,0 +1,202 @@
+"""
+Loader streaming untuk dataset augmented one-hot (377 kolom).
+
+File Final_Augmented_dataset_Diseases_and_Symptoms.csv (~190 MB) atau
+bagian-bagiannya (Final_Augmented_part_N.csv) dibaca per chunk dengan dtype
+uint8, lalu langsung dilipat menjadi jumlah kemunculan gejala per penyakit.
+Baris mentah tidak pernah disimpan seluruhnya di memori. Jika sumber sudah
+dipraproses menjadi shard sparse (python preprocess.py), shard itu yang dibaca;
+selain itu, setelah pembacaan pertama baris disimpan di cache biner (lihat
+data_cache.py) dan dibaca ulang lewat memory-map tanpa parsing CSV.
+"""
+
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data_cache import CACHE_DIR, build_onehot_cache, is_cache_fresh, load_onehot_cache
+
+DATA_DIR = 'data'
+AUGMENTED_FILE = 'Final_Augmented_dataset_Diseases_and_Symptoms.csv'
+AUGMENTED_PART_PATTERN = 'Final_Augmented_part_*.csv'
+DISEASE_COLUMN = 'diseases'
+DEFAULT_CHUNKSIZE = 50000
+
+
+def canonical_symptom(name):
+    """Kunci pencocokan gejala lintas dataset: 'skin_rash' dan 'Skin Rash' -> 'skin rash'."""
+    return str(name).replace('_', ' ').lower().strip()
+
+
+def is_lfs_pointer(path):
+    """True jika file hanyalah pointer Git LFS (isi asli belum di-download)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(64).startswith(b'version https://git-lfs')
+    except OSError:
+        return False
+
+
+def find_augmented_sources(data_dir=DATA_DIR):
+    """Return the augmented CSV files to stream: split parts if present, else the full file."""
+    def part_number(path):
+        m = re.search(r'_part_(\d+)\.csv$', path)
+        return int(m.group(1)) if m else 0
+
+    parts = sorted(glob.glob(os.path.join(data_dir, AUGMENTED_PART_PATTERN)), key=part_number)
+    parts = [p for p in parts if not is_lfs_pointer(p)]
+    if parts:
+        return parts
+    full = os.path.join(data_dir, AUGMENTED_FILE)
+    if os.path.isfile(full) and not is_lfs_pointer(full):
+        return [full]
+    return []
+
+
+def read_augmented_header(path):
+    """Read only the header row of an augmented CSV."""
+    return list(pd.read_csv(path, nrows=0, encoding='utf-8').columns)
+
+
+def _iter_csv_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Parse one augmented CSV per chunk: (symptom_columns, diseases, uint8 values)."""
+    symptom_cols = [c for c in read_augmented_header(path) if c != DISEASE_COLUMN]
+    dtype = {c: np.uint8 for c in symptom_cols}
+    dtype[DISEASE_COLUMN] = str
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtype, encoding='utf-8'):
+        chunk = chunk[chunk[DISEASE_COLUMN].notna()]
+        yield (
+            symptom_cols,
+            chunk[DISEASE_COLUMN].str.strip().to_numpy(dtype=object),
+            chunk[symptom_cols].to_numpy(dtype=np.uint8),
+        )
+
+
+def load_onehot_table(path, cache_dir=CACHE_DIR):
+    """Return (labels, label_codes, symptom_columns, values) from the binary cache.
+
+    The cache is (re)built by streaming the CSV when missing or stale; arrays
+    are memory-mapped so repeated cold starts skip CSV parsing entirely.
+    """
+    meta = is_cache_fresh(path, cache_dir)
+    if meta is None:
+        symptom_cols = [c for c in read_augmented_header(path) if c != DISEASE_COLUMN]
+        chunks = ((diseases, values) for _, diseases, values in _iter_csv_chunks(path))
+        meta = build_onehot_cache(path, DISEASE_COLUMN, symptom_cols, chunks, cache_dir)
+    return load_onehot_cache(path, meta, cache_dir)
+
+
+def _iter_cached_chunks(table, chunksize):
+    labels, codes, symptom_cols, values = table
+    labels = np.array(labels, dtype=object)
+    for start in range(0, len(codes), chunksize):
+        stop = start + chunksize
+        yield symptom_cols, labels[codes[start:stop]], np.asarray(values[start:stop])
+
+
+def iter_augmented_chunks(paths, chunksize=DEFAULT_CHUNKSIZE, use_cache=True, cache_dir=CACHE_DIR):
+    """Yield (symptom_columns, diseases, values) per chunk across all parts.
+
+    values is a (rows x symptoms) uint8 array; all parts must share one header.
+    With use_cache the rows come from preprocess.py shards when they are up to
+    date, otherwise from the memory-mapped binary cache.
+    """
+    from preprocess import iter_shard_chunks, load_fresh_manifest
+
+    columns = None
+    for path in paths:
+        source = None
+        manifest = load_fresh_manifest(path, cache_dir) if use_cache else None
+        if manifest is not None:
+            source = iter_shard_chunks(path, manifest, cache_dir)
+        elif use_cache:
+            try:
+                source = _iter_cached_chunks(load_onehot_table(path, cache_dir), chunksize)
+            except OSError:
+                # Folder cache tidak bisa ditulis: baca langsung dari CSV
+                source = None
+        if source is None:
+            source = _iter_csv_chunks(path, chunksize)
+        for symptom_cols, diseases, values in source:
+            if columns is None:
+                columns = symptom_cols
+            elif symptom_cols != columns:
+                raise ValueError(f'Header {path} berbeda dari bagian sebelumnya')
+            yield symptom_cols, diseases, values
+
+
+class SymptomFrequencies:
+    """Per-disease symptom occurrence counts folded from the augmented one-hot rows."""
+
+    def __init__(self, diseases, vocabulary, counts, row_counts):
+        self.diseases = list(diseases)
+        self.vocabulary = list(vocabulary)
+        self.counts = counts            # (n_diseases x n_symptoms) uint32
+        self.row_counts = row_counts    # (n_diseases,) uint32, jumlah baris per penyakit
+
+    @property
+    def total_rows(self):
+        return int(self.row_counts.sum())
+
+    def frequencies(self):
+        """Fraction of each disease's rows that contain each symptom."""
+        return self.counts / np.maximum(self.row_counts, 1)[:, None]
+
+    def disease_symptoms(self, min_frequency=0.0):
+        """Return dict disease -> frozenset(symptoms) with frequency above min_frequency.
+
+        The default keeps every symptom seen at least once, the same union
+        semantics used for DiseaseAndSymptoms.csv.
+        """
+        freq = self.frequencies()
+        vocab = np.array(self.vocabulary, dtype=object)
+        result = {}
+        for i, disease in enumerate(self.diseases):
+            mask = (self.counts[i] > 0) & (freq[i] > min_frequency)
+            result[disease] = frozenset(vocab[mask])
+        return result
+
+
+def load_augmented_counts(paths=None, chunksize=DEFAULT_CHUNKSIZE, use_cache=True, cache_dir=CACHE_DIR):
+    """Stream the augmented dataset and fold it into a SymptomFrequencies table.
+
+    Peak memory is one uint8 chunk plus the (diseases x symptoms) counts,
+    independent of the number of rows.
+    """
+    if paths is None:
+        paths = find_augmented_sources()
+    disease_ids = {}
+    counts = None
+    row_counts = np.zeros(0, dtype=np.uint32)
+    vocabulary = []
+
+    for symptom_cols, diseases, values in iter_augmented_chunks(paths, chunksize=chunksize, use_cache=use_cache,
+                                                                   cache_dir=cache_dir):
+        if counts is None:
+            vocabulary = symptom_cols
+            counts = np.zeros((0, len(symptom_cols)), dtype=np.uint32)
+        codes, uniques = pd.factorize(diseases)
+        global_ids = np.array([disease_ids.setdefault(d, len(disease_ids)) for d in uniques], dtype=np.int64)
+        rows = global_ids[codes]
+
+        # Tambah baris untuk penyakit yang baru muncul
+        if len(disease_ids) > counts.shape[0]:
+            grow = len(disease_ids) - counts.shape[0]
+            counts = np.vstack([counts, np.zeros((grow, counts.shape[1]), dtype=np.uint32)])
+            row_counts = np.concatenate([row_counts, np.zeros(grow, dtype=np.uint32)])
+
+        # Matriks indikator penyakit x baris: satu perkalian sparse = jumlah per penyakit
+        indicator = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.uint32), (rows, np.arange(len(rows)))),
+            shape=(len(disease_ids), len(rows)),
+        )
+        counts += np.asarray(indicator @ values, dtype=np.uint32)
+        row_counts += np.bincount(rows, minlength=len(disease_ids)).astype(np.uint32)
+
+    if counts is None:
+        counts = np.zeros((0, 0), dtype=np.uint32)
+    return SymptomFrequencies(list(disease_ids), vocabulary, counts, row_counts)
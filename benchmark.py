@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+"""
+Benchmark tanpa browser untuk jalur load, build index, prediksi, render dan ekspor.
+
+    python benchmark.py                              # dataset asli + sintetis default
+    python benchmark.py --suite synthetic --rows 10000 100000 1000000 --symptoms 100 1000
+    python benchmark.py -o hasil_baru.json --compare hasil_lama.json
+
+Setiap langkah dijalankan --repeat kali (setelah satu pemanasan) untuk waktu
+wall (median dan minimum), lalu sekali lagi di bawah tracemalloc untuk puncak
+memori. Throughput dihitung dari median (baris/detik, query/detik, dst.).
+Data sintetis mengikuti format CSV augmented one-hot dan dibuat dengan seed
+tetap, sehingga hasil antar-run dapat dibandingkan. Output berupa JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import engine
+import exports
+from augmented_data import DISEASE_COLUMN, load_augmented_counts, load_onehot_table
+from engine import DiagnosisEngine
+from image_resolver import DiseaseImageResolver, placeholder_data_url
+from knowledge_store import DiseaseKnowledgeStore
+from scoring import LiveRanking, SymptomMatrix
+
+DEFAULT_OUTPUT = 'benchmark_results.json'
+DEFAULT_ROWS = [10_000, 100_000]
+DEFAULT_SYMPTOMS = [100, 1_000]
+DEFAULT_QUERIES = 1_000
+SYNTHETIC_CHUNK_ROWS = 10_000
+
+
+def measure(name, fn, repeat=3, items=None, unit='items', setup=None, dataset='real', warmup=True, **params):
+    """Time fn() repeat times (after an optional warm-up) and once more under tracemalloc.
+
+    setup() runs before every call and is not timed (e.g. to drop a cache
+    that fn rebuilds). Returns one JSON-ready result dict.
+    """
+    if warmup:
+        if setup:
+            setup()
+        fn()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    result = {
+        'name': name,
+        'dataset': dataset,
+        'params': params,
+        'runs': repeat,
+        'wall_ms_median': median * 1000,
+        'wall_ms_min': min(timings) * 1000,
+        'peak_mem_bytes': peak,
+    }
+    if items:
+        result['throughput'] = items / median if median > 0 else None
+        result['throughput_unit'] = f'{unit}/s'
+    print(f"  {name:<38} {median * 1000:10.2f} ms  peak {peak / 2**20:8.2f} MiB"
+          + (f"  {result['throughput']:,.0f} {unit}/s" if items and median > 0 else ''))
+    return result
+
+
+def random_queries(vocabulary, n, seed, max_size=5):
+    rng = random.Random(seed)
+    vocabulary = list(vocabulary)
+    return [rng.sample(vocabulary, rng.randint(1, min(max_size, len(vocabulary)))) for _ in range(n)]
+
+
+def render_prep(knowledge, resolver, rows):
+    """Data preparation done by app.render_results, without Streamlit."""
+    prepared = []
+    for result in rows:
+        info = knowledge.get(result['Disease'])
+        prepared.append((
+            resolver.content(info.image) if info.image else placeholder_data_url(result['Disease']),
+            f"{result['Match Score'] * 100:.0f}%",
+            result.get('Matched Symptom Names', ''),
+            info.precautions, info.cures, info.doctors, info.risk_level,
+        ))
+    return prepared
+
+
+def replay_toggles(matrix, queries, k=5, live=True):
+    """Toggle each query's symptoms on one by one, reading the top-k after every toggle.
+
+    live=True updates a LiveRanking incrementally; live=False rescores and sorts
+    everything per toggle (the Predict path).
+    """
+    toggles = 0
+    for query in queries:
+        ranking = LiveRanking(matrix) if live else None
+        for n, symptom in enumerate(query, 1):
+            if live:
+                ranking.add(symptom)
+                ranking.top_k(k)
+            else:
+                matrix.rank(query[:n])[:k]
+            toggles += 1
+    return toggles
+
+
+def bench_real(repeat, n_queries, seed):
+    print('Dataset asli (DiseaseAndSymptoms.csv)')
+    results = []
+    results.append(measure('load_data', engine.load_data, repeat))
+    df_symptoms, df_precaution = engine.load_data()
+    results.append(measure('load_symptom_translations', engine.load_symptom_translations, repeat))
+    results.append(measure('load_precaution_translations', engine.load_precaution_translations, repeat))
+    results.append(measure('load_med_image_map', engine.load_med_image_map, repeat))
+    symptom_translations = engine.load_symptom_translations()
+    precaution_translations = engine.load_precaution_translations()
+
+    results.append(measure(
+        'extract_and_clean_symptoms',
+        lambda: engine.extract_and_clean_symptoms(df_symptoms, symptom_translations),
+        repeat, items=len(df_symptoms), unit='rows'))
+    results.append(measure(
+        'build_symptom_patterns', lambda: engine.build_symptom_patterns(df_symptoms),
+        repeat, items=len(df_symptoms), unit='rows'))
+    results.append(measure(
+        'build_symptom_index', lambda: engine.build_symptom_index(df_symptoms),
+        repeat, items=len(df_symptoms), unit='rows'))
+
+    def build():
+        return DiagnosisEngine(df_symptoms, df_precaution, symptom_translations, precaution_translations)
+
+    results.append(measure('DiagnosisEngine (build)', build, repeat))
+    diagnosis = build()
+
+    queries = random_queries(diagnosis.matrix.symptom_ids, n_queries, seed)
+    results.append(measure(
+        'rank (per query)', lambda: [diagnosis.rank(q) for q in queries],
+        repeat, items=len(queries), unit='queries', queries=len(queries)))
+    results.append(measure(
+        'rank_batch', lambda: diagnosis.rank_batch(queries),
+        repeat, items=len(queries), unit='queries', queries=len(queries)))
+    results.append(measure(
+        'rank_batch (weighted)', lambda: diagnosis.rank_batch(queries, mode='weighted'),
+        repeat, items=len(queries), unit='queries', queries=len(queries)))
+    results.append(measure(
+        'diagnose_batch', lambda: diagnosis.diagnose_batch(queries),
+        repeat, items=len(queries), unit='queries', queries=len(queries)))
+    toggles = sum(len(q) for q in queries)
+    results.append(measure(
+        'toggle top-5 (full rescore)', lambda: replay_toggles(diagnosis.matrix, queries, live=False),
+        repeat, items=toggles, unit='toggles', queries=len(queries)))
+    results.append(measure(
+        'toggle top-5 (LiveRanking)', lambda: replay_toggles(diagnosis.matrix, queries),
+        repeat, items=toggles, unit='toggles', queries=len(queries)))
+
+    ranked = [rows for rows, _ in diagnosis.rank_batch(queries)]
+    results.append(measure('DiseaseImageResolver (scan)', DiseaseImageResolver, repeat))
+    resolver = DiseaseImageResolver()
+
+    def build_knowledge():
+        return DiseaseKnowledgeStore.build(diagnosis.disease_symptoms, diagnosis.precaution_table,
+                                           translations=precaution_translations, resolve_image=resolver.resolve)
+
+    results.append(measure('DiseaseKnowledgeStore (build)', build_knowledge, repeat))
+    knowledge = build_knowledge()
+    results.append(measure(
+        'render_results prep', lambda: [render_prep(knowledge, resolver, rows[:5]) for rows in ranked],
+        repeat, items=len(ranked), unit='queries', queries=len(ranked)))
+
+    # Ekspor untuk hasil terbesar (paling banyak penyakit cocok)
+    rows = max(ranked, key=len)
+    for fmt, build_export in (('xlsx', exports.to_xlsx), ('csv', exports.to_csv),
+                              ('json', exports.to_json), ('txt', exports.to_txt)):
+        if fmt == 'xlsx' and not exports.xlsx_available():
+            continue
+        results.append(measure(f'export {fmt}', lambda b=build_export: b(rows), repeat,
+                               items=len(rows), unit='rows', rows=len(rows)))
+
+    records = diagnosis.diagnose_batch(queries)
+
+    def stream_csv():
+        flat = (row for record in records for row in exports.flatten_batch_record(record))
+        for _ in exports.iter_csv_chunks(flat, exports.BATCH_CSV_COLUMNS):
+            pass
+
+    results.append(measure('export batch csv (stream)', stream_csv, repeat,
+                           items=len(records), unit='queries', queries=len(records)))
+    return results
+
+
+def write_synthetic_csv(path, n_rows, n_symptoms, seed):
+    """Write an augmented-style one-hot CSV: diseases column plus n_symptoms uint8 columns.
+
+    Each disease has a prototype symptom set; rows keep most of it plus a
+    little noise, so per-disease frequencies look like the real data.
+    """
+    rng = np.random.default_rng(seed)
+    n_diseases = max(10, n_symptoms // 2)
+    per_disease = min(n_symptoms, 8)
+    prototypes = np.array([rng.choice(n_symptoms, per_disease, replace=False) for _ in range(n_diseases)])
+    labels = [f'disease {i}'.encode() + b',' for i in range(n_diseases)]
+    with open(path, 'wb') as f:
+        header = [DISEASE_COLUMN] + [f'symptom {i}' for i in range(n_symptoms)]
+        f.write((','.join(header) + '\n').encode())
+        for start in range(0, n_rows, SYNTHETIC_CHUNK_ROWS):
+            n = min(SYNTHETIC_CHUNK_ROWS, n_rows - start)
+            diseases = rng.integers(0, n_diseases, n)
+            values = np.zeros((n, n_symptoms), dtype=np.uint8)
+            keep = rng.random((n, per_disease)) < 0.8
+            rows_idx = np.repeat(np.arange(n), per_disease)
+            values[rows_idx[keep.ravel()], prototypes[diseases].ravel()[keep.ravel()]] = 1
+            noise = rng.integers(0, n_symptoms, n)
+            values[np.arange(n), noise] = 1
+            # Teks CSV langsung dari byte: digit dan koma bergantian, diakhiri newline
+            text = np.empty((n, 2 * n_symptoms), dtype=np.uint8)
+            text[:, 0::2] = values + ord('0')
+            text[:, 1::2] = ord(',')
+            text[:, -1] = ord('\n')
+            f.write(b''.join(labels[d] + line.tobytes() for d, line in zip(diseases, text)))
+
+
+def bench_synthetic(rows_list, symptoms_list, repeat, n_queries, seed, workdir):
+    results = []
+    for n_symptoms in symptoms_list:
+        for n_rows in rows_list:
+            dataset = f'synthetic {n_rows:,} x {n_symptoms}'
+            print(f'Data sintetis: {n_rows:,} baris x {n_symptoms} gejala')
+            path = os.path.join(workdir, f'synthetic_{n_rows}_{n_symptoms}.csv')
+            cache_dir = os.path.join(workdir, 'cache')
+            write_synthetic_csv(path, n_rows, n_symptoms, seed)
+            params = {'rows': n_rows, 'symptoms': n_symptoms}
+            # Langkah berbiaya besar cukup sekali per ukuran agar 1M baris tetap wajar
+            heavy_repeat = 1 if n_rows >= 1_000_000 else repeat
+
+            results.append(measure(
+                'augmented fold (CSV stream)',
+                lambda: load_augmented_counts([path], use_cache=False),
+                heavy_repeat, items=n_rows, unit='rows', dataset=dataset, warmup=False, **params))
+            results.append(measure(
+                'onehot cache build',
+                lambda: load_onehot_table(path, cache_dir),
+                heavy_repeat, items=n_rows, unit='rows', dataset=dataset, warmup=False,
+                setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True), **params))
+            load_onehot_table(path, cache_dir)
+            results.append(measure(
+                'augmented fold (binary cache)',
+                lambda: load_augmented_counts([path], use_cache=True, cache_dir=cache_dir),
+                repeat, items=n_rows, unit='rows', dataset=dataset, **params))
+
+            frequencies = load_augmented_counts([path], use_cache=True, cache_dir=cache_dir)
+            disease_symptoms = frequencies.disease_symptoms()
+            results.append(measure(
+                'SymptomMatrix (build)', lambda: SymptomMatrix(disease_symptoms),
+                repeat, items=len(disease_symptoms), unit='diseases', dataset=dataset, **params))
+            matrix = SymptomMatrix(disease_symptoms)
+            queries = random_queries(matrix.symptom_ids, n_queries, seed)
+            results.append(measure(
+                'rank_batch', lambda: matrix.rank_batch(queries),
+                repeat, items=len(queries), unit='queries', dataset=dataset, queries=len(queries), **params))
+            results.append(measure(
+                'toggle top-5 (LiveRanking)', lambda: replay_toggles(matrix, queries),
+                repeat, items=sum(len(q) for q in queries), unit='toggles', dataset=dataset,
+                queries=len(queries), **params))
+
+            os.remove(path)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def compare(results, baseline_path):
+    """Print median wall-time ratios against an earlier results file."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    def key(r):
+        return r['dataset'], r['name'], json.dumps(r['params'], sort_keys=True)
+
+    old = {key(r): r for r in baseline.get('results', [])}
+    print(f'\nPerbandingan dengan {baseline_path} (rasio > 1 = lebih lambat)')
+    for r in results:
+        before = old.get(key(r))
+        if before and before['wall_ms_median'] > 0:
+            ratio = r['wall_ms_median'] / before['wall_ms_median']
+            print(f"  {r['dataset']:<28} {r['name']:<38} {before['wall_ms_median']:10.2f} -> "
+                  f"{r['wall_ms_median']:10.2f} ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark jalur load, index, prediksi, render dan ekspor')
+    parser.add_argument('--suite', choices=('all', 'real', 'synthetic'), default='all')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help='jumlah baris data sintetis')
+    parser.add_argument('--symptoms', type=int, nargs='+', default=DEFAULT_SYMPTOMS,
+                        help='jumlah kolom gejala data sintetis')
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help='jumlah query acak per benchmark')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--compare', help='file hasil sebelumnya untuk dibandingkan')
+    parser.add_argument('--workdir', help='folder untuk data sintetis sementara (default: temp)')
+    args = parser.parse_args()
+
+    results = []
+    if args.suite in ('all', 'real'):
+        results += bench_real(args.repeat, args.queries, args.seed)
+    if args.suite in ('all', 'synthetic'):
+        workdir = args.workdir or tempfile.mkdtemp(prefix='bench_')
+        os.makedirs(workdir, exist_ok=True)
+        try:
+            results += bench_synthetic(args.rows, args.symptoms, args.repeat, args.queries, args.seed, workdir)
+        finally:
+            if not args.workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {'environment': environment_info(), 'args': vars(args), 'results': results}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'✅ Hasil disimpan: {args.output}')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+"""
+Cache biner kolumnar untuk dataset CSV (format .npy + meta.json).
+
+Setiap CSV sumber dikonversi sekali menjadi folder di cache/ berisi:
+- semua kolom teks sebagai satu blok kode integer 2-D (.npy) + satu vocabulary
+  bersama di meta.json (dimuat sebagai Categorical dengan satu dtype)
+- kolom numerik sebagai satu blok 2-D .npy per dtype (bisa di-memory-map)
+
+Cache diberi kunci hash SHA-256 file sumber dan CACHE_VERSION, sehingga otomatis
+dibangun ulang saat CSV berubah. File di bawah CACHE_MIN_BYTES dibaca langsung:
+untuk CSV sekecil itu parsing lebih cepat daripada membuka cache. Jalankan
+`python data_cache.py` untuk membangun semua cache di muka (build step), atau
+biarkan `read_csv_cached` membangunnya saat pertama kali dipakai.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = 'cache'
+CACHE_VERSION = 2
+# CSV lebih kecil dari ini dibaca langsung (parsing < biaya membuka cache)
+CACHE_MIN_BYTES = 64 * 1024
+META_FILE = 'meta.json'
+
+# Sumber yang dibaca app.py saat startup
+DATA_SOURCES = [
+    os.path.join('data', 'DiseaseAndSymptoms.csv'),
+    os.path.join('data', 'Disease precaution.csv'),
+    os.path.join('assets', 'symptom_translation.csv'),
+    os.path.join('assets', 'precaution_translation.csv'),
+    os.path.join('assets', 'med_images.csv'),
+]
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_state(path):
+    """(mtime_ns, size, sha256) of path, or None if it cannot be read (baseline for change detection)."""
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size, file_sha256(path)
+    except OSError:
+        return None
+
+
+def cache_path_for(path, cache_dir=CACHE_DIR):
+    """Folder cache untuk satu file sumber (nama file dinormalisasi)."""
+    name = os.path.normpath(path).replace(os.sep, '__').replace(' ', '_')
+    return os.path.join(cache_dir, name)
+
+
+def _source_info(path):
+    st = os.stat(path)
+    return {'path': path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _read_meta(target):
+    try:
+        with open(os.path.join(target, META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_cache_fresh(path, cache_dir=CACHE_DIR):
+    """Return the cache meta if it matches the source file, else None.
+
+    size + mtime are checked first; only when they differ is the source
+    re-hashed, so an unchanged file costs a single stat call.
+    """
+    target = cache_path_for(path, cache_dir)
+    meta = _read_meta(target)
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return None
+    info = _source_info(path)
+    source = meta.get('source', {})
+    if source.get('size') == info['size'] and source.get('mtime_ns') == info['mtime_ns']:
+        return meta
+    if source.get('size') != info['size'] or source.get('sha256') != file_sha256(path):
+        return None
+    # Isi sama (mis. file di-touch): perbarui stat agar pengecekan berikutnya murah
+    source.update(info)
+    try:
+        _write_meta(target, meta)
+    except OSError:
+        pass
+    return meta
+
+
+def _write_meta(target, meta):
+    tmp = os.path.join(target, META_FILE + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(target, META_FILE))
+
+
+def _publish(tmp_dir, target):
+    """Ganti folder cache lama dengan yang baru secara (hampir) atomik."""
+    old = None
+    if os.path.isdir(target):
+        old = f'{target}.old-{uuid.uuid4().hex}'
+        os.replace(target, old)
+    os.replace(tmp_dir, target)
+    if old:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _new_build_dir(target):
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    tmp_dir = f'{target}.tmp-{uuid.uuid4().hex}'
+    os.makedirs(tmp_dir)
+    return tmp_dir
+
+
+def build_table_cache(path, cache_dir=CACHE_DIR):
+    """Convert a (small or medium) CSV into the binary cache and return its meta."""
+    df = pd.read_csv(path, encoding='utf-8')
+    target = cache_path_for(path, cache_dir)
+    tmp_dir = _new_build_dir(target)
+    try:
+        meta = {
+            'version': CACHE_VERSION,
+            'kind': 'table',
+            'source': dict(_source_info(path), sha256=file_sha256(path)),
+            'rows': len(df),
+            'columns': [str(c) for c in df.columns],
+            'strings': None,
+            'blocks': [],
+        }
+        numeric = {}
+        strings = []
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+                values = pd.to_numeric(series, downcast='unsigned' if series.min() >= 0 else 'integer')
+                numeric.setdefault(str(values.dtype), []).append(str(col))
+            elif pd.api.types.is_float_dtype(series):
+                numeric.setdefault('float64', []).append(str(col))
+            else:
+                strings.append(col)
+        if strings:
+            # Satu vocabulary untuk semua kolom teks: saat load cukup satu CategoricalDtype
+            # (validasi kategori per kolom adalah biaya terbesar), kode -1 = NaN
+            codes, categories = pd.factorize(df[strings].to_numpy().ravel(order='F'))
+            np.save(os.path.join(tmp_dir, 'strings.npy'),
+                    codes.astype(np.int32).reshape(len(df), len(strings), order='F'))
+            meta['strings'] = {'file': 'strings.npy', 'columns': [str(c) for c in strings],
+                               'categories': [str(c) for c in categories]}
+        for j, (dtype, cols) in enumerate(numeric.items()):
+            file_name = f'block_{j}.npy'
+            np.save(os.path.join(tmp_dir, file_name), df[cols].to_numpy(dtype=dtype))
+            meta['blocks'].append({'file': file_name, 'dtype': dtype, 'columns': cols})
+        _write_meta(tmp_dir, meta)
+        _publish(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return meta
+
+
+def load_table_cache(path, meta, usecols=None, cache_dir=CACHE_DIR):
+    """Rebuild a DataFrame from cached arrays (numeric blocks are memory-mapped)."""
+    target = cache_path_for(path, cache_dir)
+    columns = [c for c in meta['columns'] if usecols is None or c in usecols]
+    data = {}
+    strings = meta['strings']
+    if strings and any(c in columns for c in strings['columns']):
+        codes = np.load(os.path.join(target, strings['file']))
+        # Categorical langsung dari kode: tanpa inferensi string per baris; kategori
+        # divalidasi sekali untuk dtype bersama, bukan per kolom
+        dtype = pd.CategoricalDtype(strings['categories'])
+        for k, col in enumerate(strings['columns']):
+            if col in columns:
+                data[col] = pd.Categorical.from_codes(codes[:, k], dtype=dtype, validate=False)
+    for block in meta['blocks']:
+        wanted = [c for c in block['columns'] if c in columns]
+        if not wanted:
+            continue
+        values = np.load(os.path.join(target, block['file']), mmap_mode='r')
+        for k, col in enumerate(block['columns']):
+            if col in wanted:
+                data[col] = values[:, k]
+    return pd.DataFrame({c: data[c] for c in columns})
+
+
+def read_csv_cached(path, usecols=None, cache_dir=CACHE_DIR):
+    """Drop-in for pd.read_csv(path, usecols=...) backed by the binary cache.
+
+    Files smaller than CACHE_MIN_BYTES are parsed directly; falls back to
+    parsing the CSV when the cache cannot be written or read (e.g. while
+    another process is replacing the cache folder).
+    """
+    if os.path.getsize(path) < CACHE_MIN_BYTES:
+        return pd.read_csv(path, encoding='utf-8', usecols=usecols)
+    try:
+        meta = is_cache_fresh(path, cache_dir)
+        if meta is None:
+            meta = build_table_cache(path, cache_dir)
+        return load_table_cache(path, meta, usecols=usecols, cache_dir=cache_dir)
+    except OSError:
+        return pd.read_csv(path, encoding='utf-8', usecols=usecols)
+
+
+def count_csv_rows(path, block_size=1 << 22):
+    """Hitung jumlah baris data (tanpa header) dengan memindai byte newline."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def build_onehot_cache(path, label_column, symptom_columns, chunks, cache_dir=CACHE_DIR):
+    """Write a one-hot CSV as labels.npy (int32 codes) + values.npy (uint8 rows x symptoms).
+
+    chunks yields (labels, uint8 values) pairs; values.npy is filled through
+    a memory map so the full matrix is never held in RAM.
+    """
+    target = cache_path_for(path, cache_dir)
+    tmp_dir = _new_build_dir(target)
+    try:
+        capacity = count_csv_rows(path)
+        values_out = np.lib.format.open_memmap(
+            os.path.join(tmp_dir, 'values.npy'), mode='w+', dtype=np.uint8,
+            shape=(capacity, len(symptom_columns)))
+        labels_out = np.lib.format.open_memmap(
+            os.path.join(tmp_dir, 'labels.npy'), mode='w+', dtype=np.int32, shape=(capacity,))
+        label_ids = {}
+        rows = 0
+        for labels, values in chunks:
+            n = len(labels)
+            labels_out[rows:rows + n] = [label_ids.setdefault(l, len(label_ids)) for l in labels]
+            values_out[rows:rows + n] = values
+            rows += n
+        values_out.flush()
+        labels_out.flush()
+        del values_out, labels_out
+        meta = {
+            'version': CACHE_VERSION,
+            'kind': 'onehot',
+            'source': dict(_source_info(path), sha256=file_sha256(path)),
+            'rows': rows,
+            'label_column': label_column,
+            'labels': list(label_ids),
+            'columns': list(symptom_columns),
+        }
+        _write_meta(tmp_dir, meta)
+        _publish(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return meta
+
+
+def load_onehot_cache(path, meta, cache_dir=CACHE_DIR):
+    """Return (labels, label_codes, symptom_columns, values) with arrays memory-mapped."""
+    target = cache_path_for(path, cache_dir)
+    rows = meta['rows']
+    codes = np.load(os.path.join(target, 'labels.npy'), mmap_mode='r')[:rows]
+    values = np.load(os.path.join(target, 'values.npy'), mmap_mode='r')[:rows]
+    return meta['labels'], codes, meta['columns'], values
+
+
+def build_all(sources=DATA_SOURCES, cache_dir=CACHE_DIR):
+    """Build step: pastikan semua sumber (termasuk dataset augmented) sudah ter-cache."""
+    from augmented_data import find_augmented_sources, load_onehot_table
+
+    for path in sources:
+        if not os.path.isfile(path):
+            print(f'Lewati (tidak ada): {path}')
+            continue
+        if os.path.getsize(path) < CACHE_MIN_BYTES:
+            print(f'Lewati (kecil, dibaca langsung): {path}')
+            continue
+        if is_cache_fresh(path, cache_dir):
+            print(f'Cache masih valid: {path}')
+            continue
+        meta = build_table_cache(path, cache_dir)
+        print(f"Cache dibangun: {path} ({meta['rows']:,} baris)")
+    for path in find_augmented_sources():
+        fresh = is_cache_fresh(path, cache_dir)
+        load_onehot_table(path, cache_dir=cache_dir)
+        print(f"{'Cache masih valid' if fresh else 'Cache dibangun'}: {path}")
+
+
+if __name__ == '__main__':
+    build_all()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""
+Pipeline training dan serving RandomForestClassifier untuk prediksi penyakit.
+
+Training (offline):  python disease_model.py [--no-augmented] [--n-estimators 100]
+    Membangun matriks one-hot gejala dari DiseaseAndSymptoms.csv dan dataset
+    augmented, melatih RandomForest dengan n_jobs=-1 (semua core), lalu menyimpan
+    artefak bermodel versi ke models/disease_rf.joblib.
+
+Serving: app.py memuat artefak sekali (st.cache_resource), memanaskannya
+(warm_up) dan memangkas jumlah pohon bila perlu agar satu prediksi tetap di
+bawah LATENCY_BUDGET_MS.
+"""
+
+import argparse
+import heapq
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import metrics
+from augmented_data import canonical_symptom, find_augmented_sources, iter_augmented_chunks
+from data_cache import file_sha256, read_csv_cached
+
+MODEL_DIR = 'models'
+MODEL_PATH = os.path.join(MODEL_DIR, 'disease_rf.joblib')
+MODEL_VERSION = 1
+LATENCY_BUDGET_MS = 50.0
+BASE_DATASET = os.path.join('data', 'DiseaseAndSymptoms.csv')
+
+
+def build_training_matrix(include_augmented=True):
+    """Return (X uint8 rows x features, y disease labels, features) over canonical symptom names.
+
+    Disease names from the augmented data are aligned case-insensitively with
+    DiseaseAndSymptoms.csv, the same rule the app uses to merge catalogues.
+    """
+    df = read_csv_cached(BASE_DATASET)
+    df = df[df['Disease'].notna()]
+    symptom_cols = [c for c in df.columns if c.startswith('Symptom_')]
+    base_labels = df['Disease'].astype(str).str.strip().to_numpy(dtype=object)
+
+    features = {}
+    row_ids, col_ids = [], []
+    for col in symptom_cols:
+        values = df[col].to_numpy(dtype=object)
+        for i, v in enumerate(values):
+            if isinstance(v, str) and v.strip():
+                row_ids.append(i)
+                col_ids.append(features.setdefault(canonical_symptom(v), len(features)))
+
+    aug_chunks = []
+    if include_augmented:
+        for symptom_cols_aug, diseases, values in iter_augmented_chunks(find_augmented_sources()):
+            ids = np.array([features.setdefault(canonical_symptom(c), len(features)) for c in symptom_cols_aug])
+            aug_chunks.append((diseases, values, ids))
+
+    n_base = len(base_labels)
+    n_rows = n_base + sum(len(d) for d, _, _ in aug_chunks)
+    X = np.zeros((n_rows, len(features)), dtype=np.uint8)
+    X[np.asarray(row_ids, dtype=np.int64), np.asarray(col_ids, dtype=np.int64)] = 1
+
+    disease_names = {str(d).lower(): str(d) for d in base_labels}
+    labels = [base_labels]
+    offset = n_base
+    for diseases, values, ids in aug_chunks:
+        X[offset:offset + len(diseases), ids] = values
+        labels.append(np.array([disease_names.get(d.lower(), d) for d in diseases], dtype=object))
+        offset += len(diseases)
+
+    feature_names = [None] * len(features)
+    for name, i in features.items():
+        feature_names[i] = name
+    return X, np.concatenate(labels), feature_names
+
+
+def train_model(include_augmented=True, n_estimators=100, max_depth=None, test_size=0.2, random_state=42):
+    """Train a RandomForest on all cores and return the versioned artifact dict."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    X, y, features = build_training_matrix(include_augmented=include_augmented)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    model = RandomForestClassifier(
+        n_estimators=n_estimators, max_depth=max_depth, n_jobs=-1, random_state=random_state)
+    model.fit(X_train, y_train)
+    accuracy = accuracy_score(y_test, model.predict(X_test)) if len(y_test) else None
+
+    sources = [BASE_DATASET] + (find_augmented_sources() if include_augmented else [])
+    return {
+        'version': MODEL_VERSION,
+        'model': model,
+        'features': features,
+        'trained_at': datetime.now(timezone.utc).isoformat(),
+        'rows': int(len(y)),
+        'accuracy': accuracy,
+        'sources': {p: file_sha256(p) for p in sources},
+    }
+
+
+def save_model(artifact, path=MODEL_PATH):
+    import joblib
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    joblib.dump(artifact, tmp, compress=3)
+    os.replace(tmp, path)
+
+
+@metrics.timed('load_model')
+def load_model(path=MODEL_PATH):
+    """Load the artifact, or return None if missing or trained for another MODEL_VERSION."""
+    if not os.path.isfile(path):
+        return None
+    import joblib
+
+    artifact = joblib.load(path)
+    if not isinstance(artifact, dict) or artifact.get('version') != MODEL_VERSION:
+        return None
+    artifact['feature_ids'] = {name: i for i, name in enumerate(artifact['features'])}
+    return artifact
+
+
+def encode_symptoms(artifact, queries):
+    """One-hot (n_queries x features) matrix for lists of symptom tokens (unknown tokens ignored)."""
+    x = np.zeros((len(queries), len(artifact['features'])), dtype=np.uint8)
+    for row, symptoms in enumerate(queries):
+        for s in symptoms:
+            i = artifact['feature_ids'].get(canonical_symptom(s))
+            if i is not None:
+                x[row, i] = 1
+    return x
+
+
+def predict_proba_batch(artifact, queries):
+    """Return one dict disease -> probability per symptom set, in a single predict_proba call.
+
+    Sets without any symptom known to the model get an empty dict: the
+    all-zero vector carries no evidence, only the forest's prior.
+    """
+    if not queries:
+        return []
+    model = artifact['model']
+    x = encode_symptoms(artifact, queries)
+    known = x.any(axis=1)
+    out = [{} for _ in queries]
+    if known.any():
+        proba = model.predict_proba(x[known])
+        for row, p in zip(np.flatnonzero(known), proba):
+            out[row] = dict(zip(model.classes_, p))
+    return out
+
+
+def predict_proba(artifact, symptoms):
+    """Return dict disease -> probability for one symptom set."""
+    return predict_proba_batch(artifact, [symptoms])[0]
+
+
+def predict_top_k(artifact, symptoms, k=5, proba=None):
+    """Return the k most probable (disease, probability) pairs, highest first (all if k is 0/None)."""
+    if proba is None:
+        proba = predict_proba(artifact, symptoms)
+    if k:
+        top = heapq.nlargest(k, proba.items(), key=lambda kv: kv[1])
+    else:
+        top = sorted(proba.items(), key=lambda kv: kv[1], reverse=True)
+    return [(disease, float(p)) for disease, p in top if p > 0]
+
+
+@metrics.timed('model_warm_up')
+def warm_up(artifact, budget_ms=LATENCY_BUDGET_MS, repeats=5):
+    """Pre-warm the model and trim trees so one prediction fits in budget_ms.
+
+    Single-row requests run on one thread (n_jobs=1) because thread start-up
+    costs more than it saves for one sample. Returns the measured latency (ms).
+    """
+    model = artifact['model']
+    model.n_jobs = 1
+    sample = artifact['features'][:3]
+
+    def measure():
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            predict_top_k(artifact, sample)
+            timings.append((time.perf_counter() - t0) * 1000)
+        return float(np.median(timings))
+
+    latency = measure()
+    if latency > budget_ms and len(model.estimators_) > 1:
+        keep = max(1, int(len(model.estimators_) * budget_ms / latency))
+        model.estimators_ = model.estimators_[:keep]
+        model.n_estimators = keep
+        latency = measure()
+    artifact['latency_ms'] = latency
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latih model RandomForest deteksi penyakit')
+    parser.add_argument('--no-augmented', action='store_true', help='hanya gunakan DiseaseAndSymptoms.csv')
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--output', default=MODEL_PATH)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    artifact = train_model(
+        include_augmented=not args.no_augmented,
+        n_estimators=args.n_estimators,
+        max_depth=args.max_depth,
+        test_size=args.test_size,
+    )
+    save_model(artifact, args.output)
+    accuracy = artifact['accuracy']
+    print(f"✅ Model disimpan: {args.output}")
+    print(f"   Baris: {artifact['rows']:,}, fitur: {len(artifact['features'])}, kelas: {len(artifact['model'].classes_)}")
+    print(f"   Akurasi uji: {accuracy:.4f}" if accuracy is not None else "   Akurasi uji: -")
+    print(f"   Waktu training: {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
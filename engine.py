@@ -0,0 +1,606 @@
+"""
+Mesin prediksi penyakit yang dapat di-import tanpa Streamlit.
+
+Berisi pemuatan data/translasi, index gejala, scoring (SymptomMatrix), lookup
+pencegahan dan (opsional) probabilitas RandomForest. Dipakai bersama oleh
+app.py (UI Streamlit), api.py (HTTP) dan predict_cli.py (batch JSONL).
+"""
+
+import collections
+import copy
+import logging
+import os
+import threading
+
+import pandas as pd
+
+import metrics
+from augmented_data import canonical_symptom, load_augmented_counts
+from data_cache import file_state, read_csv_cached
+from disease_model import load_model, predict_proba_batch, predict_top_k, warm_up
+from scoring import LiveRanking, SymptomMatrix
+from shared_index import attach, index_arrays, index_key, publish, shared_index_enabled
+from symptom_patterns import SymptomPatterns
+from symptom_search import SymptomSearchIndex
+
+logger = logging.getLogger(__name__)
+
+SYMPTOMS_FILE = os.path.join('data', 'DiseaseAndSymptoms.csv')
+PRECAUTION_FILE = os.path.join('data', 'Disease precaution.csv')
+SYMPTOM_TRANSLATION_FILE = os.path.join('assets', 'symptom_translation.csv')
+PRECAUTION_TRANSLATION_FILE = os.path.join('assets', 'precaution_translation.csv')
+MED_IMAGE_FILE = os.path.join('assets', 'med_images.csv')
+PRECAUTION_COLUMNS = ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']
+
+
+@metrics.timed('load_symptom_translations')
+def load_symptom_translations(path=SYMPTOM_TRANSLATION_FILE):
+    """Load English -> Indonesian symptom translations (lowercase keys)."""
+    if not os.path.isfile(path):
+        return {}
+    df_trans = read_csv_cached(path, usecols=['english_symptom', 'indonesia_symptom'])
+    return dict(zip(
+        df_trans['english_symptom'].str.lower().str.strip(),
+        df_trans['indonesia_symptom'].str.strip()
+    ))
+
+
+@metrics.timed('load_precaution_translations')
+def load_precaution_translations(path=PRECAUTION_TRANSLATION_FILE):
+    """Load English -> Indonesian precaution translations (lowercase keys)."""
+    mp = {}
+    if not os.path.isfile(path):
+        return mp
+    dfp = read_csv_cached(path)
+    for _, r in dfp.iterrows():
+        eng = str(r.get('english_precaution', '')).strip().lower()
+        ind = str(r.get('indonesia_precaution', '')).strip()
+        if eng:
+            mp[eng] = ind if ind else r.get('english_precaution')
+    return mp
+
+
+@metrics.timed('load_med_image_map')
+def load_med_image_map(path=MED_IMAGE_FILE):
+    """Load optional Disease -> image path mapping (lowercase disease keys)."""
+    if not os.path.isfile(path):
+        return {}
+    df = read_csv_cached(path)
+    mp = {}
+    for _, r in df.iterrows():
+        if pd.isna(r.get('Disease')) or pd.isna(r.get('ImageFile')):
+            continue
+        mp[str(r['Disease']).strip().lower()] = os.path.join('assets', 'images', str(r['ImageFile']).strip())
+    return mp
+
+
+@metrics.timed('load_data')
+def load_data(symptoms_path=SYMPTOMS_FILE, precaution_path=PRECAUTION_FILE):
+    """Return (df_symptoms, df_precaution) read through the binary cache."""
+    return read_csv_cached(symptoms_path), read_csv_cached(precaution_path)
+
+
+# File sumber engine (urutan sama dengan field DataSources)
+SOURCE_FILES = (SYMPTOMS_FILE, PRECAUTION_FILE, SYMPTOM_TRANSLATION_FILE, PRECAUTION_TRANSLATION_FILE)
+
+# file_states: path -> data_cache.file_state() diambil sebelum file dibaca, sehingga perubahan
+# sesudahnya tetap terdeteksi oleh hot_reload walaupun watcher dibuat belakangan
+DataSources = collections.namedtuple(
+    'DataSources', 'df_symptoms df_precaution symptom_translations precaution_translations errors file_states',
+    defaults=(None,))
+
+
+def load_sources():
+    """Load datasets and translations; failures become empty data plus a message in errors."""
+    errors = []
+    file_states = {path: file_state(path) for path in SOURCE_FILES}
+    try:
+        df_symptoms, df_precaution = load_data()
+    except Exception as e:
+        errors.append(f'Error loading data: {e}')
+        df_symptoms, df_precaution = pd.DataFrame(), pd.DataFrame()
+    try:
+        symptom_translations = load_symptom_translations()
+    except Exception as e:
+        errors.append(f'Failed to load translations: {e}')
+        symptom_translations = {}
+    try:
+        precaution_translations = load_precaution_translations()
+    except Exception:
+        precaution_translations = {}
+    return DataSources(df_symptoms, df_precaution, symptom_translations, precaution_translations, errors,
+                       file_states)
+
+
+def clean_symptom_name(symptom, translations):
+    """Ubah format gejala dari 'abdominal_pain' menjadi terjemahan Indonesia atau 'Abdominal Pain'"""
+    if not isinstance(symptom, str):
+        return symptom
+    symptom_lower = symptom.replace('_', ' ').lower().strip()
+    if symptom_lower in translations:
+        return translations[symptom_lower]
+    return symptom.replace('_', ' ').title()
+
+
+def symptom_tokens(df_symptoms):
+    """Set of all (stripped) symptom tokens in the Symptom_* columns."""
+    all_symptoms = set()
+    for col in df_symptoms.columns:
+        if col.startswith('Symptom_'):
+            symptoms = df_symptoms[col].dropna().unique()
+            # IMPORTANT: Strip whitespace from each symptom
+            all_symptoms.update(str(s).strip() for s in symptoms if pd.notna(s))
+    return all_symptoms
+
+
+@metrics.timed('extract_and_clean_symptoms')
+def extract_and_clean_symptoms(df_symptoms, translations):
+    """Return (sorted display names, display name -> original token)."""
+    all_symptoms = list(symptom_tokens(df_symptoms))
+    symptoms_clean = {clean_symptom_name(s, translations): s for s in all_symptoms}
+    return sorted(symptoms_clean.keys()), symptoms_clean
+
+
+def build_symptom_postings(disease_symptoms):
+    """Index terbalik gejala -> tuple penyakit (urutan mengikuti urutan penyakit)"""
+    symptom_postings = {}
+    for disease, symptoms in disease_symptoms.items():
+        for symptom in symptoms:
+            symptom_postings.setdefault(symptom, []).append(disease)
+    return {s: tuple(ds) for s, ds in symptom_postings.items()}
+
+
+@metrics.timed('build_symptom_patterns')
+def build_symptom_patterns(df_symptoms):
+    """Deduplicate dataset rows into unique (disease, symptom-set) patterns."""
+    return SymptomPatterns.from_dataframe(df_symptoms)
+
+
+@metrics.timed('build_symptom_index')
+def build_symptom_index(df_symptoms, patterns=None):
+    """Build disease -> frozenset(symptoms) and symptom -> tuple(diseases) posting lists.
+
+    Built from the deduplicated patterns (permutasi baris yang sama hanya dihitung sekali);
+    urutan penyakit mengikuti kemunculan pertama di dataset (tie-break ranking).
+    """
+    if patterns is None:
+        patterns = build_symptom_patterns(df_symptoms)
+    disease_symptoms = patterns.disease_symptoms()
+    return disease_symptoms, build_symptom_postings(disease_symptoms)
+
+
+@metrics.timed('merge_augmented_catalogue')
+def merge_augmented_catalogue(disease_symptoms, symptoms_clean, translations, extra=None):
+    """Merge the augmented catalogue into the base index.
+
+    Returns (disease_symptoms, symptom_postings, symptoms_clean). Symptom and
+    disease names are matched ignoring underscores, spacing and case.
+    """
+    if extra is None:
+        extra = load_augmented_counts().disease_symptoms()
+
+    canonical = {}
+    for symptoms in disease_symptoms.values():
+        for symptom in symptoms:
+            canonical.setdefault(canonical_symptom(symptom), symptom)
+    disease_names = {d.lower(): d for d in disease_symptoms}
+
+    merged = dict(disease_symptoms)
+    for disease, symptoms in extra.items():
+        tokens = frozenset(canonical.get(canonical_symptom(s), s) for s in symptoms)
+        name = disease_names.get(disease.lower(), disease)
+        merged[name] = merged.get(name, frozenset()) | tokens
+
+    merged_clean = dict(symptoms_clean)
+    known = set(merged_clean.values())
+    for symptoms in merged.values():
+        for symptom in symptoms:
+            if symptom not in known:
+                known.add(symptom)
+                merged_clean.setdefault(clean_symptom_name(symptom, translations), symptom)
+
+    return merged, build_symptom_postings(merged), merged_clean
+
+
+def normalize_disease_name(name):
+    """Kunci lookup penyakit: huruf kecil tanpa spasi di tepi."""
+    return str(name).strip().lower()
+
+
+def precaution_rows(df_precaution):
+    """Normalized disease name -> tuple of raw (untranslated) precautions; the first row wins."""
+    if df_precaution.empty or 'Disease' not in df_precaution.columns:
+        return {}
+    columns = [c for c in PRECAUTION_COLUMNS if c in df_precaution.columns]
+    rows = {}
+    for disease, *values in df_precaution[['Disease'] + columns].itertuples(index=False, name=None):
+        if pd.isna(disease):
+            continue
+        key = normalize_disease_name(disease)
+        if key not in rows:
+            rows[key] = tuple(str(value).strip() for value in values if not pd.isna(value))
+    return rows
+
+
+def translate_precaution(raw, translations):
+    translated = translations.get(raw.lower(), '')
+    # If translation exists and is non-empty use it, otherwise fallback to original
+    return translated if translated and str(translated).strip() else raw
+
+
+@metrics.timed('build_precaution_table')
+def build_precaution_table(df_precaution, translations, rows=None):
+    """Build normalized disease name -> tuple of already-translated precautions.
+
+    Built once at load time so rendering a result is a single dict lookup.
+    The first row wins when a disease appears more than once.
+    """
+    if rows is None:
+        rows = precaution_rows(df_precaution)
+    return {key: tuple(translate_precaution(p, translations) for p in raws) for key, raws in rows.items()}
+
+
+def changed_keys(old, new):
+    """Keys added, removed or with a different value between two dicts."""
+    return {k for k in old.keys() | new.keys() if old.get(k, _MISSING) != new.get(k, _MISSING)}
+
+
+_MISSING = object()
+
+
+def patch_symptom_postings(postings, old_index, new_index):
+    """Posting lists for new_index, recomputing only symptoms of diseases whose symptom set changed."""
+    if [d for d in old_index if d in new_index] != [d for d in new_index if d in old_index]:
+        # Urutan penyakit lama berubah: urutan setiap posting list ikut berubah
+        return build_symptom_postings(new_index)
+    touched = set()
+    for disease in changed_keys(old_index, new_index):
+        touched |= old_index.get(disease, frozenset()) ^ new_index.get(disease, frozenset())
+    patched = dict(postings)
+    for symptom in touched:
+        diseases = tuple(d for d, symptoms in new_index.items() if symptom in symptoms)
+        if diseases:
+            patched[symptom] = diseases
+        else:
+            patched.pop(symptom, None)
+    return patched
+
+
+def patch_symptoms_clean(symptoms_clean, tokens, old_translations, new_translations):
+    """Display name -> token map for tokens, re-translating only new tokens and changed translations."""
+    changed = changed_keys(old_translations, new_translations)
+    patched = {}
+    for name, token in symptoms_clean.items():
+        if token in tokens and token.replace('_', ' ').lower().strip() not in changed:
+            patched[name] = token
+    known = set(patched.values())
+    for token in tokens - known:
+        patched[clean_symptom_name(token, new_translations)] = token
+    return patched
+
+
+def patch_precaution_table(table, old_rows, new_rows, old_translations, new_translations):
+    """Precaution table for new_rows, translating again only diseases whose rows or phrases changed."""
+    changed = changed_keys(old_translations, new_translations)
+    patched = {}
+    for key, raws in new_rows.items():
+        if key in table and old_rows.get(key) == raws and not any(p.lower() in changed for p in raws):
+            patched[key] = table[key]
+        else:
+            patched[key] = tuple(translate_precaution(p, new_translations) for p in raws)
+    return patched
+
+
+class DiagnosisEngine:
+    """Symptom matching, scoring and precaution lookup shared by the UI, HTTP API and CLI."""
+
+    def __init__(self, df_symptoms, df_precaution, symptom_translations, precaution_translations,
+                 use_augmented=False, model=None, augmented_catalogue=None, model_loader=None,
+                 shared_index=None):
+        self.df_symptoms = df_symptoms
+        self.df_precaution = df_precaution
+        self.symptom_translations = symptom_translations
+        self.precaution_translations = precaution_translations
+        # model_loader: callable tanpa argumen yang dipanggil saat model pertama kali dibutuhkan,
+        # sehingga sklearn/joblib tidak dimuat sebelum ada prediksi
+        self._model = model
+        self._model_loader = model_loader
+        self._model_lock = threading.Lock()
+        self.use_augmented = use_augmented
+        # Index bersama yang di-memory-map (shared_index.py); mati kecuali SHARED_INDEX=1 diset
+        # atau shared_index=True diberikan
+        self.shared_index = shared_index_enabled() if shared_index is None else shared_index
+        self.errors = []
+        self._augmented_catalogue = augmented_catalogue
+        # Katalog dari pemanggil (bukan yang dimuat _merge_augmented): kunci index bersama harus sama
+        # di worker yang attach tanpa pernah memuat katalog augmented
+        self._given_catalogue = augmented_catalogue
+        # False bila katalog augmented gagal digabung: index itu tidak boleh diterbitkan dengan kunci augmented
+        self._shareable = True
+
+        key = self.index_key() if self.shared_index else None
+        if not self._attach_index(key):
+            self.all_symptoms_sorted, self.symptoms_clean = extract_and_clean_symptoms(
+                df_symptoms, symptom_translations)
+            self.patterns = build_symptom_patterns(df_symptoms)
+            self.disease_symptoms, self.symptom_postings = build_symptom_index(df_symptoms, self.patterns)
+            # Index dasar (sebelum digabung dengan katalog augmented), dipakai update inkremental
+            self._base_index = (self.disease_symptoms, self.symptom_postings, self.symptoms_clean)
+            self._merge_augmented()
+            self._build_matrix()
+            self._build_search_index()
+            self._precaution_rows = precaution_rows(df_precaution)
+            self.precaution_table = build_precaution_table(
+                df_precaution, precaution_translations, self._precaution_rows)
+            self._publish_index(key)
+
+    @property
+    def _catalogue(self):
+        return 'augmented' if self.use_augmented else 'base'
+
+    def index_key(self):
+        """Shared-index bundle key for this engine's inputs, or None if its index cannot be shared."""
+        if self.df_symptoms.empty or not self._shareable:
+            return None
+        return index_key(self.df_symptoms, self.df_precaution, self.symptom_translations,
+                         self.precaution_translations, self.use_augmented, self._given_catalogue)
+
+    def index_arrays(self):
+        """This engine's index as plain numpy arrays (the shared_index bundle contents)."""
+        return index_arrays(self.matrix, self.symptoms_clean, self._canonical_tokens, self.precaution_table,
+                            self.search_index)
+
+    def _attach_index(self, key):
+        """Use the published shared index for key instead of building one; False if there is none."""
+        if key is None:
+            return False
+        with metrics.stage('attach_shared_index'):
+            bundle = attach(key, name=self._catalogue)
+        if bundle is None:
+            return False
+        self.matrix = bundle.matrix
+        self.disease_symptoms, self.symptom_postings = bundle.disease_symptoms, bundle.symptom_postings
+        self.symptoms_clean, self.all_symptoms_sorted = bundle.symptoms_clean, bundle.all_symptoms_sorted
+        self._canonical_tokens = bundle.canonical_tokens
+        self.precaution_table = bundle.precaution_table
+        self.search_index = bundle.search_index
+        # Pola dan index dasar untuk update inkremental dibangun dari DataFrame bila dibutuhkan (updated)
+        self.patterns = self._base_index = self._precaution_rows = None
+        return True
+
+    def _publish_index(self, key):
+        """Publish the index built by this process and switch to the memory-mapped copy."""
+        if key is None or not self._shareable:
+            return
+        try:
+            with metrics.stage('publish_shared_index'):
+                publish(self.index_arrays(), key, name=self._catalogue)
+        except OSError as e:
+            logger.warning('Index bersama tidak dapat ditulis (%s); memakai index per proses', e)
+            return
+        self._attach_index(key)
+
+    def _patch_state(self):
+        """(base index, precaution rows) for updated; rebuilt from the DataFrames after _attach_index."""
+        if self._base_index is not None:
+            return self._base_index, self._precaution_rows
+        _, symptoms_clean = extract_and_clean_symptoms(self.df_symptoms, self.symptom_translations)
+        disease_symptoms, postings = build_symptom_index(self.df_symptoms)
+        return (disease_symptoms, postings, symptoms_clean), precaution_rows(self.df_precaution)
+
+    def _merge_augmented(self):
+        if not (self.use_augmented and self.disease_symptoms):
+            return
+        try:
+            if self._augmented_catalogue is None:
+                self._augmented_catalogue = load_augmented_counts().disease_symptoms()
+            self.disease_symptoms, self.symptom_postings, self.symptoms_clean = merge_augmented_catalogue(
+                self.disease_symptoms, self.symptoms_clean, self.symptom_translations, extra=self._augmented_catalogue)
+            self.all_symptoms_sorted = sorted(self.symptoms_clean.keys())
+        except Exception as e:
+            logger.warning('Gagal memuat dataset augmented: %s', e)
+            self.errors.append(f'Gagal memuat dataset augmented: {e}')
+            self._shareable = False
+
+    def _build_matrix(self):
+        with metrics.stage('build_matrix'):
+            self.matrix = SymptomMatrix(self.disease_symptoms)
+
+    def _build_search_index(self):
+        with metrics.stage('build_search_index'):
+            self.search_index = SymptomSearchIndex(self.symptoms_clean, self.symptom_translations)
+        # Kunci kanonik -> token, untuk input bebas dari API/CLI
+        self._canonical_tokens = {canonical_symptom(t): t for t in self.symptoms_clean.values()}
+
+    def updated(self, sources):
+        """New engine for changed sources (a DataSources), patching only what differs.
+
+        The current engine is never modified, so callers holding it keep a
+        consistent snapshot. Unchanged parts are shared with the new engine;
+        the disease index, posting lists, display names and precaution table
+        are patched per changed disease/symptom/phrase. Score matrices and
+        the search index are rebuilt only when their inputs changed. With a
+        shared index, a bundle already published for the new sources is
+        attached instead, and a patched index is published for other workers.
+        """
+        new = copy.copy(self)
+        new.errors = list(sources.errors)
+        new.df_symptoms, new.df_precaution = sources.df_symptoms, sources.df_precaution
+        new.symptom_translations = sources.symptom_translations
+        new.precaution_translations = sources.precaution_translations
+        new._shareable = True
+        key = new.index_key() if new.shared_index else None
+        if new._attach_index(key):
+            return new
+        new._base_index, new._precaution_rows = self._patch_state()
+
+        symptoms_changed = sources.df_symptoms is not self.df_symptoms
+        translations_changed = sources.symptom_translations != self.symptom_translations
+        if symptoms_changed or translations_changed:
+            disease_symptoms, postings, symptoms_clean = new._base_index
+            if symptoms_changed:
+                new.patterns = build_symptom_patterns(sources.df_symptoms)
+                new_index = new.patterns.disease_symptoms()
+                postings = patch_symptom_postings(postings, disease_symptoms, new_index)
+                disease_symptoms = new_index
+            tokens = symptom_tokens(sources.df_symptoms) if symptoms_changed else set(symptoms_clean.values())
+            symptoms_clean = patch_symptoms_clean(symptoms_clean, tokens, self.symptom_translations,
+                                                  sources.symptom_translations)
+            new._base_index = (disease_symptoms, postings, symptoms_clean)
+            new.disease_symptoms, new.symptom_postings, new.symptoms_clean = new._base_index
+            new.all_symptoms_sorted = sorted(symptoms_clean)
+            new._merge_augmented()
+            if new.disease_symptoms != self.disease_symptoms:
+                new._build_matrix()
+            if new.symptoms_clean != self.symptoms_clean or translations_changed:
+                new._build_search_index()
+
+        if sources.df_precaution is not self.df_precaution or \
+                sources.precaution_translations != self.precaution_translations:
+            rows = precaution_rows(sources.df_precaution) if sources.df_precaution is not self.df_precaution \
+                else new._precaution_rows
+            new.precaution_table = patch_precaution_table(self.precaution_table, new._precaution_rows, rows,
+                                                          self.precaution_translations, sources.precaution_translations)
+            new._precaution_rows = rows
+        new._publish_index(key)
+        return new
+
+    @classmethod
+    def load(cls, use_augmented=False, with_model=True, shared_index=None):
+        """Build an engine from the files on disk (used by the HTTP API and CLI)."""
+        sources = load_sources()
+        errors = list(sources.errors)
+        model = None
+        if with_model:
+            try:
+                model = load_model()
+                if model is not None:
+                    warm_up(model)
+            except Exception as e:
+                errors.append(f'Gagal memuat model: {e}')
+                model = None
+        engine = cls(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                     sources.precaution_translations, use_augmented=use_augmented, model=model,
+                     shared_index=shared_index)
+        engine.errors[:0] = errors
+        return engine
+
+    @property
+    def model(self):
+        """Model artifact (or None); loaded through model_loader on first access."""
+        if self._model_loader is not None:
+            with self._model_lock:
+                if self._model_loader is not None:
+                    self._model = self._model_loader()
+                    self._model_loader = None
+        return self._model
+
+    def clean_symptom_name(self, symptom):
+        return clean_symptom_name(symptom, self.symptom_translations)
+
+    def resolve_symptoms(self, inputs):
+        """Map raw inputs (tokens, display names or English names) to known tokens.
+
+        Returns (tokens, unknown_inputs).
+        """
+        tokens, unknown = [], []
+        for raw in inputs:
+            if not isinstance(raw, str):
+                unknown.append(raw)
+                continue
+            token = raw.strip() if raw.strip() in self.symptom_postings else None
+            if token is None:
+                token = self.symptoms_clean.get(raw.strip())
+            if token is None:
+                token = self._canonical_tokens.get(canonical_symptom(raw))
+            if token is None:
+                unknown.append(raw)
+            elif token not in tokens:
+                tokens.append(token)
+        return tokens, unknown
+
+    def _rows(self, ranked, model_proba=None, mode='ratio'):
+        rows = []
+        for disease, match_count, total_count, score, matches in ranked:
+            # buat list nama gejala yang match (dalam bentuk bersih)
+            matched_names = [self.clean_symptom_name(s) for s in matches]
+            row = {
+                'Disease': disease,
+                'Matched Symptoms': match_count,
+                'Matched Symptom Names': '; '.join(sorted(matched_names)),
+                'Total Symptoms': total_count,
+                # Skor mentah cocok/total selalu tersedia; mode berbobot menambah kolom sendiri
+                'Match Score': score if mode == 'ratio' else match_count / total_count,
+            }
+            if mode == 'weighted':
+                row['Weighted Score'] = score
+            if model_proba is not None:
+                row['Model Probability'] = float(model_proba.get(disease, 0.0))
+            rows.append(row)
+        return rows
+
+    def rank(self, symptoms, k=5, mode='ratio'):
+        """Return (matching_diseases rows sorted by score, model top-k or None).
+
+        mode='ratio' sorts by Match Score (matched/total); mode='weighted' adds
+        and sorts by Weighted Score (IDF-weighted, see scoring.py).
+        """
+        return self.rank_batch([symptoms], k=k, mode=mode)[0]
+
+    def rank_batch(self, queries, k=5, mode='ratio'):
+        """Score many symptom sets with one sparse matrix product.
+
+        k limits only the model top-k (0 = all diseases with probability > 0);
+        the model is not consulted for sets without symptoms it knows.
+        """
+        queries = [list(q) for q in queries]
+        with metrics.stage('model_predict'):
+            probas = predict_proba_batch(self.model, queries) if self.model is not None else [None] * len(queries)
+        with metrics.stage('score'):
+            ranked_batch = self.matrix.rank_batch(queries, mode)
+        results = []
+        for symptoms, ranked, model_proba in zip(queries, ranked_batch, probas):
+            model_top_k = None
+            if model_proba is not None:
+                model_top_k = predict_top_k(self.model, symptoms, k=k, proba=model_proba)
+            results.append((self._rows(ranked, model_proba, mode), model_top_k))
+        return results
+
+    def live_ranking(self, mode='ratio'):
+        """Incremental per-session ranking over this engine's index (see scoring.LiveRanking)."""
+        return LiveRanking(self.matrix, mode)
+
+    def live_rows(self, live, k=5):
+        """Top-k result rows (same columns as rank, without model probabilities) from a LiveRanking."""
+        return self._rows(live.top_k(k), mode=live.mode)
+
+    def precautions(self, disease_name):
+        """Translated precautions for a disease (O(1) lookup, empty tuple if unknown)."""
+        return self.precaution_table.get(normalize_disease_name(disease_name), ())
+
+    def diagnose_batch(self, queries, top_k=5, mode='ratio'):
+        """JSON-ready diagnoses for many raw symptom lists (used by the API and CLI).
+
+        top_k limits both results and model_top_k; 0 returns all of them.
+        """
+        resolved = [self.resolve_symptoms(q) for q in queries]
+        ranked = self.rank_batch([tokens for tokens, _ in resolved], k=top_k, mode=mode)
+        out = []
+        for (tokens, unknown), (rows, model_top_k) in zip(resolved, ranked):
+            results = []
+            with metrics.stage('precautions'):
+                for row in (rows[:top_k] if top_k else rows):
+                    row = dict(row)
+                    row['Precautions'] = list(self.precautions(row['Disease']))
+                    results.append(row)
+            out.append({
+                'symptoms': tokens,
+                'unknown_symptoms': unknown,
+                'total_matches': len(rows),
+                'results': results,
+                'model_top_k': [{'Disease': d, 'Probability': p} for d, p in (model_top_k or [])],
+            })
+        return out
+
+    def diagnose(self, symptoms, top_k=5, mode='ratio'):
+        return self.diagnose_batch([symptoms], top_k=top_k, mode=mode)[0]
@@ -0,0 +1,124 @@
+"""
+Ekspor hasil prediksi ke XLSX/CSV/JSON/TXT dan penulisan streaming untuk hasil batch.
+
+Fungsi to_* membangun payload satu hasil prediksi (list baris dict dari
+DiagnosisEngine.rank) dan dipanggil hanya saat unduhan benar-benar diminta.
+openpyxl diimpor di dalam to_xlsx, sehingga tidak dimuat sama sekali bila tidak
+ada yang mengunduh Excel. iter_csv_chunks / iter_jsonl_chunks menghasilkan teks
+per potongan dari iterator, sehingga hasil batch besar tidak pernah dimuat utuh.
+"""
+
+import csv
+import importlib.util
+import io
+import itertools
+import json
+
+import metrics
+
+CHUNK_ROWS = 1000
+
+# Kolom CSV hasil batch: satu baris per (query, penyakit)
+BATCH_CSV_COLUMNS = [
+    'line', 'id', 'symptoms', 'unknown_symptoms', 'rank', 'Disease', 'Matched Symptoms',
+    'Matched Symptom Names', 'Total Symptoms', 'Match Score', 'Weighted Score', 'Model Probability', 'Precautions',
+    'error',
+]
+
+
+def xlsx_available():
+    """True if openpyxl is installed (checked without importing it)."""
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def _columns(rows):
+    return list(rows[0]) if rows else []
+
+
+@metrics.timed('export_xlsx')
+def to_xlsx(rows, sheet_name='Hasil'):
+    from openpyxl import Workbook
+
+    # Mode write_only menulis baris secara streaming, jauh lebih ringan dari workbook biasa
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    columns = _columns(rows)
+    sheet.append(columns)
+    for row in rows:
+        sheet.append([row.get(c) for c in columns])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@metrics.timed('export_csv')
+def to_csv(rows):
+    return ''.join(iter_csv_chunks(rows, _columns(rows))).encode('utf-8')
+
+
+@metrics.timed('export_json')
+def to_json(rows):
+    return json.dumps(rows, ensure_ascii=False)
+
+
+@metrics.timed('export_txt')
+def to_txt(rows):
+    # Ringkasan teks biasa (termasuk nama-nama gejala yang cocok)
+    # Mode berbobot: tampilkan Weighted Score (skor pengurutan), seperti kolom di ekspor lain
+    txt_lines = []
+    for i, r in enumerate(rows, 1):
+        matched_names = r.get('Matched Symptom Names', '')
+        if 'Weighted Score' in r:
+            score = f"skor berbobot {r['Weighted Score']:.2f}, skor mentah {r['Match Score']:.2f}"
+        else:
+            score = f"{r['Match Score']:.2f}"
+        txt_lines.append(f"{i}. {r['Disease']} - {r['Matched Symptoms']}/{r['Total Symptoms']} ({score})\n    Gejala cocok: {matched_names}")
+    return '\n\n'.join(txt_lines)
+
+
+def iter_csv_chunks(rows, columns, chunk_rows=CHUNK_ROWS):
+    """Yield CSV text (header first) in chunks of at most chunk_rows rows from any iterable of dicts."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        writer.writerows(chunk)
+        if buffer.tell():
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if len(chunk) < chunk_rows:
+            return
+
+
+def iter_jsonl_chunks(records, chunk_rows=CHUNK_ROWS):
+    """Yield JSON Lines text in chunks of at most chunk_rows records."""
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_rows))
+        if chunk:
+            yield ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in chunk)
+        if len(chunk) < chunk_rows:
+            return
+
+
+def flatten_batch_record(record):
+    """Turn one diagnose_batch record into CSV rows (one per result; one row if no results)."""
+    base = {
+        'line': record.get('line'),
+        'id': record.get('id'),
+        'symptoms': '; '.join(record.get('symptoms', ())),
+        'unknown_symptoms': '; '.join(record.get('unknown_symptoms', ())),
+        'error': record.get('error'),
+    }
+    results = record.get('results') or []
+    if not results:
+        return [base]
+    rows = []
+    for rank, result in enumerate(results, 1):
+        row = dict(base, rank=rank, **{k: v for k, v in result.items() if k != 'Precautions'})
+        row['Precautions'] = '; '.join(result.get('Precautions', ()))
+        rows.append(row)
+    return rows
@@ -0,0 +1,171 @@
+"""
+Hot reload dataset dan file translasi tanpa restart atau membersihkan cache Streamlit.
+
+SourceWatcher memantau mtime/ukuran file sumber (paling sering sekali per
+CHECK_INTERVAL detik) dan memastikan perubahan lewat hash SHA-256, sehingga
+`touch` tanpa perubahan isi tidak memicu reload. EngineReloader hanya membaca
+ulang file yang berubah, meminta DiagnosisEngine.updated() menerapkan selisihnya
+(index penyakit -> gejala, tabel pencegahan, peta translasi), lalu menukar
+snapshot dengan satu assignment. Sesi yang sedang berjalan tetap memakai
+snapshot lama sampai rerun berikutnya, sehingga tampilannya selalu konsisten.
+
+data/dataset.csv (penanganan, dokter, risiko) tidak memengaruhi engine:
+perubahannya hanya menaikkan details_version, yang dipakai app.py sebagai kunci
+DiseaseKnowledgeStore. assets/med_images.csv dan folder gambar dipantau oleh
+DiseaseImageResolver sendiri (generation ikut menjadi kunci knowledge store).
+"""
+
+import logging
+import os
+import threading
+import time
+
+import engine
+from data_cache import file_sha256, file_state, read_csv_cached
+from knowledge_store import DETAILS_FILE
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 2.0
+
+# File sumber -> field DataSources yang dibaca ulang saat file itu berubah
+SOURCE_FIELDS = {
+    engine.SYMPTOMS_FILE: 'df_symptoms',
+    engine.PRECAUTION_FILE: 'df_precaution',
+    engine.SYMPTOM_TRANSLATION_FILE: 'symptom_translations',
+    engine.PRECAUTION_TRANSLATION_FILE: 'precaution_translations',
+}
+# File yang dipantau tanpa masuk ke engine; perubahannya menaikkan details_version
+DETAIL_FILES = (DETAILS_FILE,)
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _sha256(path):
+    try:
+        return file_sha256(path)
+    except OSError:
+        return None
+
+
+class SourceWatcher:
+    """Poll files for changes: mtime/size first, confirmed by content hash.
+
+    baseline (path -> data_cache.file_state) is the state the caller's data
+    was read from; paths without one are compared against their state now.
+    With a baseline the first poll is not delayed by check_interval.
+    """
+
+    def __init__(self, paths, check_interval=CHECK_INTERVAL, baseline=None):
+        self.paths = list(paths)
+        self.check_interval = check_interval
+        baseline = baseline or {}
+        self._stats, self._hashes = {}, {}
+        for p in self.paths:
+            if p in baseline:
+                state = baseline[p]
+                self._stats[p], self._hashes[p] = (state[:2], state[2]) if state else (None, None)
+            else:
+                self._stats[p], self._hashes[p] = _stat(p), _sha256(p)
+        self._checked = float('-inf') if baseline else time.monotonic()
+
+    def poll(self, force=False):
+        """Return the set of paths whose content changed since the last poll."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return set()
+        self._checked = now
+        changed = set()
+        for path in self.paths:
+            stat = _stat(path)
+            if stat == self._stats[path]:
+                continue
+            self._stats[path] = stat
+            digest = _sha256(path)
+            if digest != self._hashes[path]:
+                self._hashes[path] = digest
+                changed.add(path)
+        return changed
+
+
+def load_changed_sources(current, changed):
+    """DataSources like current, re-reading only the fields whose files changed."""
+    fields = {}
+    errors = []
+    states = dict(current.file_states or {})
+    for path in changed:
+        field = SOURCE_FIELDS[path]
+        states[path] = file_state(path)
+        try:
+            if field in ('df_symptoms', 'df_precaution'):
+                fields[field] = read_csv_cached(path)
+            elif field == 'symptom_translations':
+                fields[field] = engine.load_symptom_translations(path)
+            else:
+                fields[field] = engine.load_precaution_translations(path)
+        except Exception as e:
+            # File setengah tertulis atau rusak: pertahankan data lama, coba lagi pada perubahan berikutnya
+            errors.append(f'Gagal memuat ulang {path}: {e}')
+    return current._replace(errors=errors, file_states=states, **fields)
+
+
+class EngineReloader:
+    """Holds the current DiagnosisEngine snapshot and swaps in an updated one when sources change."""
+
+    def __init__(self, diagnosis, sources, watcher=None, check_interval=CHECK_INTERVAL):
+        # (versi, engine) ditukar sebagai satu tuple agar pembaca tidak melihat versi dan engine yang berbeda
+        self._current = (0, diagnosis)
+        self._sources = sources
+        # Baseline = file seperti saat sources dibaca (bukan saat reloader dibuat): perubahan di antaranya
+        # langsung diterapkan pada poll pertama
+        self.watcher = watcher or SourceWatcher([*SOURCE_FIELDS, *DETAIL_FILES], check_interval,
+                                                baseline=sources.file_states)
+        self.details_version = 0
+        self.last_reload = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def current(self):
+        """(version, engine) after applying any pending source changes; the engine is never mutated."""
+        self.refresh_if_changed()
+        return self._current
+
+    def snapshot(self):
+        return self.current()[1]
+
+    def refresh_if_changed(self, force=False):
+        """Apply changed sources; returns the set of reloaded paths (empty if nothing changed)."""
+        if not self._lock.acquire(blocking=False):
+            # Reload sedang berjalan di thread lain; pakai snapshot yang ada
+            return set()
+        try:
+            changed = self.watcher.poll(force)
+            if not changed:
+                return set()
+            t0 = time.perf_counter()
+            errors = []
+            source_changes = changed & SOURCE_FIELDS.keys()
+            if source_changes:
+                sources = load_changed_sources(self._sources, source_changes)
+                errors = sources.errors
+                version, diagnosis = self._current
+                diagnosis = diagnosis.updated(sources)
+                self._sources = sources._replace(errors=[])
+                self._current = (version + 1, diagnosis)
+            if changed - source_changes:
+                self.details_version += 1
+            self.last_reload = {'paths': sorted(changed), 'seconds': time.perf_counter() - t0,
+                                'time': time.time(), 'errors': errors}
+            logger.info('Reload %s dalam %.3f s', ', '.join(sorted(changed)), self.last_reload['seconds'])
+            return changed
+        finally:
+            self._lock.release()
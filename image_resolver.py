@@ -0,0 +1,132 @@
+"""
+Resolusi gambar penyakit tanpa I/O filesystem per request.
+
+Folder assets/images dipindai sekali menjadi index nama-file -> path, lalu
+digabung dengan mapping assets/med_images.csv (Disease -> ImageFile). Hasil
+resolusi per penyakit, isi file gambar dan placeholder SVG (data URL) di-memo.
+Index dibangun ulang bila mtime folder gambar atau file mapping berubah; mtime
+hanya dicek paling sering sekali per CHECK_INTERVAL detik.
+"""
+
+import functools
+import os
+import threading
+import time
+import urllib.parse
+
+from engine import MED_IMAGE_FILE, load_med_image_map
+
+IMAGES_DIR = os.path.join('assets', 'images')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.svg')
+CHECK_INTERVAL = 5.0
+
+
+def normalize_filename(name: str) -> str:
+    """Lowercase, replace spaces with underscore, remove non-alnum except underscore"""
+    if not isinstance(name, str):
+        return ''
+    fn = name.lower().strip()
+    fn = fn.replace(' ', '_')
+    # keep alnum and underscore
+    fn = ''.join(c for c in fn if c.isalnum() or c == '_')
+    return fn
+
+
+@functools.lru_cache(maxsize=1024)
+def placeholder_data_url(text: str, width=160, height=100):
+    """SVG placeholder (data URL) bertuliskan nama penyakit; dibuat sekali per teks/ukuran."""
+    svg = f"""
+    <svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' viewBox='0 0 {width} {height}'>
+      <defs>
+        <linearGradient id='g' x1='0' x2='1'>
+          <stop stop-color='#667eea' offset='0'/>
+          <stop stop-color='#764ba2' offset='1'/>
+        </linearGradient>
+      </defs>
+      <rect width='100%' height='100%' rx='12' fill='url(#g)' opacity='0.95'/>
+      <text x='50%' y='50%' dominant-baseline='middle' text-anchor='middle' font-family='Segoe UI, Roboto, Arial' font-size='14' fill='white'>{text}</text>
+    </svg>
+    """
+    return 'data:image/svg+xml;utf8,' + urllib.parse.quote(svg)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DiseaseImageResolver:
+    """In-memory disease -> image index, refreshed when the sources change."""
+
+    def __init__(self, images_dir=IMAGES_DIR, map_path=MED_IMAGE_FILE, check_interval=CHECK_INTERVAL):
+        self.images_dir = images_dir
+        self.map_path = map_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # Naik setiap index dibangun ulang; penyimpan turunan (knowledge_store) memakainya sebagai kunci cache
+        self.generation = 0
+        self._scan()
+
+    def _scan(self):
+        self._mtimes = (_mtime(self.images_dir), _mtime(self.map_path))
+        self._checked = time.monotonic()
+        files = {}
+        if os.path.isdir(self.images_dir):
+            with os.scandir(self.images_dir) as entries:
+                files = {e.name: e.path for e in entries if e.is_file()}
+        # Per nama dasar: ekstensi pertama menurut urutan IMAGE_EXTENSIONS
+        by_stem = {}
+        for ext in reversed(IMAGE_EXTENSIONS):
+            for name, path in files.items():
+                if name.endswith(ext):
+                    by_stem[name[:-len(ext)]] = path
+        mapped = {}
+        for disease, path in load_med_image_map(self.map_path).items():
+            if os.path.dirname(os.path.normpath(path)) == os.path.normpath(self.images_dir):
+                path = files.get(os.path.basename(path))
+            elif not os.path.isfile(path):
+                path = None
+            if path:
+                mapped[disease] = path
+        self._by_stem = by_stem
+        self._mapped = mapped
+        self._resolved = {}
+        self._content = {}
+
+    def refresh_if_changed(self):
+        """Re-scan if the images folder or mapping file changed (checked at most every check_interval s)."""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            if (_mtime(self.images_dir), _mtime(self.map_path)) == self._mtimes:
+                return False
+            self._scan()
+            self.generation += 1
+            return True
+
+    def resolve(self, disease_name):
+        """Return path to image: first check mapping, then disease-named file, else None"""
+        if not isinstance(disease_name, str):
+            return None
+        self.refresh_if_changed()
+        resolved = self._resolved
+        if disease_name not in resolved:
+            key = disease_name.strip().lower()
+            resolved[disease_name] = self._mapped.get(key) or self._by_stem.get(normalize_filename(disease_name))
+        return resolved[disease_name]
+
+    def content(self, path):
+        """Image content for st.image (SVG as text, other formats as bytes), read once per path."""
+        content = self._content
+        if path not in content:
+            if path.endswith('.svg'):
+                with open(path, encoding='utf-8') as f:
+                    content[path] = f.read()
+            else:
+                with open(path, 'rb') as f:
+                    content[path] = f.read()
+        return content[path]
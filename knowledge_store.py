@@ -0,0 +1,140 @@
+"""
+Penyimpanan pengetahuan penyakit yang sudah digabung (pre-joined) dari semua dataset.
+
+Informasi penyakit tersebar di beberapa file dengan penulisan nama berbeda:
+    data/DiseaseAndSymptoms.csv     nama penyakit (index gejala)
+    data/Disease precaution.csv     pencegahan (lewat tabel pencegahan engine)
+    data/dataset.csv                obat/penanganan, dokter, tingkat risiko
+    assets/med_images.csv + assets/images   gambar
+
+Nama dinormalisasi sekali (disease_key: huruf kecil, hanya huruf/angka, sehingga
+'Chicken pox' == 'chickenpox' dan 'Common  Cold' == 'common cold') lalu semua
+sumber digabung menjadi satu DiseaseInfo per penyakit. Menampilkan satu hasil
+cukup satu lookup dict.
+"""
+
+import collections
+import os
+import re
+
+import pandas as pd
+
+import metrics
+from data_cache import read_csv_cached
+from engine import translate_precaution
+
+DETAILS_FILE = os.path.join('data', 'dataset.csv')
+
+DiseaseInfo = collections.namedtuple('DiseaseInfo', 'name precautions cures doctors risk_level image')
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+# Potongan daftar dipisah koma yang sebenarnya lanjutan kalimat sebelumnya
+_CONTINUATIONS = ('but ', 'and ', 'which ', 'or ')
+
+
+def disease_key(name):
+    """Normalized lookup key shared by all sources: lowercase letters and digits only."""
+    return _NON_ALNUM.sub('', str(name).lower())
+
+
+def _split_list(value):
+    if not isinstance(value, str) or not value.strip():
+        return ()
+    items = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if items and part.startswith(_CONTINUATIONS):
+            items[-1] = f'{items[-1]}, {part}'
+        else:
+            items.append(part)
+    return tuple(items)
+
+
+def _clean_risk(value):
+    if not isinstance(value, str) or not value.strip():
+        return ''
+    value = value.strip()
+    # Beberapa baris kehilangan kurung tutup, mis. 'low (0.1%'
+    return value + ')' if value.count('(') > value.count(')') else value
+
+
+@metrics.timed('load_disease_details')
+def load_disease_details(path=DETAILS_FILE):
+    """disease_key -> (name, cures, doctors, risk_level) from dataset.csv.
+
+    Duplicate diseases are merged: the first non-empty value of each field wins.
+    """
+    if not os.path.isfile(path):
+        return {}
+    df = read_csv_cached(path, usecols=['disease', 'cures', 'doctor', 'risk level'])
+    details = {}
+    for name, cures, doctors, risk in df.itertuples(index=False, name=None):
+        if pd.isna(name) or not str(name).strip():
+            continue
+        key = disease_key(name)
+        fields = (str(name).strip(), _split_list(cures), _split_list(doctors), _clean_risk(risk))
+        previous = details.get(key)
+        details[key] = fields if previous is None else tuple(p or f for p, f in zip(previous, fields))
+    return details
+
+
+class DiseaseKnowledgeStore:
+    """One DiseaseInfo per normalized disease name, looked up in O(1)."""
+
+    def __init__(self, records):
+        self.records = records
+        # Nama mentah -> record, agar nama yang sama tidak dinormalisasi ulang setiap render
+        self._by_name = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, name):
+        return disease_key(name) in self.records
+
+    def get(self, name):
+        """DiseaseInfo for name; an empty record (only the name) if the disease is unknown."""
+        record = self._by_name.get(name)
+        if record is None:
+            record = self.records.get(disease_key(name))
+            if record is None:
+                return DiseaseInfo(name, (), (), (), '', None)
+            self._by_name[name] = record
+        return record
+
+    @classmethod
+    @metrics.timed('build_knowledge_store')
+    def build(cls, diseases, precaution_table, details=None, translations=None, resolve_image=None):
+        """Join all sources once.
+
+        diseases: display names from the symptom index (their spelling wins);
+        precaution_table: DiagnosisEngine.precaution_table (already translated);
+        details: load_disease_details(); translations: precaution translations
+        applied to cures and doctors; resolve_image: disease name -> image path.
+        """
+        details = load_disease_details() if details is None else details
+        translations = translations or {}
+        names = {}
+        for name in diseases:
+            names.setdefault(disease_key(name), name)
+        for key, (name, *_) in details.items():
+            names.setdefault(key, name)
+        precautions = {}
+        for name, values in precaution_table.items():
+            precautions.setdefault(disease_key(name), values)
+            names.setdefault(disease_key(name), name)
+
+        records = {}
+        for key, name in names.items():
+            _, cures, doctors, risk = details.get(key, (name, (), (), ''))
+            records[key] = DiseaseInfo(
+                name=name,
+                precautions=precautions.get(key, ()),
+                cures=tuple(translate_precaution(c, translations) for c in cures),
+                doctors=tuple(translate_precaution(d, translations) for d in doctors),
+                risk_level=risk,
+                image=resolve_image(name) if resolve_image else None,
+            )
+        return cls(records)
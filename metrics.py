@@ -0,0 +1,226 @@
+"""
+Instrumentasi latensi per tahap (opt-in) dengan output format teks Prometheus.
+
+Aktifkan lewat environment variable:
+    METRICS_ENABLED=1          kumpulkan timing (default mati; stage() jadi no-op)
+    METRICS_PORT=9108          sajikan /metrics di port lokal (thread latar)
+    METRICS_FILE=metrics.prom  tulis ulang file setelah setiap request ('{pid}' -> id proses)
+    METRICS_PROFILE_MS=200     dump cProfile request yang lebih lambat dari ambang ini
+    METRICS_PROFILE_DIR=profiles
+
+Setiap tahap punya histogram (bucket kumulatif), jumlah, total, dan
+p50/p95/p99 dari MAX_SAMPLES observasi terakhir.
+"""
+
+import bisect
+import collections
+import contextlib
+import cProfile
+import functools
+import http.server
+import itertools
+import os
+import threading
+import time
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+MAX_SAMPLES = 2048
+METRIC_PREFIX = 'deteksi'
+
+
+class StageHistogram:
+    """Latency histogram for one stage (seconds)."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.samples = collections.deque(maxlen=MAX_SAMPLES)
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+        self.file_path = None
+        self.profile_threshold_ms = None
+        self.profile_dir = 'profiles'
+        self._profile_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = StageHistogram()
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def stage(self, name):
+        """Context manager timing one stage; a shared no-op when metrics are disabled."""
+        if not self.enabled:
+            return _NOOP
+        return self._timed(name)
+
+    def timed(self, name):
+        """Decorator: time every call of the function as stage name."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextlib.contextmanager
+    def request(self, name, profile=True):
+        """Time a whole request as stage name; profile it and write METRICS_FILE if configured.
+
+        Pass profile=False when the work runs on another thread, and wrap that
+        work in profile() instead (cProfile only sees the thread it runs on).
+        """
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            with self.profile(name) if profile else _NOOP:
+                yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+            if self.file_path:
+                self.write_file(self.file_path)
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """cProfile the block on the current thread; dump it if slower than METRICS_PROFILE_MS.
+
+        At most one block is profiled at a time per process: overlapping
+        requests (other threads or sessions) run unprofiled instead of stacking
+        profilers, which Python 3.12+ rejects.
+        """
+        if not self.enabled or self.profile_threshold_ms is None or not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Profiler lain (mis. debugger atau coverage) sedang aktif
+                profiler = None
+            t0 = time.perf_counter()
+            try:
+                yield
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    elapsed = time.perf_counter() - t0
+                    if elapsed * 1000 > self.profile_threshold_ms:
+                        self._dump_profile(profiler, name, elapsed)
+        finally:
+            self._profile_lock.release()
+
+    def _dump_profile(self, profiler, name, elapsed):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.profile_dir, f'{name}-{stamp}-{os.getpid()}-{next(self._profile_ids)}-{elapsed * 1000:.0f}ms.prof')
+        profiler.dump_stats(path)
+
+    def render_prometheus(self):
+        """Prometheus text exposition of all stages."""
+        with self._lock:
+            snapshot = {name: (list(h.bucket_counts), h.count, h.total, h.quantiles())
+                        for name, h in sorted(self.stages.items())}
+        seconds = f'{METRIC_PREFIX}_stage_seconds'
+        quantile = f'{METRIC_PREFIX}_stage_latency_seconds'
+        lines = [f'# HELP {seconds} Latency per stage.', f'# TYPE {seconds} histogram']
+        for name, (buckets, count, total, _) in snapshot.items():
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float('inf'),), buckets):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{seconds}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{seconds}_sum{{stage="{name}"}} {total!r}')
+            lines.append(f'{seconds}_count{{stage="{name}"}} {count}')
+        lines += [f'# HELP {quantile} Recent latency quantiles per stage.', f'# TYPE {quantile} gauge']
+        for name, (_, _, _, quantiles) in snapshot.items():
+            for q, value in quantiles.items():
+                lines.append(f'{quantile}{{stage="{name}",quantile="{q}"}} {value!r}')
+        return '\n'.join(lines) + '\n'
+
+    def write_file(self, path):
+        """Atomically rewrite path ('{pid}' in the name is replaced by the process id)."""
+        path = path.format(pid=os.getpid())
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def start_http_server(self, port, host='127.0.0.1'):
+        """Serve GET /metrics from a daemon thread; returns the server."""
+        registry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def configure_from_env(self, environ=None, serve=True):
+        """Apply METRICS_* variables; returns the /metrics server if one was started."""
+        environ = os.environ if environ is None else environ
+        self.enabled = environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+        if not self.enabled:
+            return None
+        self.file_path = environ.get('METRICS_FILE') or None
+        threshold = environ.get('METRICS_PROFILE_MS')
+        self.profile_threshold_ms = float(threshold) if threshold else None
+        self.profile_dir = environ.get('METRICS_PROFILE_DIR', self.profile_dir)
+        port = environ.get('METRICS_PORT')
+        if serve and port:
+            return self.start_http_server(int(port))
+        return None
+
+
+_NOOP = contextlib.nullcontext()
+
+REGISTRY = MetricsRegistry()
+stage = REGISTRY.stage
+timed = REGISTRY.timed
+request = REGISTRY.request
+profile = REGISTRY.profile
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+CLI batch: alirkan set gejala dalam format JSONL melalui mesin prediksi.
+
+    python predict_cli.py input.jsonl -o hasil.jsonl --top-k 5 --workers 4
+    cat input.jsonl | python predict_cli.py > hasil.jsonl
+
+Setiap baris input berupa list gejala (["itching", "skin_rash"]) atau objek
+{"id": ..., "symptoms": [...]}. Setiap baris output adalah hasil diagnosis
+dalam urutan yang sama. Baris diproses per batch (satu perkalian matriks per
+batch) dan ditulis segera, sehingga file sebesar apa pun tidak dimuat utuh.
+Dengan --format csv output berupa CSV (satu baris per query x penyakit) yang
+juga ditulis per potongan.
+"""
+
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import sys
+
+import exports
+import metrics
+from engine import DiagnosisEngine
+from scoring import SCORE_MODES
+
+DEFAULT_BATCH_SIZE = 256
+
+_ENGINE = None
+
+
+def _init_worker(use_augmented, with_model):
+    # Dengan fork, engine dari proses induk sudah tersedia (copy-on-write)
+    global _ENGINE
+    metrics.REGISTRY.configure_from_env(serve=False)
+    if _ENGINE is None:
+        _ENGINE = DiagnosisEngine.load(use_augmented=use_augmented, with_model=with_model)
+
+
+def parse_line(line):
+    """Return (id, symptoms) or raise ValueError for a malformed line."""
+    record = json.loads(line)
+    if isinstance(record, list):
+        record_id, symptoms = None, record
+    elif isinstance(record, dict):
+        record_id, symptoms = record.get('id'), record.get('symptoms')
+    else:
+        raise ValueError('baris harus berupa list atau objek')
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        raise ValueError('symptoms harus berupa list string')
+    return record_id, symptoms
+
+
+def process_batch(batch, top_k=5, mode='ratio'):
+    """Diagnose one batch of (line_no, raw_line) pairs; returns output records in input order."""
+    with metrics.request('cli_batch'):
+        return _process_batch(batch, top_k, mode)
+
+
+def _process_batch(batch, top_k, mode):
+    parsed, out = [], {}
+    for line_no, line in batch:
+        try:
+            parsed.append((line_no, *parse_line(line)))
+        except ValueError as e:
+            out[line_no] = {'line': line_no, 'error': str(e)}
+    diagnoses = _ENGINE.diagnose_batch([symptoms for _, _, symptoms in parsed], top_k=top_k, mode=mode)
+    for (line_no, record_id, _), diagnosis in zip(parsed, diagnoses):
+        record = {'line': line_no}
+        if record_id is not None:
+            record['id'] = record_id
+        record.update(diagnosis)
+        out[line_no] = record
+    return [out[line_no] for line_no, _ in batch]
+
+
+def iter_batches(stream, batch_size):
+    lines = ((n, line) for n, line in enumerate(stream, 1) if line.strip())
+    while True:
+        batch = list(itertools.islice(lines, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_records(stream, top_k=5, batch_size=DEFAULT_BATCH_SIZE, workers=1, use_augmented=False, with_model=True,
+                 mode='ratio'):
+    """Yield output records in input order, one batch at a time."""
+    if workers <= 1:
+        for batch in iter_batches(stream, batch_size):
+            yield from process_batch(batch, top_k, mode)
+        return
+
+    # Jendela tugas terbatas: input dibaca hanya secepat output ditulis
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(use_augmented, with_model)) as pool:
+        pending = collections.deque()
+        for batch in iter_batches(stream, batch_size):
+            pending.append(pool.apply_async(process_batch, (batch, top_k, mode)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def run(stream, out, top_k=5, batch_size=DEFAULT_BATCH_SIZE, workers=1, use_augmented=False, with_model=True,
+        output_format='jsonl', mode='ratio'):
+    """Stream JSONL from stream to out (JSONL or CSV); returns the number of records written."""
+    global _ENGINE
+    metrics.REGISTRY.configure_from_env()
+    _ENGINE = DiagnosisEngine.load(use_augmented=use_augmented, with_model=with_model)
+    for error in _ENGINE.errors:
+        print(f'⚠️ {error}', file=sys.stderr)
+
+    written = 0
+
+    def counted(records):
+        nonlocal written
+        for record in records:
+            written += 1
+            yield record
+
+    records = counted(iter_records(stream, top_k, batch_size, workers, use_augmented, with_model, mode))
+    if output_format == 'csv':
+        rows = (row for record in records for row in exports.flatten_batch_record(record))
+        chunks = exports.iter_csv_chunks(rows, exports.BATCH_CSV_COLUMNS, chunk_rows=batch_size)
+    else:
+        chunks = exports.iter_jsonl_chunks(records, chunk_rows=batch_size)
+    for chunk in chunks:
+        out.write(chunk)
+        out.flush()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prediksi penyakit batch dari file JSONL')
+    parser.add_argument('input', nargs='?', default='-', help="file JSONL input ('-' untuk stdin)")
+    parser.add_argument('-o', '--output', default='-', help="file JSONL output ('-' untuk stdout)")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl', help='format output (default jsonl)')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--score-mode', choices=SCORE_MODES, default='ratio',
+                        help="'ratio' (cocok/total) atau 'weighted' (bobot IDF)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help='jumlah proses worker')
+    parser.add_argument('--augmented', action='store_true', help='gunakan katalog penyakit augmented')
+    parser.add_argument('--no-model', action='store_true', help='jangan muat model RandomForest')
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        n = run(stream, out, top_k=args.top_k, batch_size=args.batch_size, workers=args.workers,
+                use_augmented=args.augmented, with_model=not args.no_model, output_format=args.format, mode=args.score_mode)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f'✅ Selesai: {n:,} baris diproses', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+"""
+Praproses paralel dan dapat dilanjutkan untuk dataset augmented one-hot.
+
+    python preprocess.py                       # semua sumber augmented di data/
+    python preprocess.py data/Final_Augmented_dataset_Diseases_and_Symptoms.csv --workers 8
+
+File CSV dibagi menjadi shard berdasarkan rentang byte (SHARD_BYTES, batas
+digeser ke akhir baris) dan setiap shard diproses oleh proses terpisah:
+baris one-hot disimpan sebagai matriks sparse CSR (indptr/indices) plus kode
+label penyakit dalam satu file .npz. Folder output berisi:
+
+    manifest.json     sumber, rentang byte, jumlah baris dan checksum per shard
+    vocabulary.json   kolom gejala, nama kanonik dan jumlah kemunculannya
+    shard_NNNNN.npz
+
+Manifest ditulis ulang setiap kali satu shard selesai. Saat dijalankan lagi,
+shard yang rentang byte sumbernya dan file outputnya masih cocok dengan
+checksum di manifest dilewati, sehingga hanya shard yang berubah atau belum
+ada yang diproses ulang. Asumsi: tidak ada field CSV berkutip yang memuat
+baris baru (benar untuk dataset one-hot ini).
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from augmented_data import DISEASE_COLUMN, canonical_symptom, find_augmented_sources, read_augmented_header
+from data_cache import CACHE_DIR, cache_path_for, file_sha256
+
+PREPROCESS_VERSION = 1
+SHARD_BYTES = 16 << 20
+MANIFEST_FILE = 'manifest.json'
+VOCABULARY_FILE = 'vocabulary.json'
+
+
+def shard_dir_for(path, cache_dir=CACHE_DIR):
+    """Folder output praproses untuk satu file sumber."""
+    return cache_path_for(path, cache_dir) + '.shards'
+
+
+def _header_end(path):
+    with open(path, 'rb') as f:
+        f.readline()
+        return f.tell()
+
+
+def shard_ranges(path, shard_bytes=SHARD_BYTES):
+    """Split the data rows of path into [start, end) byte ranges ending on line boundaries."""
+    size = os.path.getsize(path)
+    start = _header_end(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + shard_bytes, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _atomic_write_json(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == PREPROCESS_VERSION else None
+
+
+def process_shard(task):
+    """Worker: convert one byte range into shard_NNNNN.npz, or skip it if checksums still match.
+
+    Returns the shard's manifest entry plus its per-symptom counts.
+    """
+    path, index, start, end, header, out_dir, previous = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    source_sha256 = hashlib.sha256(data).hexdigest()
+    file_name = f'shard_{index:05d}.npz'
+    out_path = os.path.join(out_dir, file_name)
+
+    if (previous and previous.get('source_sha256') == source_sha256 and previous.get('start') == start
+            and os.path.isfile(out_path) and file_sha256(out_path) == previous.get('file_sha256')):
+        with np.load(out_path, allow_pickle=False) as shard:
+            counts = shard['symptom_counts']
+        return dict(previous, skipped=True), counts
+
+    symptom_cols = [c for c in header if c != DISEASE_COLUMN]
+    dtype = {c: np.uint8 for c in symptom_cols}
+    dtype[DISEASE_COLUMN] = str
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header, dtype=dtype, encoding='utf-8')
+    df = df[df[DISEASE_COLUMN].notna()]
+    values = df[symptom_cols].to_numpy(dtype=np.uint8)
+    label_codes, labels = pd.factorize(df[DISEASE_COLUMN].str.strip())
+
+    rows, cols = np.nonzero(values)
+    indptr = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(values)), out=indptr[1:])
+    index_dtype = np.uint16 if len(symptom_cols) <= np.iinfo(np.uint16).max else np.int32
+    counts = np.bincount(cols, minlength=len(symptom_cols)).astype(np.int64)
+
+    tmp_path = out_path + '.tmp.npz'
+    np.savez(tmp_path, indptr=indptr, indices=cols.astype(index_dtype),
+             labels=label_codes.astype(np.int32), label_names=np.array(list(labels), dtype=str),
+             symptom_counts=counts)
+    os.replace(tmp_path, out_path)
+    entry = {
+        'index': index,
+        'start': start,
+        'end': end,
+        'rows': int(len(values)),
+        'nonzero': int(len(cols)),
+        'source_sha256': source_sha256,
+        'file': file_name,
+        'file_sha256': file_sha256(out_path),
+    }
+    return dict(entry, skipped=False), counts
+
+
+def preprocess(path, cache_dir=CACHE_DIR, shard_bytes=SHARD_BYTES, workers=None, force=False, log=print):
+    """Shard path in parallel; returns the manifest. Unchanged shards are reused unless force."""
+    out_dir = shard_dir_for(path, cache_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    header = read_augmented_header(path)
+    symptom_cols = [c for c in header if c != DISEASE_COLUMN]
+    stat = os.stat(path)
+
+    previous = None if force else read_manifest(out_dir)
+    if previous and (previous.get('header') != header or previous.get('shard_bytes') != shard_bytes):
+        previous = None
+    previous_shards = {s['index']: s for s in (previous or {}).get('shards', [])}
+
+    ranges = shard_ranges(path, shard_bytes)
+    tasks = [(path, i, start, end, header, out_dir, previous_shards.get(i)) for i, (start, end) in enumerate(ranges)]
+    manifest = {
+        'version': PREPROCESS_VERSION,
+        'source': {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+        'label_column': DISEASE_COLUMN,
+        'header': header,
+        'shard_bytes': shard_bytes,
+        'complete': False,
+        'shards': [],
+    }
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    counts = np.zeros(len(symptom_cols), dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    done = {}
+    with multiprocessing.Pool(min(workers, max(1, len(tasks)))) as pool:
+        for entry, shard_counts in pool.imap_unordered(process_shard, tasks):
+            skipped = entry.pop('skipped')
+            done[entry['index']] = entry
+            counts += shard_counts
+            manifest['shards'] = [done[i] for i in sorted(done)]
+            _atomic_write_json(manifest_path, manifest)
+            log(f"Shard {entry['index'] + 1}/{len(tasks)}: {entry['rows']:,} baris"
+                + (' (tidak berubah, dilewati)' if skipped else ''))
+
+    # Shard sisa dari versi sumber yang lebih panjang
+    for name in os.listdir(out_dir):
+        if name.startswith('shard_') and name.endswith('.npz') and int(name[6:11]) >= len(tasks):
+            os.remove(os.path.join(out_dir, name))
+
+    _atomic_write_json(os.path.join(out_dir, VOCABULARY_FILE), {
+        'columns': symptom_cols,
+        'canonical': [canonical_symptom(c) for c in symptom_cols],
+        'counts': counts.tolist(),
+    })
+    manifest['source']['sha256'] = file_sha256(path)
+    manifest['rows'] = sum(s['rows'] for s in manifest['shards'])
+    manifest['complete'] = True
+    _atomic_write_json(manifest_path, manifest)
+    return manifest
+
+
+def load_fresh_manifest(path, cache_dir=CACHE_DIR):
+    """Manifest for path if preprocessing completed and the source size/mtime still match, else None."""
+    manifest = read_manifest(shard_dir_for(path, cache_dir))
+    if not manifest or not manifest.get('complete'):
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    source = manifest['source']
+    if source.get('size') != stat.st_size or source.get('mtime_ns') != stat.st_mtime_ns:
+        return None
+    return manifest
+
+
+def iter_shard_chunks(path, manifest, cache_dir=CACHE_DIR):
+    """Yield (symptom_columns, diseases, uint8 values) per shard, like augmented_data._iter_csv_chunks."""
+    out_dir = shard_dir_for(path, cache_dir)
+    symptom_cols = [c for c in manifest['header'] if c != manifest['label_column']]
+    for entry in manifest['shards']:
+        with np.load(os.path.join(out_dir, entry['file']), allow_pickle=False) as shard:
+            indptr, indices = shard['indptr'], shard['indices']
+            label_names = shard['label_names'].astype(object)
+            diseases = label_names[shard['labels']]
+        values = np.zeros((len(indptr) - 1, len(symptom_cols)), dtype=np.uint8)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        values[rows, indices] = 1
+        yield symptom_cols, diseases, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Praproses paralel dataset augmented menjadi shard biner')
+    parser.add_argument('sources', nargs='*', help='file CSV augmented (default: semua sumber di data/)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--shard-mb', type=float, default=SHARD_BYTES / (1 << 20), help='ukuran shard (MB)')
+    parser.add_argument('--workers', type=int, default=None, help='jumlah proses (default: semua core)')
+    parser.add_argument('--force', action='store_true', help='proses ulang semua shard')
+    args = parser.parse_args()
+
+    sources = args.sources or find_augmented_sources()
+    if not sources:
+        print('Tidak ada dataset augmented yang ditemukan.')
+        return
+    for path in sources:
+        t0 = time.perf_counter()
+        print(f'Memproses: {path}')
+        manifest = preprocess(path, cache_dir=args.cache_dir, shard_bytes=int(args.shard_mb * (1 << 20)),
+                              workers=args.workers, force=args.force)
+        print(f"✅ Selesai: {len(manifest['shards'])} shard, {manifest['rows']:,} baris "
+              f"({time.perf_counter() - t0:.1f} s) -> {shard_dir_for(path, args.cache_dir)}")
+
+
+if __name__ == '__main__':
+    main()
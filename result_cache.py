@@ -0,0 +1,112 @@
+"""
+Cache LRU untuk hasil prediksi per kombinasi gejala.
+
+Kunci cache adalah tuple terurut dari frozenset token gejala, sehingga urutan
+centang dan duplikat tidak berpengaruh. Setiap entri menyimpan daftar
+matching_diseases yang sudah terurut, top-k model dan payload ekspor
+(xlsx/csv/json/txt) yang dibuat saat pertama kali diminta.
+"""
+
+import collections
+import threading
+import time
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL = 3600.0
+
+
+def cache_key(symptoms):
+    """Canonical key: sorted tuple of the distinct symptom tokens."""
+    return tuple(sorted(frozenset(str(s) for s in symptoms)))
+
+
+class CachedResult:
+    """One ranked result plus its memoized export payloads."""
+
+    def __init__(self, matching_diseases, model_top_k=None):
+        self.matching_diseases = matching_diseases
+        self.model_top_k = model_top_k
+        self.created = time.monotonic()
+        self._exports = {}
+        self._lock = threading.Lock()
+
+    def export(self, fmt, build):
+        """Return the payload for fmt, calling build(matching_diseases) only the first time."""
+        with self._lock:
+            if fmt not in self._exports:
+                self._exports[fmt] = build(self.matching_diseases)
+            return self._exports[fmt]
+
+
+class ResultCache:
+    """Thread-safe LRU of CachedResult with optional TTL (seconds, None = tanpa kedaluwarsa)."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = max(0, int(maxsize))
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    def get(self, symptoms):
+        """Return the CachedResult for symptoms or None (counts a hit or a miss)."""
+        key = cache_key(symptoms)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, time.monotonic()):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, symptoms, matching_diseases, model_top_k=None):
+        entry = CachedResult(matching_diseases, model_top_k)
+        if self.maxsize == 0:
+            return entry
+        key = cache_key(symptoms)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def get_or_compute(self, symptoms, compute):
+        """Cached entry for symptoms; on a miss compute() -> (matching_diseases, model_top_k) is stored."""
+        entry = self.get(symptoms)
+        if entry is None:
+            matching_diseases, model_top_k = compute()
+            entry = self.put(symptoms, matching_diseases, model_top_k)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
@@ -0,0 +1,300 @@
+"""
+Mesin skor gejala berbasis matriks sparse (CSR).
+
+Setiap penyakit adalah satu baris matriks biner penyakit x gejala, sehingga satu
+perkalian matriks-vektor menghasilkan jumlah gejala cocok untuk semua penyakit
+sekaligus. Ranking identik dengan loop set-intersection di app.py: skor
+menurun, seri diurutkan berdasarkan urutan penyakit di index.
+
+Mode skor:
+    'ratio'     gejala cocok / total gejala penyakit (perilaku asli)
+    'weighted'  seperti ratio, tetapi setiap gejala diberi bobot IDF
+                log((1 + D) / (1 + df)) + 1 (df = jumlah penyakit yang memiliki
+                gejala itu), sehingga gejala spesifik lebih berpengaruh daripada
+                gejala umum seperti 'fatigue'.
+
+LiveRanking menyimpan skor berjalan satu sesi: menambah/menghapus satu gejala
+hanya memperbarui penyakit di posting list gejala itu, dan top-k dipilih dengan
+heap tanpa mengurutkan semua penyakit yang cocok.
+
+to_arrays/from_arrays mengubah matriks menjadi array numpy biasa (tanpa dtype
+object) dan sebaliknya tanpa menyalin, sehingga matriks dapat dibagi antar
+proses lewat file yang di-memory-map (shared_index.py).
+"""
+
+import heapq
+
+import numpy as np
+from scipy import sparse
+
+from array_views import VocabularyIds
+
+SCORE_MODES = ('ratio', 'weighted')
+
+
+def _csr(data, indices, indptr, shape):
+    # Tanpa salinan: array dari file yang di-memory-map tetap dipakai apa adanya (read-only)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+    matrix.has_sorted_indices = True
+    return matrix
+
+
+class SymptomMatrix:
+    """Disease x symptom CSR matrix used to score one or many symptom queries."""
+
+    def __init__(self, disease_symptoms, vocabulary=None):
+        # disease_symptoms: dict penyakit -> iterable gejala (urutan dict = urutan tie-break)
+        self.diseases = list(disease_symptoms)
+        if vocabulary is None:
+            vocabulary = set()
+            for symptoms in disease_symptoms.values():
+                vocabulary.update(symptoms)
+        self.vocabulary = np.array(sorted(vocabulary), dtype=object)
+        self.symptom_ids = {s: i for i, s in enumerate(self.vocabulary)}
+
+        indptr = [0]
+        indices = []
+        for disease in self.diseases:
+            ids = sorted({self.symptom_ids[s] for s in disease_symptoms[disease] if s in self.symptom_ids})
+            indices.extend(ids)
+            indptr.append(len(indices))
+        indices = np.asarray(indices, dtype=np.int32)
+        indptr = np.asarray(indptr, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.int32)
+        self.matrix = sparse.csr_matrix(
+            (data, indices, indptr), shape=(len(self.diseases), len(self.vocabulary))
+        )
+        self.totals = np.diff(indptr).astype(np.int32)
+
+        # Bobot IDF per gejala dan total bobot per penyakit, dihitung sekali
+        document_frequency = np.bincount(indices, minlength=len(self.vocabulary))
+        self.weights = np.log((1 + len(self.diseases)) / (1 + document_frequency)) + 1
+        self.weighted_totals = np.asarray(self.weighted_matrix.sum(axis=1)).ravel()
+        self._postings = None
+        self._weighted_postings = None
+
+    def to_arrays(self):
+        """All state as plain (non-object) numpy arrays; see from_arrays."""
+        postings = self.postings
+        return {
+            'diseases': np.array([str(d) for d in self.diseases], dtype=str),
+            'vocabulary': np.array([str(s) for s in self.vocabulary], dtype=str),
+            'indptr': self.matrix.indptr,
+            'indices': self.matrix.indices,
+            'data': self.matrix.data,
+            'totals': self.totals,
+            'weights': self.weights,
+            'weighted_totals': self.weighted_totals,
+            'postings_indptr': postings.indptr,
+            'postings_indices': postings.indices,
+            'postings_data': postings.data,
+            'weighted_postings_data': self.weighted_postings.data,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a matrix around the arrays of to_arrays without copying them (memory-mapped arrays stay shared)."""
+        self = cls.__new__(cls)
+        self.diseases = arrays['diseases']
+        self.vocabulary = arrays['vocabulary']
+        self.symptom_ids = VocabularyIds(self.vocabulary)
+        shape = (len(self.diseases), len(self.vocabulary))
+        self.matrix = _csr(arrays['data'], arrays['indices'], arrays['indptr'], shape)
+        self.totals = arrays['totals']
+        self.weights = arrays['weights']
+        self.weighted_totals = arrays['weighted_totals']
+        self._postings = _csr(arrays['postings_data'], arrays['postings_indices'], arrays['postings_indptr'],
+                              shape[::-1])
+        self._weighted_postings = _csr(arrays['weighted_postings_data'], arrays['postings_indices'],
+                                       arrays['postings_indptr'], shape[::-1])
+        return self
+
+    @property
+    def postings(self):
+        """Symptom x disease CSR matrix: row j lists (in disease order) the diseases having symptom j."""
+        if self._postings is None:
+            self._postings = self.matrix.T.tocsr()
+            self._postings.sort_indices()
+        return self._postings
+
+    @property
+    def weighted_matrix(self):
+        """Disease x symptom CSR holding each symptom's IDF weight (built on demand)."""
+        return _csr(self.weights[self.matrix.indices], self.matrix.indices, self.matrix.indptr, self.matrix.shape)
+
+    @property
+    def weighted_postings(self):
+        """Like postings, with each symptom row holding that symptom's IDF weight."""
+        if self._weighted_postings is None:
+            postings = self.postings
+            data = np.repeat(self.weights, np.diff(postings.indptr))
+            self._weighted_postings = _csr(data, postings.indices, postings.indptr, postings.shape)
+        return self._weighted_postings
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def encode(self, queries):
+        """Encode a list of symptom collections as a (n_queries x n_symptoms) 0/1 CSR matrix.
+
+        Unknown symptoms are ignored and duplicates inside one query count once.
+        """
+        indptr = [0]
+        indices = []
+        for query in queries:
+            ids = sorted({self.symptom_ids[s] for s in query if s in self.symptom_ids})
+            indices.extend(ids)
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(queries), len(self.vocabulary)),
+        )
+
+    def _score_encoded(self, q, mode='ratio'):
+        if mode not in SCORE_MODES:
+            raise ValueError(f'Mode skor tidak dikenal: {mode!r} (pilih {", ".join(SCORE_MODES)})')
+        # q @ postings (gejala x penyakit, CSR) = q @ matrix.T tanpa konversi CSC -> CSR per panggilan
+        counts = (q @ self.postings).toarray()
+        if mode == 'weighted':
+            numerator, denominator = (q @ self.weighted_postings).toarray(), self.weighted_totals
+        else:
+            numerator, denominator = counts, self.totals
+        scores = np.divide(
+            numerator, denominator, out=np.zeros(counts.shape, dtype=np.float64), where=denominator > 0
+        )
+        return counts, scores
+
+    def score_batch(self, queries, mode='ratio'):
+        """Return (counts, scores) as dense (n_queries x n_diseases) arrays for all queries at once."""
+        return self._score_encoded(self.encode(queries), mode)
+
+    def score(self, selected_symptoms, mode='ratio'):
+        """Return (counts, totals, scores) arrays over all diseases for a single query."""
+        counts, scores = self.score_batch([selected_symptoms], mode)
+        return counts[0], self.totals, scores[0]
+
+    def _rank_row(self, counts, scores, query_mask):
+        hit = np.flatnonzero((counts > 0) & (self.totals > 0))
+        # Skor menurun, seri mengikuti urutan penyakit (sort stabil)
+        hit = hit[np.argsort(-scores[hit], kind='stable')]
+        indptr, indices = self.matrix.indptr, self.matrix.indices
+        ranked = []
+        for i in hit:
+            row_ids = indices[indptr[i]:indptr[i + 1]]
+            matched = self.vocabulary[row_ids[query_mask[row_ids]]]
+            ranked.append((
+                str(self.diseases[i]),
+                int(counts[i]),
+                int(self.totals[i]),
+                float(scores[i]),
+                tuple(matched),
+            ))
+        return ranked
+
+    def rank_batch(self, queries, mode='ratio'):
+        """Rank diseases for many queries in one matrix product.
+
+        Returns one list per query of (disease, matched_count, total_count,
+        score, matched_symptoms) tuples, sorted by score descending; score is
+        matched/total for mode='ratio' and the IDF-weighted ratio for 'weighted'.
+        """
+        queries = [list(q) for q in queries]
+        q = self.encode(queries)
+        counts, scores = self._score_encoded(q, mode)
+        results = []
+        for row in range(len(queries)):
+            query_mask = np.zeros(len(self.vocabulary), dtype=bool)
+            query_mask[q.indices[q.indptr[row]:q.indptr[row + 1]]] = True
+            results.append(self._rank_row(counts[row], scores[row], query_mask))
+        return results
+
+    def rank(self, selected_symptoms, mode='ratio'):
+        """Rank diseases for a single symptom query (see rank_batch)."""
+        return self.rank_batch([selected_symptoms], mode)[0]
+
+
+class LiveRanking:
+    """Incremental ranking for one session's changing symptom selection.
+
+    Keeps the matched symptom ids per disease; add/remove only rescore the
+    diseases in that symptom's posting list. top_k returns the same tuples,
+    scores and tie order as SymptomMatrix.rank.
+    """
+
+    def __init__(self, matrix, mode='ratio'):
+        if mode not in SCORE_MODES:
+            raise ValueError(f'Mode skor tidak dikenal: {mode!r} (pilih {", ".join(SCORE_MODES)})')
+        self.matrix = matrix
+        self.mode = mode
+        self.selected = set()
+        self._matched = {}  # baris penyakit -> set id gejala yang cocok
+        self._scores = {}   # baris penyakit -> skor (hanya penyakit dengan >= 1 gejala cocok)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _diseases(self, symptom_id):
+        postings = self.matrix.postings
+        return postings.indices[postings.indptr[symptom_id]:postings.indptr[symptom_id + 1]].tolist()
+
+    def _rescore(self, i):
+        matched = self._matched[i]
+        if not matched:
+            del self._matched[i]
+            del self._scores[i]
+        elif self.mode == 'weighted':
+            # Dijumlah urut id gejala, sama dengan urutan perkalian sparse di _score_encoded
+            numerator = 0.0
+            for j in sorted(matched):
+                numerator += float(self.matrix.weights[j])
+            self._scores[i] = numerator / self.matrix.weighted_totals[i]
+        else:
+            self._scores[i] = len(matched) / self.matrix.totals[i]
+
+    def add(self, symptom):
+        """Select symptom; returns the number of diseases rescored."""
+        if symptom in self.selected:
+            return 0
+        self.selected.add(symptom)
+        j = self.matrix.symptom_ids.get(symptom)
+        if j is None:
+            return 0
+        diseases = self._diseases(j)
+        for i in diseases:
+            self._matched.setdefault(i, set()).add(j)
+            self._rescore(i)
+        return len(diseases)
+
+    def remove(self, symptom):
+        """Deselect symptom; returns the number of diseases rescored."""
+        if symptom not in self.selected:
+            return 0
+        self.selected.discard(symptom)
+        j = self.matrix.symptom_ids.get(symptom)
+        if j is None:
+            return 0
+        diseases = self._diseases(j)
+        for i in diseases:
+            self._matched[i].discard(j)
+            self._rescore(i)
+        return len(diseases)
+
+    def sync(self, symptoms):
+        """Apply only the difference between the current selection and symptoms."""
+        symptoms = set(symptoms)
+        for symptom in self.selected - symptoms:
+            self.remove(symptom)
+        for symptom in symptoms - self.selected:
+            self.add(symptom)
+
+    def _ranked(self, i):
+        matched = self.matrix.vocabulary[sorted(self._matched[i])]
+        return (str(self.matrix.diseases[i]), len(self._matched[i]), int(self.matrix.totals[i]),
+                float(self._scores[i]), tuple(matched))
+
+    def top_k(self, k=5):
+        """Best k (disease, matched_count, total_count, score, matched_symptoms) tuples via heap selection."""
+        best = heapq.nsmallest(k, self._scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self._ranked(i) for i, _ in best]
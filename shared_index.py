@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+"""
+Index diagnosis yang dibagi antar proses worker lewat file .npy yang di-memory-map.
+
+Satu bundle berisi seluruh index DiagnosisEngine sebagai array string/offset
+(tanpa dtype object): matriks CSR penyakit x gejala beserta posting list dan
+bobot IDF (SymptomMatrix.to_arrays, sekaligus sumber penyakit -> gejala dan
+gejala -> penyakit), nama tampilan -> token, kunci kanonik -> token, daftar
+pencegahan per penyakit dan index pencarian gejala. Bundle ditulis sekali ke
+cache/shared_index/<katalog>-<kunci>/; worker lain memetakannya read-only
+(np.load(mmap_mode='r')) dan memakai view dari array_views.py, tanpa membangun
+pola, index atau tabel dari DataFrame. Halaman memorinya ada satu kali di page
+cache OS dan dipakai bersama oleh semua worker Streamlit, API maupun CLI.
+
+Kunci bundle adalah hash isi input engine (DataFrame gejala dan pencegahan,
+kedua translasi, katalog augmented), sehingga worker dapat menemukan bundle
+tanpa membangun index lebih dulu dan data yang berubah (mis. hot reload)
+otomatis memakai bundle baru. Setelah bundle baru terbit, bundle lebih lama
+dari katalog yang sama dihapus (proses yang masih memetakannya tetap aman: di
+POSIX isi file bertahan sampai mmap ditutup). Pembagian ini mati secara
+default; aktifkan dengan SHARED_INDEX=1, dan bangun bundle di muka saat deploy:
+
+    python shared_index.py [--augmented]
+"""
+
+import argparse
+import collections
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from array_views import RowList, RowMap, StringList, StringMap, offset_arrays, string_array
+from augmented_data import find_augmented_sources
+from data_cache import CACHE_DIR
+from scoring import SymptomMatrix
+from symptom_search import SymptomSearchIndex
+
+logger = logging.getLogger(__name__)
+
+SHARED_DIR = os.path.join(CACHE_DIR, 'shared_index')
+SHARED_VERSION = 3
+META_FILE = 'meta.json'
+# Folder .tmp-* sisa proses yang mati di tengah publish dihapus setelah selama ini (detik)
+STALE_TMP_SECONDS = 3600
+
+
+def shared_index_enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get('SHARED_INDEX', '').lower() in ('1', 'true', 'yes')
+
+
+# Index yang dipetakan dari bundle; field-nya menggantikan atribut DiagnosisEngine dengan nama yang sama
+SharedIndex = collections.namedtuple(
+    'SharedIndex', 'matrix disease_symptoms symptom_postings symptoms_clean all_symptoms_sorted canonical_tokens '
+                   'precaution_table search_index')
+
+
+def index_key(df_symptoms, df_precaution, symptom_translations, precaution_translations,
+              use_augmented=False, augmented_catalogue=None):
+    """Content hash of everything a DiagnosisEngine index is built from (the bundle name).
+
+    Without an explicit augmented catalogue the augmented source files count
+    by path, size and mtime, so no worker has to load them to find the bundle.
+    """
+    h = hashlib.sha256(f'shared-index-v{SHARED_VERSION}'.encode())
+    for df in (df_symptoms, df_precaution):
+        h.update('\x1f'.join(map(str, df.columns)).encode('utf-8') + b'\x1d')
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    for translations in (symptom_translations, precaution_translations):
+        h.update(repr(sorted(translations.items(), key=lambda item: item[0])).encode('utf-8'))
+    if use_augmented:
+        if augmented_catalogue is None:
+            for path in find_augmented_sources():
+                st = os.stat(path)
+                h.update(f'{path}\x1f{st.st_size}\x1f{st.st_mtime_ns}\x1d'.encode('utf-8'))
+        else:
+            h.update(repr([(d, sorted(s)) for d, s in augmented_catalogue.items()]).encode('utf-8'))
+    return h.hexdigest()[:32]
+
+
+def index_arrays(matrix, symptoms_clean, canonical_tokens, precaution_table, search_index):
+    """All parts of an engine index as plain numpy arrays; see index_from_arrays."""
+    arrays = matrix.to_arrays()
+    arrays['disease_order'] = np.argsort(arrays['diseases'], kind='stable').astype(np.int32)
+    names = sorted(symptoms_clean)
+    arrays['clean_names'] = string_array(names)
+    arrays['clean_tokens'] = string_array(symptoms_clean[name] for name in names)
+    keys = sorted(canonical_tokens)
+    arrays['canonical_keys'] = string_array(keys)
+    arrays['canonical_tokens'] = string_array(canonical_tokens[key] for key in keys)
+    diseases = sorted(precaution_table)
+    arrays['precaution_diseases'] = string_array(diseases)
+    arrays['precaution_indptr'], arrays['precautions'] = offset_arrays([precaution_table[d] for d in diseases])
+    arrays.update(search_index.to_arrays())
+    return arrays
+
+
+def index_from_arrays(arrays):
+    """SharedIndex of views over the arrays of index_arrays (nothing is copied or rebuilt)."""
+    matrix = SymptomMatrix.from_arrays(arrays)
+    diseases, vocabulary = arrays['diseases'], arrays['vocabulary']
+    return SharedIndex(
+        matrix=matrix,
+        disease_symptoms=RowMap(diseases, RowList(arrays['indptr'], arrays['indices'], vocabulary, frozenset),
+                                order=arrays['disease_order']),
+        symptom_postings=RowMap(vocabulary, RowList(arrays['postings_indptr'], arrays['postings_indices'],
+                                                    diseases, tuple)),
+        symptoms_clean=StringMap(arrays['clean_names'], arrays['clean_tokens']),
+        all_symptoms_sorted=StringList(arrays['clean_names']),
+        canonical_tokens=StringMap(arrays['canonical_keys'], arrays['canonical_tokens']),
+        precaution_table=RowMap(arrays['precaution_diseases'],
+                                RowList(arrays['precaution_indptr'], arrays['precautions'], container=tuple)),
+        search_index=SymptomSearchIndex.from_arrays(arrays),
+    )
+
+
+def bundle_dir(key, name='base', shared_dir=SHARED_DIR):
+    return os.path.join(shared_dir, f'{name}-{key}')
+
+
+def publish(arrays, key, shared_dir=SHARED_DIR, name='base'):
+    """Write arrays (index_arrays) to the bundle folder (once; concurrent writers are safe). Returns the folder.
+
+    name is the catalogue ('base'/'augmented'); after a new bundle is
+    published, older bundles of the same catalogue are pruned.
+    """
+    target = bundle_dir(key, name, shared_dir)
+    if os.path.isfile(os.path.join(target, META_FILE)):
+        return target
+    os.makedirs(shared_dir, exist_ok=True)
+    tmp_dir = f'{target}.tmp-{uuid.uuid4().hex}'
+    os.makedirs(tmp_dir)
+    try:
+        for array_name, values in arrays.items():
+            np.save(os.path.join(tmp_dir, array_name + '.npy'), np.ascontiguousarray(values))
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'version': SHARED_VERSION, 'name': name, 'key': key, 'arrays': sorted(arrays)}, f)
+        try:
+            os.replace(tmp_dir, target)
+        except OSError:
+            # Proses lain sudah menerbitkan bundle yang sama lebih dulu
+            if not os.path.isfile(os.path.join(target, META_FILE)):
+                raise
+            return target
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    prune(target, shared_dir)
+    return target
+
+
+def _read_meta(folder):
+    try:
+        with open(os.path.join(folder, META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove(folder):
+    # Ganti nama dulu agar attach() tidak pernah melihat bundle yang setengah terhapus
+    trash = f'{folder}.old-{uuid.uuid4().hex}'
+    try:
+        os.replace(folder, trash)
+    except OSError:
+        return False
+    # Di Windows file yang masih di-mmap tidak bisa dihapus; sisanya dicoba lagi pada prune berikutnya
+    shutil.rmtree(trash, ignore_errors=True)
+    return True
+
+
+def prune(current, shared_dir=SHARED_DIR):
+    """Remove bundles superseded by current; returns the removed folder names.
+
+    Removed: bundles of the same catalogue published before current, bundles
+    of another SHARED_VERSION, and leftovers of interrupted publishes.
+    Bundles of other catalogues and newer bundles (published concurrently by
+    a worker that already reloaded newer data) are kept.
+    """
+    meta = _read_meta(current)
+    if meta is None:
+        return []
+    published = os.stat(os.path.join(current, META_FILE)).st_mtime_ns
+    now = time.time()
+    removed = []
+    with os.scandir(shared_dir) as entries:
+        entries = [e for e in entries if e.is_dir() and e.path != current]
+    for entry in entries:
+        if '.tmp-' in entry.name or '.old-' in entry.name:
+            try:
+                stale = now - entry.stat().st_mtime > STALE_TMP_SECONDS
+            except OSError:
+                continue
+            if stale:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.name)
+            continue
+        other = _read_meta(entry.path)
+        if other is None:
+            continue
+        if other.get('version') == SHARED_VERSION:
+            if other.get('name') != meta['name']:
+                continue
+            try:
+                if os.stat(os.path.join(entry.path, META_FILE)).st_mtime_ns >= published:
+                    continue
+            except OSError:
+                continue
+        if _remove(entry.path):
+            removed.append(entry.name)
+    if removed:
+        logger.info('Index bersama lama dihapus: %s', ', '.join(sorted(removed)))
+    return removed
+
+
+def _load(path):
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        # Array kosong tidak bisa di-mmap
+        return np.load(path)
+
+
+def attach(key, shared_dir=SHARED_DIR, name='base'):
+    """SharedIndex over the memory-mapped arrays of a published bundle, or None if missing."""
+    target = bundle_dir(key, name, shared_dir)
+    meta = _read_meta(target)
+    if meta is None or meta.get('version') != SHARED_VERSION:
+        return None
+    try:
+        arrays = {array_name: _load(os.path.join(target, array_name + '.npy')) for array_name in meta['arrays']}
+    except OSError:
+        # Bundle dihapus (prune) di antara membaca meta dan memuat array
+        return None
+    return index_from_arrays(arrays)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bangun index skor bersama (memory-mapped) untuk semua worker')
+    parser.add_argument('--augmented', action='store_true', help='juga bangun index katalog augmented')
+    parser.add_argument('--shared-dir', default=SHARED_DIR)
+    args = parser.parse_args()
+
+    from engine import DiagnosisEngine
+
+    for use_augmented in (False, True) if args.augmented else (False,):
+        name = 'augmented' if use_augmented else 'base'
+        diagnosis = DiagnosisEngine.load(use_augmented=use_augmented, with_model=False, shared_index=False)
+        for error in diagnosis.errors:
+            print(f'⚠️ {error}')
+        key = diagnosis.index_key()
+        if key is None:
+            print(f'⚠️ Index {name} tidak diterbitkan (data kosong atau katalog augmented gagal dimuat)')
+            continue
+        target = publish(diagnosis.index_arrays(), key, args.shared_dir, name)
+        rows, cols = diagnosis.matrix.shape
+        print(f'✅ Selesai: {name} ({rows} penyakit x {cols} gejala) -> {target}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Laporan waktu startup worker dingin: impor per modul, loader data, dan render pertama app.
+
+    python startup_report.py                    # tabel ringkas
+    python startup_report.py -o startup.json    # simpan juga sebagai JSON
+    python startup_report.py --budget-ms 2500   # exit 1 bila render pertama melebihi anggaran
+
+Setiap tahap diukur di interpreter Python baru (seperti worker Streamlit yang
+baru dijalankan), sehingga tidak ada modul atau cache di memori yang ikut
+terhitung; cache biner di disk (cache/) tetap dipakai seperti di produksi.
+
+    imports       python -X importtime untuk modul yang diimpor app.py di level modul
+                  (dibaca dari app.py, sehingga daftar selalu mengikuti app.py)
+    loaders       durasi tiap loader data/index, termasuk yang ditunda (lazy)
+    first_render  AppTest menjalankan app.py sekali (impor + data + render)
+
+LAZY_MODULES (sklearn, joblib, openpyxl) seharusnya tidak termuat sebelum
+fiturnya dipakai; laporan menandai bila ada yang ikut termuat saat startup.
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+LAZY_MODULES = ('sklearn', 'joblib', 'openpyxl')
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(ROOT, 'app.py')
+
+
+def app_imports(path=APP_FILE):
+    """Top-level packages imported at module level by app.py, in source order."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top = name.split('.')[0]
+            if top not in modules:
+                modules.append(top)
+    return modules
+
+
+def _run_child(args):
+    proc = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+    return proc
+
+
+def _loaded(modules=LAZY_MODULES):
+    return {m: m in sys.modules for m in modules}
+
+
+def parse_importtime(stderr):
+    """Top-level modules from `python -X importtime` output as (name, self_s, cumulative_s)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        if name.startswith(' ') and not name[1:].startswith(' '):
+            rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return rows
+
+
+def measure_imports():
+    code = f'import {", ".join(app_imports())}; import json, sys; print(json.dumps({{m: m in sys.modules for m in {LAZY_MODULES!r}}}))'
+    t0 = time.perf_counter()
+    proc = _run_child(['-X', 'importtime', '-c', code])
+    wall = time.perf_counter() - t0
+    modules = sorted(parse_importtime(proc.stderr), key=lambda r: -r[2])
+    return {
+        'wall_s': wall,
+        'total_s': sum(r[2] for r in modules),
+        'modules': [{'name': n, 'self_s': s, 'cumulative_s': c} for n, s, c in modules],
+        'lazy_modules_loaded': json.loads(proc.stdout),
+    }
+
+
+def _child_loaders():
+    import engine
+    from disease_model import load_model, warm_up
+    from image_resolver import DiseaseImageResolver
+
+    timings = []
+
+    def timed(name, fn, deferred=False):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append({'name': name, 'seconds': time.perf_counter() - t0, 'deferred': deferred})
+        return result
+
+    df_symptoms, df_precaution = timed('load_data', engine.load_data)
+    symptom_translations = timed('load_symptom_translations', engine.load_symptom_translations)
+    precaution_translations = timed('load_precaution_translations', engine.load_precaution_translations)
+    timed('build_engine', lambda: engine.DiagnosisEngine(
+        df_symptoms, df_precaution, symptom_translations, precaution_translations))
+    # Dimuat saat pertama kali dibutuhkan (hasil pertama / prediksi pertama), bukan saat startup
+    timed('image_resolver', DiseaseImageResolver, deferred=True)
+
+    def model():
+        artifact = load_model()
+        if artifact is not None:
+            warm_up(artifact)
+
+    timed('load_model', model, deferred=True)
+    print(json.dumps(timings))
+
+
+def measure_loaders():
+    return json.loads(_run_child([__file__, '--child', 'loaders']).stdout)
+
+
+def _child_render():
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_FILE, default_timeout=300)
+    at.run()
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({'seconds': elapsed, 'exception': bool(at.exception), 'lazy_modules_loaded': _loaded()}))
+
+
+def measure_first_render(repeat=1):
+    runs = [json.loads(_run_child([__file__, '--child', 'render']).stdout.strip().splitlines()[-1])
+            for _ in range(repeat)]
+    return {
+        'median_s': statistics.median(r['seconds'] for r in runs),
+        'runs_s': [r['seconds'] for r in runs],
+        'exception': any(r['exception'] for r in runs),
+        'lazy_modules_loaded': runs[-1]['lazy_modules_loaded'],
+    }
+
+
+def print_report(report, top=12):
+    imports = report['imports']
+    print(f"Impor ({imports['total_s'] * 1000:.0f} ms kumulatif, {imports['wall_s'] * 1000:.0f} ms wall termasuk interpreter):")
+    for m in imports['modules'][:top]:
+        print(f"  {m['name']:<28} {m['cumulative_s'] * 1000:9.1f} ms")
+    print('Loader:')
+    for t in report['loaders']:
+        print(f"  {t['name']:<28} {t['seconds'] * 1000:9.1f} ms" + ('  (lazy)' if t['deferred'] else ''))
+    render = report['first_render']
+    print(f"Render pertama (worker dingin): {render['median_s'] * 1000:.0f} ms"
+          + (' (ERROR di app)' if render['exception'] else ''))
+    eager = sorted({m for m, loaded in {**imports['lazy_modules_loaded'], **render['lazy_modules_loaded']}.items() if loaded})
+    if eager:
+        print(f"⚠️ Modul berat termuat saat startup: {', '.join(eager)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Laporan waktu startup (impor, loader, render pertama)')
+    parser.add_argument('-o', '--output', help='simpan laporan sebagai JSON')
+    parser.add_argument('--repeat', type=int, default=1, help='jumlah proses dingin untuk render pertama (median)')
+    parser.add_argument('--top', type=int, default=12, help='jumlah modul impor yang ditampilkan')
+    parser.add_argument('--budget-ms', type=float, help='exit 1 bila render pertama melebihi anggaran ini')
+    parser.add_argument('--child', choices=('loaders', 'render'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'loaders':
+        _child_loaders()
+        return
+    if args.child == 'render':
+        _child_render()
+        return
+
+    report = {
+        'python': sys.version.split()[0],
+        'imports': measure_imports(),
+        'loaders': measure_loaders(),
+        'first_render': measure_first_render(args.repeat),
+    }
+    print_report(report, args.top)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'✅ Selesai: laporan disimpan ke {args.output}')
+    if args.budget_ms is not None and report['first_render']['median_s'] * 1000 > args.budget_ms:
+        print(f"❌ Render pertama melebihi anggaran {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Pola unik (penyakit, himpunan gejala) dari DiseaseAndSymptoms.csv.
+
+Dataset berisi ~4.920 baris untuk 41 penyakit yang sebagian besar hanya
+permutasi kolom Symptom_N dari himpunan gejala yang sama. Baris dilipat satu
+kali menjadi pola unik; index penyakit dibangun dari tabel ringkas ini, bukan
+dari semua baris. Bobot IDF mode 'weighted' dihitung dari frekuensi gejala
+per penyakit di scoring.SymptomMatrix, bukan dari jumlah baris per pola.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class SymptomPatterns:
+    """Deduplicated (disease, frozenset(symptoms)) patterns."""
+
+    def __init__(self, patterns):
+        # patterns: list (disease, frozenset gejala), urutan kemunculan pertama di dataset
+        self.patterns = patterns
+
+    @classmethod
+    def from_dataframe(cls, df_symptoms):
+        if df_symptoms.empty or 'Disease' not in df_symptoms:
+            return cls([])
+        symptom_cols = [c for c in df_symptoms.columns if c.startswith('Symptom_')]
+        data = df_symptoms[df_symptoms['Disease'].notna()]
+
+        # Kode integer per sel (-1 = kosong) dengan vocabulary bersama untuk semua kolom
+        vocabulary = {}
+
+        def encode(column):
+            codes, uniques = pd.factorize(column)
+            ids = np.array([vocabulary.setdefault(str(u).strip(), len(vocabulary)) if str(u).strip() else -1
+                            for u in uniques] + [-1], dtype=np.int64)
+            return ids[codes]
+
+        diseases = encode(data['Disease'])
+        if symptom_cols:
+            codes = np.sort(np.column_stack([encode(data[c]) for c in symptom_cols]), axis=1)
+            # Gejala ganda dalam satu baris dihitung sekali, lalu urutkan ulang
+            codes[:, 1:][codes[:, 1:] == codes[:, :-1]] = -1
+            codes.sort(axis=1)
+        else:
+            codes = np.empty((len(data), 0), dtype=np.int64)
+
+        # Satu kunci bytes per baris; factorize memberi id pola sesuai urutan kemunculan pertama
+        keys = np.ascontiguousarray(np.column_stack([diseases, codes]), dtype=np.int32)
+        _, uniques = pd.factorize(np.array([row.tobytes() for row in keys], dtype=object))
+        names = np.empty(len(vocabulary), dtype=object)
+        for name, i in vocabulary.items():
+            names[i] = name
+        patterns = []
+        for key in uniques:
+            row = np.frombuffer(key, dtype=np.int32)
+            patterns.append((names[row[0]], frozenset(names[row[1:][row[1:] >= 0]])))
+        return cls(patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def disease_symptoms(self):
+        """disease -> frozenset of all its symptoms (dict order = first appearance)."""
+        merged = {}
+        for disease, symptoms in self.patterns:
+            merged.setdefault(disease, set()).update(symptoms)
+        return {d: frozenset(s) for d, s in merged.items()}
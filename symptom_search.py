@@ -0,0 +1,167 @@
+"""
+Index pencarian gejala (trigram + prefix) dengan fuzzy matching berbiaya terbatas.
+
+Kunci pencarian per gejala: nama tampilan (Indonesia), token asli dalam bentuk
+Inggris ('skin_rash' -> 'skin rash') dan semua nama Inggris di
+symptom_translation.csv yang diterjemahkan ke nama tampilan yang sama.
+Hasil: kecocokan substring (prefix lebih dulu), lalu kecocokan fuzzy dengan
+rasio difflib >= cutoff. Fuzzy hanya memeriksa MAX_FUZZY_CANDIDATES kandidat
+teratas berdasarkan jumlah trigram yang sama, sehingga biayanya tidak tumbuh
+dengan ukuran vocabulary.
+
+to_arrays/from_arrays menyimpan index sebagai array string/offset sehingga dapat
+dibagi antar proses lewat file yang di-memory-map (shared_index.py).
+"""
+
+import difflib
+import re
+
+import numpy as np
+
+from array_views import RowList, RowMap, StringList, VocabularyIds, offset_arrays, string_array
+
+MAX_FUZZY_CANDIDATES = 40
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_query(text):
+    """Lowercase, underscore -> spasi, spasi ganda dirapikan."""
+    return _SPACES.sub(' ', str(text).replace('_', ' ').lower()).strip()
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomSearchIndex:
+    """Ranked symptom search over Indonesian and English names."""
+
+    def __init__(self, symptoms_clean, translations=None):
+        # symptoms_clean: nama tampilan -> token asli
+        names = sorted(symptoms_clean)
+        keys = {}
+        for name in names:
+            keys.setdefault(normalize_query(name), set()).add(name)
+            keys.setdefault(normalize_query(symptoms_clean[name]), set()).add(name)
+        if translations:
+            by_display = {normalize_query(n): n for n in names}
+            for english, indonesian in translations.items():
+                name = by_display.get(normalize_query(indonesian))
+                if name is not None:
+                    keys.setdefault(normalize_query(english), set()).add(name)
+
+        self.names = names
+        self.keys = sorted(k for k in keys if k)
+        self.key_names = [sorted(keys[k]) for k in self.keys]
+        self.name_rank = {name: i for i, name in enumerate(names)}
+        self.trigram_index = {}
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                self.trigram_index.setdefault(gram, []).append(key_id)
+
+    def to_arrays(self):
+        """All state as plain (non-object) numpy arrays; see from_arrays."""
+        key_names_indptr, key_names = offset_arrays(self.key_names, self.name_rank)
+        grams = sorted(self.trigram_index)
+        gram_indptr = np.cumsum([0] + [len(self.trigram_index[g]) for g in grams], dtype=np.int64)
+        gram_keys = np.array([i for g in grams for i in self.trigram_index[g]], dtype=np.int32)
+        return {
+            'search_names': string_array(self.names),
+            'search_keys': string_array(self.keys),
+            'search_key_names_indptr': key_names_indptr,
+            'search_key_names': key_names,
+            'search_grams': string_array(grams),
+            'search_gram_indptr': gram_indptr,
+            'search_gram_keys': gram_keys,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Search index over the arrays of to_arrays without copying them (memory-mapped arrays stay shared)."""
+        self = cls.__new__(cls)
+        names = arrays['search_names']
+        self.names = StringList(names)
+        self.keys = StringList(arrays['search_keys'])
+        self.key_names = RowList(arrays['search_key_names_indptr'], arrays['search_key_names'], names)
+        # names terurut: peringkat nama = posisinya di array
+        self.name_rank = VocabularyIds(names)
+        self.trigram_index = RowMap(arrays['search_grams'],
+                                    RowList(arrays['search_gram_indptr'], arrays['search_gram_keys']))
+        return self
+
+    def _substring_hits(self, q):
+        """Key ids containing q, found via trigram posting intersection (linear for < 3 chars)."""
+        if len(q) < 3:
+            return [i for i, key in enumerate(self.keys) if q in key]
+        grams = {q[i:i + 3] for i in range(len(q) - 2)}
+        postings = sorted((self.trigram_index.get(g, ()) for g in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return [i for i in candidates if q in self.keys[i]]
+
+    @staticmethod
+    def _ratio_at_least(matcher, text, cutoff):
+        # matcher menyimpan q sebagai seq2 (di-cache difflib); batas atas murah dicek dulu
+        matcher.set_seq1(text)
+        if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+            return 0.0
+        return matcher.ratio()
+
+    def _fuzzy_score(self, matcher, q, key_id, cutoff):
+        best = self._ratio_at_least(matcher, self.keys[key_id], cutoff)
+        # Bandingkan juga dengan potongan kata sepanjang query ('fevr' vs 'high fever')
+        words = self.keys[key_id].split(' ')
+        n = q.count(' ') + 1
+        if len(words) > n:
+            for start in range(len(words) - n + 1):
+                best = max(best, self._ratio_at_least(matcher, ' '.join(words[start:start + n]), cutoff))
+        return best
+
+    def search(self, query, cutoff=0.7, limit=None):
+        """Return display names matching query, best first.
+
+        Substring matches rank first (key prefix, then word prefix, then
+        anywhere); fuzzy matches with ratio >= cutoff follow.
+        """
+        q = normalize_query(query)
+        if not q:
+            return []
+        ranked = {}
+        for key_id in self._substring_hits(q):
+            key = self.keys[key_id]
+            if key.startswith(q):
+                tier = 0
+            elif f' {q}' in key:
+                tier = 1
+            else:
+                tier = 2
+            for name in self.key_names[key_id]:
+                score = (tier, 0.0)
+                if name not in ranked or score < ranked[name]:
+                    ranked[name] = score
+
+        # Fuzzy: kandidat dengan trigram terbanyak yang sama, dibatasi jumlahnya
+        shared = {}
+        for gram in trigrams(q):
+            for key_id in self.trigram_index.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+        candidates = sorted(shared, key=lambda i: -shared[i])[:MAX_FUZZY_CANDIDATES]
+        matcher = difflib.SequenceMatcher(None, '', q)
+        for key_id in candidates:
+            names = [n for n in self.key_names[key_id] if n not in ranked or ranked[n][0] == 3]
+            if not names:
+                continue
+            ratio = self._fuzzy_score(matcher, q, key_id, cutoff)
+            if ratio < cutoff:
+                continue
+            for name in names:
+                score = (3, -ratio)
+                if name not in ranked or score < ranked[name]:
+                    ranked[name] = score
+
+        result = sorted(ranked, key=lambda n: (ranked[n], self.name_rank[n]))
+        return result[:limit] if limit else result
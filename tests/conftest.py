@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Path data (data/, assets/, cache/) relatif terhadap root repo, seperti app.py."""
+    monkeypatch.chdir(ROOT)
+    # Matriks per proses; index bersama diuji lewat hasil rank yang sama
+    monkeypatch.delenv('SHARED_INDEX', raising=False)
+
+
+@pytest.fixture(scope='session')
+def sources():
+    old = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        from engine import load_sources
+        return load_sources()
+    finally:
+        os.chdir(old)
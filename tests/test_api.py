@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+import api
+from disease_model import load_model
+from engine import DiagnosisEngine
+
+
+@pytest.fixture(scope='module')
+def diagnosis(sources):
+    return DiagnosisEngine(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                           sources.precaution_translations, shared_index=False)
+
+
+@pytest.fixture(scope='module')
+def model_diagnosis(sources):
+    model = load_model()
+    if model is None:
+        pytest.skip('model artifact belum dilatih (python disease_model.py)')
+    return DiagnosisEngine(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                           sources.precaution_translations, model=model, shared_index=False)
+
+
+def predict(diagnosis, payload, path='/predict'):
+    return api.route(diagnosis, 'POST', path, json.dumps(payload).encode())
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({'content-length': 'abc'}, 400),
+    ({'content-length': '-5'}, 400),
+    ({'content-length': str(api.MAX_BODY_BYTES + 1)}, 413),
+])
+def test_invalid_content_length(headers, status):
+    with pytest.raises(api.ApiError) as e:
+        api._parse_content_length(headers)
+    assert e.value.status == status
+
+
+@pytest.mark.parametrize('headers, length', [({}, 0), ({'content-length': ''}, 0), ({'content-length': '12'}, 12)])
+def test_valid_content_length(headers, length):
+    assert api._parse_content_length(headers) == length
+
+
+def test_invalid_content_length_gets_json_400_over_http(diagnosis):
+    async def exchange():
+        server = await asyncio.start_server(lambda r, w: api.handle_connection(r, w, diagnosis), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'POST /predict HTTP/1.1\r\nContent-Length: abc\r\n\r\n')
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    head, _, body = asyncio.run(exchange()).partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 400 ')
+    assert json.loads(body) == {'error': 'Content-Length tidak valid'}
+
+
+@pytest.mark.parametrize('top_k', [True, False, -1, 2.5, '3', None])
+def test_invalid_top_k(diagnosis, top_k):
+    with pytest.raises(api.ApiError) as e:
+        predict(diagnosis, {'symptoms': ['itching'], 'top_k': top_k})
+    assert e.value.status == 400
+
+
+def test_top_k_zero_returns_all_results(diagnosis):
+    _, everything = predict(diagnosis, {'symptoms': ['itching', 'cough'], 'top_k': 0})
+    _, two = predict(diagnosis, {'symptoms': ['itching', 'cough'], 'top_k': 2})
+    assert len(everything['results']) == everything['total_matches'] > 2
+    assert everything['results'][:2] == two['results']
+
+
+@pytest.mark.parametrize('symptoms', [[], ['nonsense']])
+def test_no_known_symptoms_skip_the_model(model_diagnosis, symptoms):
+    _, payload = predict(model_diagnosis, {'symptoms': symptoms})
+    assert payload['total_matches'] == 0
+    assert payload['model_top_k'] == []
+
+
+def test_model_top_k_follows_top_k(model_diagnosis):
+    _, two = predict(model_diagnosis, {'symptoms': ['itching', 'skin_rash'], 'top_k': 2})
+    _, everything = predict(model_diagnosis, {'symptoms': ['itching', 'skin_rash'], 'top_k': 0})
+    assert len(two['model_top_k']) == 2
+    assert len(everything['model_top_k']) >= len(two['model_top_k'])
+    assert everything['model_top_k'][:2] == two['model_top_k']
+    assert all(p['Probability'] > 0 for p in everything['model_top_k'])
+
+
+@pytest.mark.parametrize('cutoff', ['nan', 'inf', '-inf', '-0.1', '1.5', 'abc'])
+def test_invalid_search_cutoff(diagnosis, cutoff):
+    with pytest.raises(api.ApiError) as e:
+        api.route(diagnosis, 'GET', '/symptoms', b'', {'q': 'demam', 'cutoff': cutoff})
+    assert e.value.status == 400
+
+
+@pytest.mark.parametrize('cutoff', ['0', '0.7', '1'])
+def test_valid_search_cutoff(diagnosis, cutoff):
+    status, payload = api.route(diagnosis, 'GET', '/symptoms', b'', {'q': 'demam', 'cutoff': cutoff})
+    assert status == 200
+    expected = diagnosis.search_index.search('demam', cutoff=float(cutoff))
+    assert [s['name'] for s in payload['symptoms']] == expected
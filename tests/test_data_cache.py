@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pandas as pd
+
+import data_cache
+
+SOURCE = os.path.join('data', 'DiseaseAndSymptoms.csv')
+
+
+def same_frame(cached, parsed):
+    return cached.astype(object).equals(parsed.astype(object))
+
+
+def test_cached_read_matches_csv(tmp_path):
+    cache_dir = str(tmp_path)
+    first = data_cache.read_csv_cached(SOURCE, cache_dir=cache_dir)
+    second = data_cache.read_csv_cached(SOURCE, usecols=['Disease', 'Symptom_3'], cache_dir=cache_dir)
+    assert isinstance(second['Disease'].dtype, pd.CategoricalDtype)
+    assert same_frame(first, pd.read_csv(SOURCE))
+    assert same_frame(second, pd.read_csv(SOURCE, usecols=['Disease', 'Symptom_3']))
+
+
+def test_small_files_are_read_directly(tmp_path):
+    path = os.path.join('data', 'Disease precaution.csv')
+    assert os.path.getsize(path) < data_cache.CACHE_MIN_BYTES
+    df = data_cache.read_csv_cached(path, cache_dir=str(tmp_path))
+    assert df.equals(pd.read_csv(path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_folder_replaced_during_load_falls_back_to_csv(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    data_cache.read_csv_cached(SOURCE, cache_dir=cache_dir)
+    target = data_cache.cache_path_for(SOURCE, cache_dir)
+    fresh = data_cache.is_cache_fresh
+
+    def fresh_then_moved(path, cache_dir):
+        # Meta masih terbaca, lalu proses lain memindahkan folder (seperti _publish) sebelum array dimuat
+        meta = fresh(path, cache_dir)
+        shutil.move(target, target + '.old')
+        return meta
+
+    monkeypatch.setattr(data_cache, 'is_cache_fresh', fresh_then_moved)
+    df = data_cache.read_csv_cached(SOURCE, cache_dir=cache_dir)
+    assert same_frame(df, pd.read_csv(SOURCE))
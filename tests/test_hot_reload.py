@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+
+import hot_reload
+from engine import DiagnosisEngine
+from scoring import SCORE_MODES
+
+QUERIES = [
+    ['itching', 'skin_rash'],
+    ['high_fever', 'headache', 'vomiting'],
+    ['cough', 'new_symptom_x'],
+    ['new_symptom_x'],
+]
+# Katalog augmented kecil: penyakit baru, gejala baru, dan penyakit dasar dengan ejaan lain
+AUGMENTED = {'Made Up Disease': frozenset({'itching', 'brand new'}), 'fungal infection': frozenset({'cough'})}
+
+
+def build(sources, use_augmented):
+    return DiagnosisEngine(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                           sources.precaution_translations, use_augmented=use_augmented,
+                           augmented_catalogue=AUGMENTED if use_augmented else None)
+
+
+def assert_same(patched, fresh):
+    assert list(patched.disease_symptoms.items()) == list(fresh.disease_symptoms.items())
+    assert patched.symptom_postings == fresh.symptom_postings
+    assert patched.symptoms_clean == fresh.symptoms_clean
+    assert patched.all_symptoms_sorted == fresh.all_symptoms_sorted
+    assert patched.precaution_table == fresh.precaution_table
+    for mode in SCORE_MODES:
+        assert patched.rank_batch(QUERIES, mode=mode) == fresh.rank_batch(QUERIES, mode=mode)
+    assert patched.search_index.search('demam') == fresh.search_index.search('demam')
+
+
+def edited_sources(sources):
+    """Edit steps applied cumulatively: symptoms, symptom translations, precautions, precaution translations."""
+    df = sources.df_symptoms.astype(object)
+    df = df[df['Disease'] != 'Acne']
+    extra = df.iloc[:3].copy()
+    extra['Disease'] = 'Zeta Fever'
+    extra['Symptom_1'] = 'new_symptom_x'
+    df = pd.concat([df.iloc[:10], extra, df.iloc[10:]], ignore_index=True)
+    df.loc[20, 'Symptom_2'] = 'cough'
+
+    symptom_translations = dict(sources.symptom_translations)
+    symptom_translations[next(iter(symptom_translations))] = 'Terjemahan Baru'
+    symptom_translations['new symptom x'] = 'Gejala X'
+
+    df_precaution = sources.df_precaution.astype(object)
+    df_precaution.loc[0, 'Precaution_1'] = 'drink water'
+    precaution_translations = dict(sources.precaution_translations)
+    precaution_translations['drink water'] = 'Minum air'
+
+    steps = [sources._replace(df_symptoms=df)]
+    steps.append(steps[-1]._replace(symptom_translations=symptom_translations))
+    steps.append(steps[-1]._replace(df_precaution=df_precaution))
+    steps.append(steps[-1]._replace(precaution_translations=precaution_translations))
+    return steps
+
+
+@pytest.mark.parametrize('use_augmented', [False, True])
+def test_updated_matches_fresh_build(sources, use_augmented):
+    base = build(sources, use_augmented)
+    steps = edited_sources(sources)
+    # Terapkan semua edit, lalu batalkan satu per satu dalam urutan terbalik
+    current = base
+    for step in steps + steps[-2::-1] + [sources]:
+        current = current.updated(step)
+        assert_same(current, build(step, use_augmented))
+    # Snapshot lama tidak pernah diubah
+    assert_same(base, build(sources, use_augmented))
+
+
+def test_updated_without_changes_shares_snapshot_parts(sources):
+    base = build(sources, False)
+    same = base.updated(sources)
+    assert same.matrix is base.matrix
+    assert same.search_index is base.search_index
+    assert same.precaution_table is base.precaution_table
+
+
+class FakeWatcher:
+    def __init__(self):
+        self.changes = set()
+
+    def poll(self, force=False):
+        changed, self.changes = self.changes, set()
+        return changed
+
+
+def test_details_file_bumps_details_version_only(sources):
+    diagnosis = build(sources, False)
+    watcher = FakeWatcher()
+    reloader = hot_reload.EngineReloader(diagnosis, sources, watcher=watcher)
+
+    watcher.changes = {hot_reload.DETAILS_FILE}
+    assert reloader.current() == (0, diagnosis)
+    assert reloader.details_version == 1
+    assert reloader.last_reload['paths'] == [hot_reload.DETAILS_FILE]
+
+    watcher.changes = {hot_reload.engine.PRECAUTION_TRANSLATION_FILE}
+    version, updated = reloader.current()
+    assert version == 1 and updated is not diagnosis
+    assert reloader.details_version == 1
+
+
+def test_change_between_load_and_reloader_is_applied(tmp_path, monkeypatch):
+    for path in hot_reload.engine.SOURCE_FILES:
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_bytes(open(path, 'rb').read())
+    monkeypatch.chdir(tmp_path)
+    sources = hot_reload.engine.load_sources()
+
+    # File berubah setelah sources dibaca tetapi sebelum reloader dibuat (seperti cache app_data di app.py)
+    df = pd.read_csv(hot_reload.engine.SYMPTOMS_FILE)
+    df[df['Disease'] != 'Acne'].to_csv(hot_reload.engine.SYMPTOMS_FILE, index=False)
+
+    reloader = hot_reload.EngineReloader(build(sources, False), sources, check_interval=60)
+    version, updated = reloader.current()
+    assert version == 1
+    assert 'Acne' not in updated.disease_symptoms
+    assert_same(updated, build(hot_reload.engine.load_sources(), False))
+    assert reloader.current() == (1, updated)
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+import shared_index
+from engine import DiagnosisEngine
+from scoring import SCORE_MODES, LiveRanking
+
+STEPS = 400
+MAX_SELECTED = 12
+# Katalog augmented kecil agar ada penyakit dengan total gejala sama (tie) di luar dataset dasar
+AUGMENTED = {
+    'Made Up Disease': frozenset({'itching', 'skin_rash', 'brand new'}),
+    'Other Made Up Disease': frozenset({'itching', 'skin_rash', 'cough'}),
+}
+
+
+@pytest.fixture(scope='module', params=['base', 'augmented'])
+def diagnosis(request, sources):
+    use_augmented = request.param == 'augmented'
+    return DiagnosisEngine(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                           sources.precaution_translations, use_augmented=use_augmented,
+                           augmented_catalogue=AUGMENTED if use_augmented else None, shared_index=False)
+
+
+def toggle_sequence(vocabulary, seed):
+    """Random (symptom, select?) toggles, including unknown symptoms and repeated toggles."""
+    rng = random.Random(seed)
+    symptoms = list(vocabulary) + ['unknown_symptom']
+    selected = set()
+    for _ in range(STEPS):
+        symptom = rng.choice(sorted(selected)) if selected and rng.random() < 0.4 else rng.choice(symptoms)
+        if symptom in selected:
+            selected.discard(symptom)
+            yield symptom, False
+        elif len(selected) < MAX_SELECTED:
+            selected.add(symptom)
+            yield symptom, True
+
+
+def assert_live_matches_rank(diagnosis, live, mode, seed):
+    selected = set()
+    for symptom, select in toggle_sequence(diagnosis.matrix.vocabulary, seed):
+        if select:
+            live.add(symptom)
+            selected.add(symptom)
+        else:
+            live.remove(symptom)
+            selected.discard(symptom)
+        rows, _ = diagnosis.rank(sorted(selected), mode=mode)
+        assert diagnosis.live_rows(live, 5) == rows[:5]
+        assert len(live) == len(rows)
+    rows, _ = diagnosis.rank(sorted(selected), mode=mode)
+    assert diagnosis.live_rows(live, len(rows) + 1) == rows
+
+
+@pytest.mark.parametrize('mode', SCORE_MODES)
+@pytest.mark.parametrize('seed', [1, 2])
+def test_live_ranking_matches_rank(diagnosis, mode, seed):
+    assert_live_matches_rank(diagnosis, diagnosis.live_ranking(mode), mode, seed)
+
+
+@pytest.mark.parametrize('mode', SCORE_MODES)
+def test_live_ranking_over_shared_matrix(diagnosis, mode, tmp_path):
+    # Matriks hasil attach (memory-mapped) harus memberi peringkat yang sama
+    shared_index.publish(diagnosis.index_arrays(), 'live', str(tmp_path))
+    shared = shared_index.attach('live', str(tmp_path)).matrix
+    assert_live_matches_rank(diagnosis, LiveRanking(shared, mode), mode, seed=3)
+
+
+@pytest.mark.parametrize('mode', SCORE_MODES)
+def test_sync_applies_only_the_difference(diagnosis, mode):
+    live = diagnosis.live_ranking(mode)
+    live.sync(['itching', 'skin_rash', 'cough'])
+    assert live.sync(['itching', 'high_fever']) is None
+    assert live.selected == {'itching', 'high_fever'}
+    rows, _ = diagnosis.rank(['itching', 'high_fever'], mode=mode)
+    assert diagnosis.live_rows(live, len(rows)) == rows
+    # Gejala yang sudah dipilih / belum dipilih tidak menghitung ulang apa pun
+    assert live.add('itching') == 0
+    assert live.remove('cough') == 0
@@ -0,0 +1,125 @@
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+import preprocess
+
+SYMPTOMS = ['cough', 'fever', 'skin rash', 'headache']
+SHARD_BYTES = 256
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(','.join(['diseases'] + SYMPTOMS) + '\n')
+        for disease, values in rows:
+            f.write(','.join([disease] + [str(v) for v in values]) + '\n')
+
+
+def random_rows(n, seed=0):
+    rng = random.Random(seed)
+    return [(rng.choice(['flu', 'measles', 'allergy']), [rng.randint(0, 1) for _ in SYMPTOMS]) for _ in range(n)]
+
+
+def run(path, cache_dir):
+    log = []
+    manifest = preprocess.preprocess(path, cache_dir=cache_dir, shard_bytes=SHARD_BYTES, workers=1, log=log.append)
+    reprocessed = [int(line.split()[1].split('/')[0]) - 1 for line in log if 'dilewati' not in line]
+    return manifest, sorted(reprocessed)
+
+
+def read_back(path, manifest, cache_dir):
+    rows = []
+    for _, diseases, values in preprocess.iter_shard_chunks(path, manifest, cache_dir):
+        rows += [(d, v.tolist()) for d, v in zip(diseases, values)]
+    return rows
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'augmented.csv')
+    rows = random_rows(120)
+    write_csv(path, rows)
+    return path, rows, str(tmp_path / 'cache')
+
+
+def test_first_run_then_resume_skips_everything(source):
+    path, rows, cache_dir = source
+    manifest, reprocessed = run(path, cache_dir)
+    shards = len(manifest['shards'])
+    assert shards > 3 and reprocessed == list(range(shards))
+    assert manifest['complete'] and manifest['rows'] == len(rows)
+    assert read_back(path, manifest, cache_dir) == rows
+    assert preprocess.load_fresh_manifest(path, cache_dir) == manifest
+
+    manifest, reprocessed = run(path, cache_dir)
+    assert reprocessed == []
+    assert read_back(path, manifest, cache_dir) == rows
+
+
+def test_missing_or_corrupted_shard_is_rebuilt(source):
+    path, rows, cache_dir = source
+    manifest, _ = run(path, cache_dir)
+    out_dir = preprocess.shard_dir_for(path, cache_dir)
+    os.remove(os.path.join(out_dir, manifest['shards'][1]['file']))
+    with open(os.path.join(out_dir, manifest['shards'][3]['file']), 'ab') as f:
+        f.write(b'x')
+
+    manifest, reprocessed = run(path, cache_dir)
+    assert reprocessed == [1, 3]
+    assert read_back(path, manifest, cache_dir) == rows
+
+
+def test_changed_source_reprocesses_only_changed_shards(source):
+    path, rows, cache_dir = source
+    run(path, cache_dir)
+    # Edit dengan panjang byte sama: rentang shard tetap, hanya shard yang memuat baris ini berubah
+    disease, values = rows[50]
+    rows[50] = (disease, [1 - v for v in values])
+    write_csv(path, rows)
+    first = next(i for i, (start, end) in enumerate(preprocess.shard_ranges(path, SHARD_BYTES))
+                 if start <= _row_offset(path, 50) < end)
+
+    manifest, reprocessed = run(path, cache_dir)
+    assert reprocessed == [first]
+    assert read_back(path, manifest, cache_dir) == rows
+
+
+def test_shorter_source_removes_extra_shards(source):
+    path, rows, cache_dir = source
+    before, _ = run(path, cache_dir)
+    write_csv(path, rows[:40])
+
+    manifest, _ = run(path, cache_dir)
+    assert len(manifest['shards']) < len(before['shards'])
+    files = sorted(f for f in os.listdir(preprocess.shard_dir_for(path, cache_dir)) if f.endswith('.npz'))
+    assert files == sorted(s['file'] for s in manifest['shards'])
+    assert read_back(path, manifest, cache_dir) == rows[:40]
+
+
+def test_interrupted_run_is_not_fresh_and_resumes(source, monkeypatch):
+    path, rows, cache_dir = source
+    manifest, _ = run(path, cache_dir)
+    # Simulasi proses yang berhenti di tengah: manifest belum 'complete' dan satu shard hilang
+    out_dir = preprocess.shard_dir_for(path, cache_dir)
+    manifest['complete'] = False
+    preprocess._atomic_write_json(os.path.join(out_dir, preprocess.MANIFEST_FILE), manifest)
+    os.remove(os.path.join(out_dir, manifest['shards'][-1]['file']))
+    assert preprocess.load_fresh_manifest(path, cache_dir) is None
+
+    manifest, reprocessed = run(path, cache_dir)
+    assert reprocessed == [len(manifest['shards']) - 1]
+    assert preprocess.load_fresh_manifest(path, cache_dir) == manifest
+    # Jumlah per gejala tetap dihitung dari semua shard, termasuk yang dilewati
+    with open(os.path.join(out_dir, preprocess.VOCABULARY_FILE), encoding='utf-8') as f:
+        vocabulary = json.load(f)
+    assert vocabulary['counts'] == np.array([v for _, v in rows]).sum(axis=0).tolist()
+
+
+def _row_offset(path, row):
+    with open(path, 'rb') as f:
+        for _ in range(row + 1):
+            f.readline()
+        return f.tell()
@@ -0,0 +1,89 @@
+import pytest
+
+import result_cache
+from result_cache import ResultCache, cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, 'monotonic', clock)
+    return clock
+
+
+def test_key_ignores_order_and_duplicates():
+    assert cache_key(['b', 'a', 'b']) == cache_key(['a', 'b']) == ('a', 'b')
+
+
+def test_hits_misses_and_compute_once(clock):
+    cache = ResultCache(maxsize=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [{'Disease': 'Flu'}], None
+
+    first = cache.get_or_compute(['cough', 'fever'], compute)
+    second = cache.get_or_compute(['fever', 'cough'], compute)
+    assert second is first and len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['size']) == (1, 1, 0.5, 1)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResultCache(maxsize=2)
+    cache.put(['a'], [])
+    cache.put(['b'], [])
+    assert cache.get(['a']) is not None   # a kini paling baru dipakai
+    cache.put(['c'], [])
+    assert cache.get(['b']) is None
+    assert cache.get(['a']) is not None and cache.get(['c']) is not None
+    assert cache.stats()['evictions'] == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(maxsize=4, ttl=10)
+    cache.put(['a'], [])
+    clock.now += 10
+    assert cache.get(['a']) is not None
+    clock.now += 0.5
+    assert cache.get(['a']) is None
+    stats = cache.stats()
+    assert (stats['expirations'], stats['hits'], stats['misses'], stats['size']) == (1, 1, 1, 0)
+
+
+@pytest.mark.parametrize('ttl', [None, 0, -1])
+def test_no_ttl_never_expires(clock, ttl):
+    cache = ResultCache(ttl=ttl)
+    assert cache.ttl is None
+    cache.put(['a'], [])
+    clock.now += 10 ** 9
+    assert cache.get(['a']) is not None
+
+
+def test_maxsize_zero_disables_storage(clock):
+    cache = ResultCache(maxsize=0)
+    entry = cache.get_or_compute(['a'], lambda: ([{'Disease': 'Flu'}], None))
+    assert entry.matching_diseases == [{'Disease': 'Flu'}]
+    assert len(cache) == 0 and cache.get(['a']) is None
+
+
+def test_export_is_built_once_per_format():
+    entry = result_cache.CachedResult([{'Disease': 'Flu'}])
+    calls = []
+
+    def build(rows):
+        calls.append(rows)
+        return 'payload'
+
+    assert entry.export('csv', build) == entry.export('csv', build) == 'payload'
+    assert len(calls) == 1
@@ -0,0 +1,68 @@
+import random
+
+import pandas as pd
+import pytest
+
+from engine import DiagnosisEngine, clean_symptom_name
+
+QUERIES = 500
+# Kolom baris hasil yang dihasilkan loop lama (tanpa kolom tambahan mode berbobot/model)
+LEGACY_COLUMNS = ('Disease', 'Matched Symptoms', 'Matched Symptom Names', 'Total Symptoms', 'Match Score')
+
+
+def legacy_disease_map(df_symptoms):
+    """The original app.py aggregation: iterrows into one symptom set per disease."""
+    disease_symptom_map = {}
+    for _, row in df_symptoms.iterrows():
+        disease = row.get('Disease')
+        if pd.isna(disease):
+            continue
+        disease = str(disease).strip()
+        if disease not in disease_symptom_map:
+            disease_symptom_map[disease] = set()
+        for col in df_symptoms.columns:
+            if col.startswith('Symptom_') and pd.notna(row[col]):
+                disease_symptom_map[disease].add(str(row[col]).strip())
+    return disease_symptom_map
+
+
+def legacy_rank(disease_symptom_map, selected_symptoms, translations):
+    """The original app.py matching: set intersection per disease, stable sort by Match Score."""
+    matching_diseases = []
+    for disease, disease_symptoms in disease_symptom_map.items():
+        if not disease_symptoms:
+            continue
+        matches = set(selected_symptoms).intersection(disease_symptoms)
+        if not matches:
+            continue
+        match_count = len(matches)
+        total_count = len(disease_symptoms)
+        matched_names = [clean_symptom_name(s, translations) for s in matches]
+        matching_diseases.append({
+            'Disease': disease,
+            'Matched Symptoms': match_count,
+            'Matched Symptom Names': '; '.join(sorted(matched_names)),
+            'Total Symptoms': total_count,
+            'Match Score': match_count / total_count if total_count > 0 else 0,
+        })
+    return sorted(matching_diseases, key=lambda x: x['Match Score'], reverse=True)
+
+
+@pytest.fixture(scope='module')
+def diagnosis(sources):
+    return DiagnosisEngine(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                           sources.precaution_translations, shared_index=False)
+
+
+def test_ratio_ranking_matches_legacy_loop(diagnosis, sources):
+    # Agregasi tidak bergantung pada query: dibangun sekali dari loop lama
+    disease_symptom_map = legacy_disease_map(sources.df_symptoms.astype(object))
+    vocabulary = sorted(diagnosis.symptom_postings)
+    rng = random.Random(7)
+    for _ in range(QUERIES):
+        selected = rng.sample(vocabulary, rng.randint(1, 8))
+        if rng.random() < 0.1:
+            selected.append('unknown_symptom')
+        expected = legacy_rank(disease_symptom_map, selected, sources.symptom_translations)
+        rows, _ = diagnosis.rank(selected, mode='ratio')
+        assert [{c: row[c] for c in LEGACY_COLUMNS} for row in rows] == expected
@@ -0,0 +1,123 @@
+import json
+import mmap
+import os
+
+import numpy as np
+import pytest
+
+import shared_index
+from engine import DiagnosisEngine
+from scoring import SCORE_MODES, SymptomMatrix
+
+INDEX = {'Flu': frozenset({'cough', 'fever'}), 'Allergy': frozenset({'itching', 'sneezing'})}
+EDITED = dict(INDEX, Allergy=frozenset({'itching', 'sneezing', 'cough'}))
+AUGMENTED = {'Made Up Disease': frozenset({'itching', 'brand new'})}
+QUERIES = [['itching', 'skin_rash'], ['Demam Tinggi', 'cough'], ['high_fever', 'headache', 'vomiting'], []]
+
+
+def is_mapped(array):
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def build(sources, shared, use_augmented=False):
+    return DiagnosisEngine(sources.df_symptoms, sources.df_precaution, sources.symptom_translations,
+                           sources.precaution_translations, use_augmented=use_augmented,
+                           augmented_catalogue=AUGMENTED if use_augmented else None, shared_index=shared)
+
+
+def assert_same(shared, private):
+    assert list(shared.disease_symptoms.items()) == list(private.disease_symptoms.items())
+    assert dict(shared.symptom_postings) == dict(private.symptom_postings)
+    assert dict(shared.symptoms_clean) == dict(private.symptoms_clean)
+    assert list(shared.all_symptoms_sorted) == list(private.all_symptoms_sorted)
+    assert dict(shared.precaution_table) == dict(private.precaution_table)
+    for query in ('demam', 'fevr', 'sk', 'kulit gatal'):
+        assert shared.search_index.search(query) == private.search_index.search(query)
+    for mode in SCORE_MODES:
+        assert shared.diagnose_batch(QUERIES, top_k=0, mode=mode) == private.diagnose_batch(QUERIES, top_k=0, mode=mode)
+
+
+@pytest.mark.parametrize('use_augmented', [False, True])
+def test_workers_attach_to_the_published_index(sources, use_augmented, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    private = build(sources, False, use_augmented)
+    publisher = build(sources, True, use_augmented)
+    assert_same(publisher, private)
+    assert len(os.listdir(shared_index.SHARED_DIR)) == 1
+
+    worker = build(sources, True, use_augmented)
+    # Tidak ada yang dibangun dari DataFrame: semua struktur adalah view atas array yang di-memory-map
+    assert worker.patterns is None and worker._base_index is None
+    assert is_mapped(worker.matrix.matrix.indices) and is_mapped(worker.disease_symptoms.keys_array)
+    assert is_mapped(worker.symptoms_clean.keys_array) and is_mapped(worker.precaution_table.rows.values)
+    assert_same(worker, private)
+
+
+def test_attached_engine_updates_like_a_private_one(sources, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    build(sources, True)
+    worker = build(sources, True)
+    df = sources.df_symptoms.astype(object)
+    edited = sources._replace(df_symptoms=df[df['Disease'] != 'Acne'],
+                              precaution_translations=dict(sources.precaution_translations, **{'drink water': 'Minum'}))
+
+    updated = worker.updated(edited)
+    assert 'Acne' not in updated.disease_symptoms
+    assert_same(updated, build(edited, False))
+    # Bundle untuk sumber baru sudah terbit: worker lain cukup attach, bundle lama dihapus
+    assert updated._base_index is None
+    assert len(os.listdir(shared_index.SHARED_DIR)) == 1
+    assert_same(build(sources, True).updated(edited), updated)
+
+
+def test_index_key_follows_the_sources(sources):
+    key = shared_index.index_key(*sources[:4])
+    assert shared_index.index_key(*sources[:4]) == key
+    translations = dict(sources.symptom_translations, itching='Gatal Sekali')
+    assert shared_index.index_key(sources.df_symptoms, sources.df_precaution, translations,
+                                  sources.precaution_translations) != key
+    assert shared_index.index_key(sources.df_symptoms.iloc[1:], *sources[1:4]) != key
+    assert shared_index.index_key(*sources[:4], use_augmented=True, augmented_catalogue=AUGMENTED) != key
+
+
+def test_index_key_does_not_depend_on_the_loaded_catalogue(sources):
+    # Worker yang attach tidak pernah memuat katalog augmented; kuncinya harus sama dengan pembangun index
+    built = DiagnosisEngine(*sources[:4], use_augmented=True, shared_index=False)
+    assert built.index_key() == shared_index.index_key(*sources[:4], use_augmented=True)
+
+
+def test_publish_prunes_older_bundles_of_the_same_catalogue(tmp_path):
+    shared_dir = str(tmp_path)
+    old = shared_index.publish(SymptomMatrix(INDEX).to_arrays(), 'old', shared_dir)
+    shared_index.publish(SymptomMatrix(AUGMENTED).to_arrays(), 'aug', shared_dir, name='augmented')
+    # Bundle format lama (tanpa nama katalog) dan sisa publish yang terputus
+    legacy = tmp_path / 'abc123'
+    legacy.mkdir()
+    (legacy / shared_index.META_FILE).write_text(json.dumps({'version': 1, 'arrays': []}))
+    stale_tmp = tmp_path / 'base-abc.tmp-0000'
+    stale_tmp.mkdir()
+    os.utime(stale_tmp, (0, 0))
+    fresh_tmp = tmp_path / 'base-def.tmp-0000'
+    fresh_tmp.mkdir()
+
+    shared_index.publish(SymptomMatrix(EDITED).to_arrays(), 'new', shared_dir)
+
+    assert sorted(os.listdir(shared_dir)) == sorted(['base-new', 'augmented-aug', fresh_tmp.name])
+    assert not os.path.exists(old)
+    assert shared_index.attach('old', shared_dir) is None
+
+
+def test_prune_keeps_newer_bundles(tmp_path):
+    shared_dir = str(tmp_path)
+    older = shared_index.publish(SymptomMatrix(INDEX).to_arrays(), 'old', shared_dir)
+    newer = shared_index.publish(SymptomMatrix(EDITED).to_arrays(), 'new', shared_dir)
+    assert not os.path.exists(older)
+    # Worker yang belum reload menerbitkan ulang data lama setelah bundle baru terbit:
+    # bundle yang lebih baru tidak boleh ikut terhapus
+    os.utime(os.path.join(newer, shared_index.META_FILE), ns=(1 << 62, 1 << 62))
+    older = shared_index.publish(SymptomMatrix(INDEX).to_arrays(), 'old', shared_dir)
+    assert os.path.isdir(older) and os.path.isdir(newer)